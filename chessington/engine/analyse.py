@@ -0,0 +1,228 @@
+"""
+Analysis of many positions at once: ``chessington-analyse`` reads positions from an EPD or FEN file, searches them
+across a pool of worker processes, and writes one JSON object per position (JSON Lines).
+
+The input is read as a stream and only a bounded number of chunks are in flight at once, so files of any size can
+be analysed in constant memory. Each result records the line it came from, which is how an interrupted run is
+resumed: positions whose lines already appear in the output file are skipped.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from chessington.engine.board import Board
+from chessington.engine.perft import move_name
+from chessington.engine.search import Searcher
+from chessington.engine.tablebase import Tablebases
+from chessington.engine.transposition import TranspositionTable
+
+INPUT_ORDER = 'input'
+COMPLETION_ORDER = 'completion'
+
+# Each worker searches with one table, cleared before every position so results don't depend on what came before
+_worker_table = None
+_worker_tablebases = None
+
+
+def read_positions(lines):
+    """
+    Yields a (line number, FEN, id) tuple for each position in an EPD or FEN file, numbering lines from 1. Blank
+    lines and lines starting with # are skipped. An EPD record's id operation is returned as its id, or None.
+    """
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        fields = line.split(None, 4)
+        if len(fields) < 4:
+            yield line_number, line, None
+            continue
+        fen = ' '.join(fields[:4])
+        position_id = None
+        if len(fields) == 5:
+            rest = fields[4]
+            move_counters = rest.split(None, 2)
+            if len(move_counters) >= 2 and move_counters[0].isdigit() and move_counters[1].isdigit():
+                fen += f' {move_counters[0]} {move_counters[1]}'
+                rest = move_counters[2] if len(move_counters) == 3 else ''
+            position_id = _epd_id(rest)
+        yield line_number, fen, position_id
+
+
+def _epd_id(operations):
+    for operation in operations.split(';'):
+        operation = operation.strip()
+        if operation.startswith('id '):
+            return operation[3:].strip().strip('"')
+    return None
+
+
+def analyse_position(line_number, fen, position_id, time_limit=None, depth=None, nodes=None, table=None,
+                     tablebases=None):
+    """
+    Searches one position, returning its result as a dict ready to be written out as JSON. A position that can't be
+    read gives a result with an error message instead.
+    """
+    result = {'line': line_number, 'fen': fen}
+    if position_id is not None:
+        result['id'] = position_id
+    try:
+        board = Board.from_fen(fen)
+    except ValueError as error:
+        result['error'] = str(error)
+        return result
+    search_result = Searcher(board, table, tablebases=tablebases).search(time_limit, depth, nodes)
+    result.update({
+        'best_move': move_name(search_result.best_move) if search_result.best_move is not None else None,
+        'score': search_result.score,
+        'depth': search_result.depth,
+        'nodes': search_result.nodes,
+        'time': round(search_result.time, 4),
+    })
+    return result
+
+
+def _initialise_worker(table_size_mb, tablebase_directory):
+    global _worker_table, _worker_tablebases
+    _worker_table = TranspositionTable(table_size_mb)
+    if tablebase_directory is not None:
+        _worker_tablebases = Tablebases(tablebase_directory)
+
+
+def _analyse_chunk(chunk, time_limit, depth, nodes):
+    results = []
+    for line_number, fen, position_id in chunk:
+        _worker_table.clear()
+        results.append(analyse_position(line_number, fen, position_id, time_limit, depth, nodes, _worker_table,
+                                        _worker_tablebases))
+    return results
+
+
+def _chunks(positions, chunk_size, skip_lines):
+    chunk = []
+    for position in positions:
+        if position[0] in skip_lines:
+            continue
+        chunk.append(position)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def completed_lines(path):
+    """
+    The line numbers already recorded in an output file from an earlier run. A final line cut off part-way through
+    being written is removed from the file, so its position is analysed again.
+    """
+    lines = set()
+    if not os.path.exists(path):
+        return lines
+    with open(path, 'rb+') as output:
+        complete_length = 0
+        for raw_line in output:
+            if not raw_line.endswith(b'\n'):
+                break
+            try:
+                lines.add(json.loads(raw_line)['line'])
+            except (ValueError, KeyError):
+                break
+            complete_length += len(raw_line)
+        output.truncate(complete_length)
+    return lines
+
+
+def analyse(positions, output, workers=None, chunk_size=16, order=INPUT_ORDER, time_limit=None, depth=None,
+            nodes=None, skip_lines=frozenset(), table_size_mb=4, tablebase_directory=None):
+    """
+    Analyses (line number, FEN, id) positions across a pool of worker processes, writing each result to the output
+    file as a line of JSON in input or completion order. Returns the number of positions analysed. Searches use the
+    endgame tables in tablebase_directory, if given.
+
+    Positions are sent to workers chunk_size at a time, with at most two chunks per worker either waiting to be
+    analysed or, in input order, analysed and waiting for an earlier chunk to be written. The output is flushed after
+    every chunk so that an interrupted run loses little work.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_pending = 2 * workers
+    chunks = enumerate(_chunks(positions, chunk_size, skip_lines))
+    pending = {}
+    finished_chunks = {}
+    next_chunk_to_write = 0
+    analysed = 0
+
+    def write(results):
+        for result in results:
+            output.write(json.dumps(result) + '\n')
+        output.flush()
+
+    with ProcessPoolExecutor(workers, initializer=_initialise_worker,
+                             initargs=(table_size_mb, tablebase_directory)) as executor:
+        exhausted = False
+        while pending or not exhausted:
+            # Chunks held back behind a slow earlier chunk count too, so a slow chunk can't make them pile up
+            while not exhausted and len(pending) + len(finished_chunks) < max_pending:
+                next_chunk = next(chunks, None)
+                if next_chunk is None:
+                    exhausted = True
+                    break
+                chunk_index, chunk = next_chunk
+                pending[executor.submit(_analyse_chunk, chunk, time_limit, depth, nodes)] = chunk_index
+            if not pending:
+                break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                chunk_index = pending.pop(future)
+                results = future.result()
+                analysed += len(results)
+                if order == COMPLETION_ORDER:
+                    write(results)
+                else:
+                    finished_chunks[chunk_index] = results
+            # Write out finished chunks as soon as every chunk before them has been written
+            while next_chunk_to_write in finished_chunks:
+                write(finished_chunks.pop(next_chunk_to_write))
+                next_chunk_to_write += 1
+    return analysed
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Analyse every position in an EPD or FEN file.')
+    parser.add_argument('input', help='EPD or FEN file, one position per line')
+    parser.add_argument('-o', '--output', help='JSON Lines file to write results to (default: standard output)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='number of worker processes')
+    parser.add_argument('--chunk-size', type=int, default=16, help='positions sent to a worker at a time')
+    parser.add_argument('--order', choices=(INPUT_ORDER, COMPLETION_ORDER), default=INPUT_ORDER,
+                        help='write results in input order or as they finish')
+    parser.add_argument('--resume', action='store_true',
+                        help='skip positions already in the output file and append to it')
+    parser.add_argument('--depth', type=int, help='depth to search each position to')
+    parser.add_argument('--time', type=float, help='seconds to search each position for')
+    parser.add_argument('--nodes', type=int, help='nodes to search in each position')
+    parser.add_argument('--hash', type=int, default=4, help='transposition table size per worker in MB')
+    parser.add_argument('--tablebases', help='directory of endgame tables generated by chessington-tablebases')
+    options = parser.parse_args(args)
+    if options.resume and not options.output:
+        parser.error('--resume needs --output')
+
+    skip_lines = completed_lines(options.output) if options.resume else frozenset()
+    output = open(options.output, 'a' if options.resume else 'w') if options.output else sys.stdout
+    start = time.perf_counter()
+    try:
+        with open(options.input) as positions:
+            analysed = analyse(read_positions(positions), output, options.workers, options.chunk_size, options.order,
+                               options.time, options.depth, options.nodes, skip_lines, options.hash,
+                               options.tablebases)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    elapsed = time.perf_counter() - start
+
+    print(f'Positions: {analysed}', file=sys.stderr)
+    print(f'Time: {elapsed:.3f}s', file=sys.stderr)
+    print(f'Positions per second: {analysed / elapsed if elapsed > 0 else 0:.1f}', file=sys.stderr)
@@ -0,0 +1,268 @@
+"""
+A compact binary archive of games, for storing many games' moves far more cheaply than pickling their Boards.
+
+An archive starts with a header holding the number of games and the offset of the index, an array of the offset of
+each game in the file. Each game is its move count and the length of its tag pairs, the tag pairs themselves, and
+then its moves at two bytes a move: the from and to squares as 6 bits each with the promotion piece type above them,
+as in the low bits of a packed move. The rest of a packed move can be worked out from the position the move is played
+in. A game that didn't start from the starting position has a FEN tag pair, as it would in PGN. All numbers are
+little-endian.
+
+Games are written one after another and the index is written when the archive is closed. Archives are read through
+mmap, so any game can be read without reading the games before it.
+
+Running ``chessington-archive pack games.pgn -o games.chga`` packs the games in PGN files into an archive, and
+``chessington-archive show games.chga 3`` prints the fourth game in it.
+"""
+import argparse
+import mmap
+import struct
+import sys
+from array import array
+from collections import namedtuple
+
+from chessington.engine.bitboards import PAWN, KING
+from chessington.engine.board import Board
+from chessington.engine.data import MOVE_SQUARE_MASK, MOVE_TO_SHIFT, MOVE_CASTLE_FLAG, MOVE_EN_PASSANT_FLAG, \
+    encode_move, move_promotion_type
+from chessington.engine.fen import STARTING_FEN
+from chessington.engine.perft import move_name
+from chessington.engine.pgn import GameReplayer
+
+MAGIC = b'CHGA'
+VERSION = 1
+# Magic, version, game count and index offset
+HEADER = struct.Struct('<4sBxxxIQ')
+# Move count and the length of the tag pairs
+GAME = struct.Struct('<HH')
+_OFFSET = struct.Struct('<Q')
+MAX_MOVES = 0xFFFF
+# The from square, to square and promotion type of a packed move
+ARCHIVED_MOVE_MASK = 0x7FFF
+
+# An archived game: its tag pairs as a dict, and its moves in the two-byte form described above
+ArchivedGame = namedtuple('ArchivedGame', ['headers', 'moves'])
+
+
+def unpack_move(board, move):
+    """
+    The packed move that a two-byte archived move stands for, played from the board's position.
+    """
+    from_index = move & MOVE_SQUARE_MASK
+    to_index = move >> MOVE_TO_SHIFT & MOVE_SQUARE_MASK
+    moving_piece = board.board[from_index >> 3][from_index & 7]
+    if moving_piece is None:
+        raise ValueError(f'No piece to move: {move_name(move)}')
+    captured_piece = board.board[to_index >> 3][to_index & 7]
+    piece_type = moving_piece.piece_type
+    captured_type = None if captured_piece is None else captured_piece.piece_type
+    flags = 0
+    if piece_type == PAWN and (from_index ^ to_index) & 7 and captured_piece is None:
+        flags = MOVE_EN_PASSANT_FLAG
+        captured_type = PAWN
+    elif piece_type == KING and abs((to_index & 7) - (from_index & 7)) == 2:
+        flags = MOVE_CASTLE_FLAG
+    return encode_move(from_index, to_index, piece_type, captured_type, move_promotion_type(move), flags)
+
+
+def _encode_headers(headers):
+    if not headers:
+        return b''
+    fields = []
+    for name, value in headers.items():
+        if '\0' in name or '\0' in value:
+            raise ValueError(f'Tag pairs may not contain NUL characters: {name}')
+        fields += (name, value)
+    return '\0'.join(fields).encode('utf-8')
+
+
+def _decode_headers(data):
+    if not data:
+        return {}
+    fields = data.decode('utf-8').split('\0')
+    return dict(zip(fields[::2], fields[1::2]))
+
+
+def _little_endian(values):
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+class ArchiveWriter:
+    """
+    Writes games to a new archive, one after another. Close it when done, or use it as a context manager: the index
+    is only written when the archive is closed, and the archive can't be read without it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'wb', buffering=1 << 20)
+        self._file.write(HEADER.pack(MAGIC, VERSION, 0, 0))
+        self._position = HEADER.size
+        self._offsets = array('Q')
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, board, headers=None):
+        """
+        Adds the moves played on a board (see Board.played_moves), with the given tag pairs. If the board didn't
+        start from the starting position, a FEN tag pair records the position it did start from.
+        """
+        start_fen = board.starting_fen()
+        if start_fen != STARTING_FEN:
+            headers = dict(headers or {}, FEN=start_fen)
+        self.write_moves([move.code & ARCHIVED_MOVE_MASK for move in board.played_moves()], headers)
+
+    def write_moves(self, moves, headers=None):
+        """
+        Adds a game given as two-byte archived moves, or packed moves, with the given tag pairs.
+        """
+        if len(moves) > MAX_MOVES:
+            raise ValueError(f'Too many moves to archive: {len(moves)}')
+        tags = _encode_headers(headers)
+        if len(tags) > 0xFFFF:
+            raise ValueError('Tag pairs too long to archive')
+        encoded_moves = _little_endian(array('H', [move & ARCHIVED_MOVE_MASK for move in moves])).tobytes()
+        self._offsets.append(self._position)
+        self._file.write(GAME.pack(len(moves), len(tags)))
+        self._file.write(tags)
+        self._file.write(encoded_moves)
+        self._position += GAME.size + len(tags) + len(encoded_moves)
+
+    def close(self):
+        if self._file.closed:
+            return
+        self._file.write(_little_endian(array('Q', self._offsets)).tobytes())
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, VERSION, len(self._offsets), self._position))
+        self._file.close()
+
+
+def write_archive(path, boards):
+    """
+    Writes an archive of the moves played on each of the given boards, or (board, tag pairs) pairs. Returns the
+    number of games written.
+    """
+    with ArchiveWriter(path) as writer:
+        for board in boards:
+            if isinstance(board, tuple):
+                writer.write(*board)
+            else:
+                writer.write(board)
+        return len(writer)
+
+
+class GameArchive:
+    """
+    An archive opened for reading. Games are numbered from 0 in the order they were written. Close it when done, or
+    use it as a context manager.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        size = self._file.seek(0, 2)
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        try:
+            if size < HEADER.size:
+                raise ValueError(f'Not a game archive: {path}')
+            magic, version, self.game_count, self._index_offset = HEADER.unpack_from(self._data)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f'Not a game archive: {path}')
+            if self._index_offset == 0 or self._index_offset + self.game_count * _OFFSET.size > size:
+                raise ValueError(f'Game archive was not closed after writing: {path}')
+        except ValueError:
+            self.close()
+            raise
+
+    def __len__(self):
+        return self.game_count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __reduce__(self):
+        return GameArchive, (self.path,)
+
+    def __iter__(self):
+        for number in range(self.game_count):
+            yield self.game(number)
+
+    def close(self):
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
+
+    def game(self, number):
+        """
+        The tag pairs and two-byte moves of game number N.
+        """
+        if not 0 <= number < self.game_count:
+            raise IndexError(f'No game {number} in an archive of {self.game_count}')
+        offset = _OFFSET.unpack_from(self._data, self._index_offset + number * _OFFSET.size)[0]
+        move_count, tags_length = GAME.unpack_from(self._data, offset)
+        offset += GAME.size
+        headers = _decode_headers(self._data[offset:offset + tags_length])
+        offset += tags_length
+        moves = _little_endian(array('H', self._data[offset:offset + 2 * move_count]))
+        return ArchivedGame(headers, moves.tolist())
+
+    def board(self, number):
+        """
+        A board with game number N played on it, so that its move_list holds the game's moves.
+        """
+        headers, moves = self.game(number)
+        board = Board.from_fen(headers['FEN']) if 'FEN' in headers else Board.at_starting_position()
+        for move in moves:
+            board.apply_move(unpack_move(board, move))
+        return board
+
+
+def pack_pgn(pgn_paths, path):
+    """
+    Writes an archive of the games in one or more PGN files, leaving out games that can't be replayed. Returns the
+    number of games written and the number left out.
+    """
+    replayer = GameReplayer()
+    with ArchiveWriter(path) as writer:
+        for pgn_path in pgn_paths:
+            for game in replayer.replay(pgn_path):
+                if game.error is None:
+                    # The replayer has the game's starting position in its tag pairs already
+                    writer.write_moves([move.code for move in game.board.played_moves()], game.headers)
+        return len(writer), replayer.malformed_games
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Pack games into a game archive, or print games from one.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    pack = commands.add_parser('pack', help='pack the games in PGN files into an archive')
+    pack.add_argument('pgn', nargs='+', help='PGN files to read games from')
+    pack.add_argument('-o', '--output', required=True, help='archive file to write')
+    show = commands.add_parser('show', help='print a game from an archive')
+    show.add_argument('archive', help='game archive file')
+    show.add_argument('game', type=int, help='number of the game to print, counting from 0')
+    options = parser.parse_args(args)
+
+    if options.command == 'pack':
+        games, skipped = pack_pgn(options.pgn, options.output)
+        print(f'Games: {games}', file=sys.stderr)
+        print(f'Skipped: {skipped}', file=sys.stderr)
+        return
+
+    with GameArchive(options.archive) as archive:
+        headers, moves = archive.game(options.game)
+    for name, value in headers.items():
+        print(f'[{name} "{value}"]')
+    print(' '.join(move_name(move) for move in moves))
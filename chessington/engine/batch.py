@@ -0,0 +1,237 @@
+"""
+Attack sets, check detection and mobility for many positions at once, using NumPy.
+
+A PositionBatch holds N positions as an (N, 12) array of uint64 bitboards, laid out as Board.bitboards, alongside
+the side to move, castling rights and en passant square of each. The functions below work on whole batches with
+shifts and masks, so their cost is a fixed number of array operations however many positions there are.
+
+NumPy is an optional dependency and is not installed with the rest of the project; install the ``batch`` extra to
+use this module.
+"""
+try:
+    import numpy as np
+except ImportError as error:
+    raise ImportError('chessington.engine.batch needs NumPy, which is not installed') from error
+
+from chessington.engine.bitboards import PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, PIECE_TYPE_COUNT, square_index
+from chessington.engine.board import Board
+from chessington.engine.zobrist import WHITE_KING_SIDE, WHITE_QUEEN_SIDE, BLACK_KING_SIDE, BLACK_QUEEN_SIDE
+
+_FILE_A = np.uint64(0x0101010101010101)
+_NOT_FILE_A = ~_FILE_A
+_NOT_FILE_H = ~(_FILE_A << np.uint64(7))
+_NOT_FILES_AB = ~(_FILE_A | _FILE_A << np.uint64(1))
+_NOT_FILES_GH = ~(_FILE_A << np.uint64(6) | _FILE_A << np.uint64(7))
+_ROW_2 = np.uint64(0xFF << 16)
+_ROW_5 = np.uint64(0xFF << 40)
+
+# Each direction as (shift, mask): a positive shift moves bits up the board (towards higher square indexes) and a
+# negative one moves them down. The mask clears the bits that wrapped around from the other edge of the board.
+_NORTH = (8, ~np.uint64(0))
+_SOUTH = (-8, ~np.uint64(0))
+_EAST = (1, _NOT_FILE_A)
+_WEST = (-1, _NOT_FILE_H)
+_NORTH_EAST = (9, _NOT_FILE_A)
+_NORTH_WEST = (7, _NOT_FILE_H)
+_SOUTH_EAST = (-7, _NOT_FILE_A)
+_SOUTH_WEST = (-9, _NOT_FILE_H)
+_STRAIGHT = (_NORTH, _SOUTH, _EAST, _WEST)
+_DIAGONAL = (_NORTH_EAST, _NORTH_WEST, _SOUTH_EAST, _SOUTH_WEST)
+_KING_STEPS = _STRAIGHT + _DIAGONAL
+_KNIGHT_JUMPS = ((17, _NOT_FILE_A), (15, _NOT_FILE_H), (10, _NOT_FILES_AB), (6, _NOT_FILES_GH),
+                 (-6, _NOT_FILES_AB), (-10, _NOT_FILES_GH), (-15, _NOT_FILE_A), (-17, _NOT_FILE_H))
+# The diagonal steps pawns capture along, by player index
+_PAWN_CAPTURES = ((_NORTH_EAST, _NORTH_WEST), (_SOUTH_EAST, _SOUTH_WEST))
+
+# For each castling right: its player, the squares that must be empty, and the squares that must not be attacked
+_CASTLING = (
+    (WHITE_KING_SIDE, 0, (square_index(0, 5), square_index(0, 6)),
+     (square_index(0, 4), square_index(0, 5), square_index(0, 6))),
+    (WHITE_QUEEN_SIDE, 0, (square_index(0, 1), square_index(0, 2), square_index(0, 3)),
+     (square_index(0, 4), square_index(0, 3), square_index(0, 2))),
+    (BLACK_KING_SIDE, 1, (square_index(7, 5), square_index(7, 6)),
+     (square_index(7, 4), square_index(7, 5), square_index(7, 6))),
+    (BLACK_QUEEN_SIDE, 1, (square_index(7, 1), square_index(7, 2), square_index(7, 3)),
+     (square_index(7, 4), square_index(7, 3), square_index(7, 2))),
+)
+
+
+class PositionBatch:
+    """
+    N positions packed into arrays: bitboards (N, 12) uint64, side_to_move (N,) player index, castling_rights (N,)
+    flags as in chessington.engine.zobrist, and en_passant (N,) uint64 with the bit of the square a pawn can capture
+    onto en passant, or 0.
+    """
+
+    def __init__(self, bitboards, side_to_move, castling_rights, en_passant):
+        self.bitboards = bitboards
+        self.side_to_move = side_to_move
+        self.castling_rights = castling_rights
+        self.en_passant = en_passant
+
+    def __len__(self):
+        return len(self.side_to_move)
+
+    @staticmethod
+    def from_boards(boards):
+        boards = list(boards)
+        en_passant = []
+        for board in boards:
+            square = 0
+            if board.move_list:
+                last_move = board.move_list[-1]
+                if last_move.moved_piece_type == PAWN and abs(last_move.vertical_distance_moved()) == 2:
+                    row = (last_move.square_from.row + last_move.square_to.row) // 2
+                    square = 1 << square_index(row, last_move.square_to.col)
+            en_passant.append(square)
+        return PositionBatch(
+            np.array([board.bitboards for board in boards], dtype=np.uint64).reshape(len(boards), 12),
+            np.array([board.current_player.value for board in boards], dtype=np.int8),
+            np.array([board.castling_rights() for board in boards], dtype=np.uint8),
+            np.array(en_passant, dtype=np.uint64))
+
+    @staticmethod
+    def from_fens(fens):
+        return PositionBatch.from_boards(Board.from_fen(fen) for fen in fens)
+
+
+def _shift(bitboards, step):
+    shift, mask = step
+    if shift > 0:
+        return (bitboards << np.uint64(shift)) & mask
+    return (bitboards >> np.uint64(-shift)) & mask
+
+
+def _slide(sliders, empty, step):
+    """
+    Every square the sliders attack in one direction, stopping at and including the first occupied square. This is
+    a Kogge-Stone fill, which takes three shifts instead of up to seven.
+    """
+    shift, mask = step
+    propagator = empty & mask
+    for distance in (1, 2, 4):
+        sliders = sliders | propagator & _shift(sliders, (shift * distance, ~np.uint64(0)))
+        propagator = propagator & _shift(propagator, (shift * distance, ~np.uint64(0)))
+    return _shift(sliders, step)
+
+
+def popcount(bitboards):
+    """
+    The number of squares in each bitboard.
+    """
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(bitboards).astype(np.int64)
+    bitboards = bitboards - ((bitboards >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    pairs_mask = np.uint64(0x3333333333333333)
+    bitboards = (bitboards & pairs_mask) + ((bitboards >> np.uint64(2)) & pairs_mask)
+    bitboards = (bitboards + (bitboards >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return ((bitboards * np.uint64(0x0101010101010101)) >> np.uint64(56)).astype(np.int64)
+
+
+def to_square_masks(bitboards):
+    """
+    Unpacks (N,) bitboards into an (N, 64) array of booleans indexed by square.
+    """
+    as_bytes = np.ascontiguousarray(bitboards, dtype='<u8').view(np.uint8).reshape(-1, 8)
+    return np.unpackbits(as_bytes, axis=1, bitorder='little').astype(bool)
+
+
+def _pieces(batch, players, piece_type):
+    """
+    Each position's bitboard of the given piece type belonging to the given player (an array of player indexes).
+    """
+    return np.where(players == 0, batch.bitboards[:, piece_type],
+                    batch.bitboards[:, PIECE_TYPE_COUNT + piece_type])
+
+
+def _occupancy(batch, players):
+    white = np.bitwise_or.reduce(batch.bitboards[:, :PIECE_TYPE_COUNT], axis=1)
+    black = np.bitwise_or.reduce(batch.bitboards[:, PIECE_TYPE_COUNT:], axis=1)
+    return np.where(players == 0, white, black), np.where(players == 0, black, white)
+
+
+def attacked_squares(batch, players=None):
+    """
+    For each position, the bitboard of squares attacked by the given player: an array of player indexes, or the side
+    to move by default. Matches Board.attacked_squares.
+    """
+    players = batch.side_to_move if players is None else np.broadcast_to(players, batch.side_to_move.shape)
+    own, enemy = _occupancy(batch, players)
+    empty = ~(own | enemy)
+
+    pawns = _pieces(batch, players, PAWN)
+    white_pawn_attacks = _shift(pawns, _NORTH_EAST) | _shift(pawns, _NORTH_WEST)
+    black_pawn_attacks = _shift(pawns, _SOUTH_EAST) | _shift(pawns, _SOUTH_WEST)
+    attacks = np.where(players == 0, white_pawn_attacks, black_pawn_attacks)
+
+    knights = _pieces(batch, players, KNIGHT)
+    for jump in _KNIGHT_JUMPS:
+        attacks |= _shift(knights, jump)
+    queens = _pieces(batch, players, QUEEN)
+    diagonal_sliders = _pieces(batch, players, BISHOP) | queens
+    for step in _DIAGONAL:
+        attacks |= _slide(diagonal_sliders, empty, step)
+    straight_sliders = _pieces(batch, players, ROOK) | queens
+    for step in _STRAIGHT:
+        attacks |= _slide(straight_sliders, empty, step)
+    king = _pieces(batch, players, KING)
+    for step in _KING_STEPS:
+        attacks |= _shift(king, step)
+    return attacks
+
+
+def in_check(batch):
+    """
+    Whether the side to move is in check in each position. Matches Board.is_in_check(board.current_player).
+    """
+    players = batch.side_to_move
+    king = _pieces(batch, players, KING)
+    return (king & attacked_squares(batch, 1 - players)) != 0
+
+
+def mobility(batch):
+    """
+    The number of moves each piece type of the side to move has in each position, as an (N, 6) array indexed by
+    piece type. Moves are counted as Piece.get_piece_specific_moves counts them: pseudo-legal (they may leave the
+    king in check), with castling included and a promotion counted once.
+    """
+    players = batch.side_to_move
+    own, enemy = _occupancy(batch, players)
+    empty = ~(own | enemy)
+    not_own = ~own
+    counts = np.zeros((len(batch), PIECE_TYPE_COUNT), dtype=np.int64)
+
+    pawns = _pieces(batch, players, PAWN)
+    targets = enemy | batch.en_passant
+    white_pushes = _shift(pawns, _NORTH) & empty
+    black_pushes = _shift(pawns, _SOUTH) & empty
+    pushes = np.where(players == 0, white_pushes, black_pushes)
+    double_pushes = np.where(players == 0, _shift(white_pushes & _ROW_2, _NORTH) & empty,
+                             _shift(black_pushes & _ROW_5, _SOUTH) & empty)
+    counts[:, PAWN] = popcount(pushes) + popcount(double_pushes)
+    for white_step, black_step in zip(*_PAWN_CAPTURES):
+        captures = np.where(players == 0, _shift(pawns, white_step), _shift(pawns, black_step)) & targets
+        counts[:, PAWN] += popcount(captures)
+
+    # Shifting a set of pieces by one step moves each piece to a different square, and one piece's slide in a
+    # direction stops before another's begins, so counting per step counts every piece's moves separately
+    knights = _pieces(batch, players, KNIGHT)
+    for jump in _KNIGHT_JUMPS:
+        counts[:, KNIGHT] += popcount(_shift(knights, jump) & not_own)
+    for piece_type, steps in ((BISHOP, _DIAGONAL), (ROOK, _STRAIGHT), (QUEEN, _STRAIGHT + _DIAGONAL)):
+        sliders = _pieces(batch, players, piece_type)
+        for step in steps:
+            counts[:, piece_type] += popcount(_slide(sliders, empty, step) & not_own)
+    king = _pieces(batch, players, KING)
+    for step in _KING_STEPS:
+        counts[:, KING] += popcount(_shift(king, step) & not_own)
+
+    opponent_attacks = attacked_squares(batch, 1 - players)
+    occupied = ~empty
+    for right, player, empty_squares, safe_squares in _CASTLING:
+        empty_mask = np.uint64(sum(1 << index for index in empty_squares))
+        safe_mask = np.uint64(sum(1 << index for index in safe_squares))
+        can_castle = (players == player) & (batch.castling_rights & right != 0) \
+            & (occupied & empty_mask == 0) & (opponent_attacks & safe_mask == 0)
+        counts[:, KING] += can_castle
+    return counts
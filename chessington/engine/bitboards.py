@@ -0,0 +1,156 @@
+"""
+Precomputed bitboard tables and helpers.
+
+A bitboard is a Python int in which bit ``row * 8 + col`` is set for each square it contains, so square (0, 0) is
+bit 0 and square (7, 7) is bit 63.
+"""
+
+BOARD_SIZE = 8
+SQUARE_COUNT = BOARD_SIZE * BOARD_SIZE
+FULL_BOARD = (1 << SQUARE_COUNT) - 1
+
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(6)
+PIECE_TYPE_COUNT = 6
+
+NORTH, SOUTH, EAST, WEST, NORTH_EAST, NORTH_WEST, SOUTH_EAST, SOUTH_WEST = range(8)
+STRAIGHT_DIRECTIONS = (NORTH, SOUTH, EAST, WEST)
+DIAGONAL_DIRECTIONS = (NORTH_EAST, NORTH_WEST, SOUTH_EAST, SOUTH_WEST)
+
+# (row step, col step) for each direction, and whether stepping in it increases the square index
+DIRECTION_STEPS = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1))
+DIRECTION_IS_POSITIVE = (True, False, True, False, True, True, False, False)
+
+KNIGHT_STEPS = ((1, 2), (2, 1), (2, -1), (1, -2), (-1, -2), (-2, -1), (-2, 1), (-1, 2))
+
+
+def square_index(row, col):
+    return row * BOARD_SIZE + col
+
+
+def bitboard_index(player_index, piece_type):
+    """
+    The position of a (player, piece type) pair in a board's list of piece bitboards.
+    """
+    return player_index * PIECE_TYPE_COUNT + piece_type
+
+
+def iterate_bits(bitboard):
+    """
+    Yields the index of each set bit, lowest first.
+    """
+    while bitboard:
+        lowest_bit = bitboard & -bitboard
+        yield lowest_bit.bit_length() - 1
+        bitboard ^= lowest_bit
+
+
+def lowest_bit_index(bitboard):
+    return (bitboard & -bitboard).bit_length() - 1
+
+
+def _on_board(row, col):
+    return 0 <= row < BOARD_SIZE and 0 <= col < BOARD_SIZE
+
+
+def _step_mask(row, col, steps):
+    mask = 0
+    for row_step, col_step in steps:
+        if _on_board(row + row_step, col + col_step):
+            mask |= 1 << square_index(row + row_step, col + col_step)
+    return mask
+
+
+def _ray_mask(row, col, row_step, col_step):
+    mask = 0
+    row, col = row + row_step, col + col_step
+    while _on_board(row, col):
+        mask |= 1 << square_index(row, col)
+        row, col = row + row_step, col + col_step
+    return mask
+
+
+def _build_tables():
+    knight_attacks = []
+    king_attacks = []
+    pawn_attacks = ([], [])
+    rays = tuple([] for _ in DIRECTION_STEPS)
+    for row in range(BOARD_SIZE):
+        for col in range(BOARD_SIZE):
+            knight_attacks.append(_step_mask(row, col, KNIGHT_STEPS))
+            king_attacks.append(_step_mask(row, col, DIRECTION_STEPS))
+            pawn_attacks[0].append(_step_mask(row, col, ((1, 1), (1, -1))))
+            pawn_attacks[1].append(_step_mask(row, col, ((-1, 1), (-1, -1))))
+            for direction, (row_step, col_step) in enumerate(DIRECTION_STEPS):
+                rays[direction].append(_ray_mask(row, col, row_step, col_step))
+    return knight_attacks, king_attacks, pawn_attacks, rays
+
+
+# KNIGHT_ATTACKS[square] and KING_ATTACKS[square] are the squares those pieces attack from the given square.
+# PAWN_ATTACKS[player_index][square] are the diagonal squares a pawn of that player attacks.
+# RAYS[direction][square] is every square in the given direction from the square, up to the edge of the board.
+KNIGHT_ATTACKS, KING_ATTACKS, PAWN_ATTACKS, RAYS = _build_tables()
+
+
+def ray_attacks(square, direction, occupied):
+    """
+    The squares attacked along one direction, stopping at (and including) the first occupied square.
+    """
+    ray = RAYS[direction][square]
+    blockers = ray & occupied
+    if blockers:
+        if DIRECTION_IS_POSITIVE[direction]:
+            first_blocker = (blockers & -blockers).bit_length() - 1
+        else:
+            first_blocker = blockers.bit_length() - 1
+        ray ^= RAYS[direction][first_blocker]
+    return ray
+
+
+def bishop_attacks(square, occupied):
+    return (ray_attacks(square, NORTH_EAST, occupied) | ray_attacks(square, NORTH_WEST, occupied)
+            | ray_attacks(square, SOUTH_EAST, occupied) | ray_attacks(square, SOUTH_WEST, occupied))
+
+
+def rook_attacks(square, occupied):
+    return (ray_attacks(square, NORTH, occupied) | ray_attacks(square, SOUTH, occupied)
+            | ray_attacks(square, EAST, occupied) | ray_attacks(square, WEST, occupied))
+
+
+def queen_attacks(square, occupied):
+    return bishop_attacks(square, occupied) | rook_attacks(square, occupied)
+
+
+def _build_between():
+    between = [[0] * SQUARE_COUNT for _ in range(SQUARE_COUNT)]
+    for square in range(SQUARE_COUNT):
+        for direction in range(len(DIRECTION_STEPS)):
+            for other in iterate_bits(RAYS[direction][square]):
+                between[square][other] = RAYS[direction][square] & ~RAYS[direction][other] & ~(1 << other)
+    return between
+
+
+# BETWEEN[a][b] is the squares strictly between a and b if they share a line, and empty otherwise
+BETWEEN = _build_between()
+
+
+def nearest_bit_index(bitboard, direction):
+    """
+    The index of the set bit closest to the origin of a ray travelling in the given direction.
+    """
+    if DIRECTION_IS_POSITIVE[direction]:
+        return (bitboard & -bitboard).bit_length() - 1
+    return bitboard.bit_length() - 1
+
+
+def attackers_to(bitboards, square, attacker_index, occupied):
+    """
+    A bitboard of the given player's pieces that attack the square, with sliding attacks blocked by occupied.
+    """
+    base = bitboard_index(attacker_index, PAWN)
+    queens = bitboards[base + QUEEN]
+    return (KNIGHT_ATTACKS[square] & bitboards[base + KNIGHT]
+            # A pawn attacks this square from the squares a defending pawn standing on it would attack
+            | PAWN_ATTACKS[1 - attacker_index][square] & bitboards[base + PAWN]
+            | KING_ATTACKS[square] & bitboards[base + KING]
+            | bishop_attacks(square, occupied) & (bitboards[base + BISHOP] | queens)
+            | rook_attacks(square, occupied) & (bitboards[base + ROOK] | queens))
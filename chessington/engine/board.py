@@ -2,23 +2,86 @@
 A module providing a representation of a chess board. The rules of chess are not implemented - 
 this is just a "dumb" board that will let you move pieces around as you like.
 """
-from copy import deepcopy
-from chessington.engine.data import Player, Square, Move
-from chessington.engine.pieces import Pawn, Knight, Bishop, Rook, Queen, King
+from chessington.engine.bitboards import PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, PIECE_TYPE_COUNT, \
+    KNIGHT_ATTACKS, KING_ATTACKS, PAWN_ATTACKS, attackers_to, bitboard_index, bishop_attacks, iterate_bits, \
+    lowest_bit_index, rook_attacks, square_index
+from chessington.engine.data import Player, Square, SQUARES, Move
+from chessington.engine.evaluation import MIDGAME_TABLES, ENDGAME_TABLES, PHASE_WEIGHTS
+from chessington.engine.fen import STARTING_FEN, format_fen, format_position, parse_fen
+from chessington.engine.movegen import generate_legal_moves
+from chessington.engine.pieces import Pawn, Knight, Bishop, Rook, Queen, King, PIECE_CLASSES
+from chessington.engine.zobrist import PIECE_KEYS, CASTLING_KEYS, EN_PASSANT_KEYS, WHITE_TO_MOVE_KEY, \
+    WHITE_KING_SIDE, WHITE_QUEEN_SIDE, BLACK_KING_SIDE, BLACK_QUEEN_SIDE
 
 BOARD_SIZE = 8
 
+# Each castling right, with the player and row it belongs to and the column its rook starts on
+CASTLING_ROOK_SQUARES = (
+    (WHITE_KING_SIDE, Player.WHITE, 0, 7),
+    (WHITE_QUEEN_SIDE, Player.WHITE, 0, 0),
+    (BLACK_KING_SIDE, Player.BLACK, 7, 7),
+    (BLACK_QUEEN_SIDE, Player.BLACK, 7, 0),
+)
+# The squares whose contents can change the castling rights
+CASTLING_SQUARES = sum(1 << square_index(row, col) for row in (0, 7) for col in (0, 4, 7))
+
 
 class Board:
     """
     A representation of the chess board, and the pieces on it.
+
+    Alongside the 8x8 grid of pieces, the board keeps one bitboard per (player, piece type) and one occupancy
+    bitboard per player, so that occupancy and attack queries are a handful of bitwise operations. It also indexes
+    each player's pieces by the square they stand on, so pieces can be located without scanning the grid.
+
+    zobrist_key identifies the position (pieces, side to move, castling rights and en passant file) and is updated
+    incrementally as pieces are placed and moves are played, so it can be used as a cache key. In the same way,
+    midgame_score, endgame_score and phase hold the totals that chessington.engine.evaluation blends into a score.
     """
 
     def __init__(self, player, board_state):
-        self.current_player = Player.WHITE
+        self.current_player = player
         self.board = board_state
         self.move_list = []
+        self.halfmove_clock = 0
+        self.fullmove_number = 1
+        self._undo_stack = []
+        self._redo_stack = []
+        # The key of the position before each move in the undo stack
+        self._key_history = []
         self.primary_board = True
+        self.bitboards = [0] * (2 * PIECE_TYPE_COUNT)
+        self.occupancy = [0, 0]
+        self._piece_squares = [{}, {}]
+        # Index the pieces and build the key in one pass, as boards are created in bulk when loading positions
+        bitboards = self.bitboards
+        occupancy = self.occupancy
+        piece_squares = self._piece_squares
+        key = 0
+        midgame_score = endgame_score = phase = 0
+        index = 0
+        for pieces in board_state:
+            for piece in pieces:
+                if piece is not None:
+                    player_index = piece.player.value
+                    piece_index = player_index * PIECE_TYPE_COUNT + piece.piece_type
+                    bitboards[piece_index] |= 1 << index
+                    occupancy[player_index] |= 1 << index
+                    key ^= PIECE_KEYS[piece_index][index]
+                    midgame_score += MIDGAME_TABLES[piece_index][index]
+                    endgame_score += ENDGAME_TABLES[piece_index][index]
+                    phase += PHASE_WEIGHTS[piece.piece_type]
+                    piece_squares[player_index][piece] = SQUARES[index]
+                index += 1
+        self.midgame_score = midgame_score
+        self.endgame_score = endgame_score
+        self.phase = phase
+        self._castling_rights = self.castling_rights()
+        self._en_passant_file = None
+        key ^= CASTLING_KEYS[self._castling_rights]
+        if player == Player.WHITE:
+            key ^= WHITE_TO_MOVE_KEY
+        self.zobrist_key = key
 
     @staticmethod
     def empty():
@@ -28,6 +91,35 @@ class Board:
     def at_starting_position():
         return Board(Player.WHITE, Board._create_starting_board())
 
+    @staticmethod
+    def from_fen(fen=STARTING_FEN):
+        """
+        Builds a board from a FEN string. An en passant square is recorded as the two-square pawn move that made it
+        possible.
+        """
+        grid, player, en_passant, halfmove_clock, fullmove_number = parse_fen(fen)
+        board = Board(player, grid)
+        board.halfmove_clock = halfmove_clock
+        board.fullmove_number = fullmove_number
+        if en_passant is not None:
+            row, col = en_passant
+            # The pawn that moved stands one row beyond the en passant square, in the direction it was moving
+            direction = 1 if row == 2 else -1
+            pawn_square = Square.at(row + direction, col)
+            pawn = board.get_piece(pawn_square)
+            if isinstance(pawn, Pawn) and pawn.player != player:
+                board.move_list.append(Move(pawn, None, Square.at(row - direction, col), pawn_square))
+                board._en_passant_file = board.en_passant_file()
+                if board._en_passant_file is not None:
+                    board.zobrist_key ^= EN_PASSANT_KEYS[board._en_passant_file]
+        return board
+
+    def to_fen(self):
+        """
+        Describes the position as a FEN string.
+        """
+        return format_fen(self)
+
     @staticmethod
     def _create_empty_board():
         return [[None] * BOARD_SIZE for _ in range(BOARD_SIZE)]
@@ -53,7 +145,38 @@ class Board:
         """
         Places the piece at the given position on the board.
         """
+        index = square.index
+        previous_piece = self.board[square.row][square.col]
+        if previous_piece is not None:
+            self._remove_from_bitboards(previous_piece, index)
+            previous_piece_squares = self._piece_squares[previous_piece.player.value]
+            # The piece may already have been placed on another square, as happens part-way through a move
+            if previous_piece_squares.get(previous_piece) == square:
+                del previous_piece_squares[previous_piece]
         self.board[square.row][square.col] = piece
+        if piece is not None:
+            self._add_to_bitboards(piece, index)
+            self._piece_squares[piece.player.value][piece] = square
+        if CASTLING_SQUARES >> index & 1:
+            self._update_castling_key()
+
+    def _add_to_bitboards(self, piece, index):
+        piece_index = bitboard_index(piece.player.value, piece.piece_type)
+        self.bitboards[piece_index] |= 1 << index
+        self.occupancy[piece.player.value] |= 1 << index
+        self.zobrist_key ^= PIECE_KEYS[piece_index][index]
+        self.midgame_score += MIDGAME_TABLES[piece_index][index]
+        self.endgame_score += ENDGAME_TABLES[piece_index][index]
+        self.phase += PHASE_WEIGHTS[piece.piece_type]
+
+    def _remove_from_bitboards(self, piece, index):
+        piece_index = bitboard_index(piece.player.value, piece.piece_type)
+        self.bitboards[piece_index] &= ~(1 << index)
+        self.occupancy[piece.player.value] &= ~(1 << index)
+        self.zobrist_key ^= PIECE_KEYS[piece_index][index]
+        self.midgame_score -= MIDGAME_TABLES[piece_index][index]
+        self.endgame_score -= ENDGAME_TABLES[piece_index][index]
+        self.phase -= PHASE_WEIGHTS[piece.piece_type]
 
     def get_piece(self, square):
         """
@@ -63,13 +186,18 @@ class Board:
 
     def find_piece(self, piece_to_find):
         """
-        Searches for the given piece on the board and returns its square.
+        Looks up the square of the given piece on the board.
         """
-        for row in range(BOARD_SIZE):
-            for col in range(BOARD_SIZE):
-                if self.board[row][col] is piece_to_find:
-                    return Square.at(row, col)
-        raise Exception('The supplied piece is not on the board')
+        square = self._piece_squares[piece_to_find.player.value].get(piece_to_find)
+        if square is None:
+            raise Exception('The supplied piece is not on the board')
+        return square
+
+    def get_pieces(self, player):
+        """
+        Returns a (piece, square) pair for each of the given player's pieces on the board.
+        """
+        return list(self._piece_squares[player.value].items())
 
     def move_piece(self, from_square, to_square):
         """
@@ -77,23 +205,291 @@ class Board:
         """
         moving_piece = self.get_piece(from_square)
         if moving_piece is not None and moving_piece.player == self.current_player:
-            piece_under_attack = deepcopy(self.get_piece(to_square))
-            self.set_piece(to_square, moving_piece)
-            self.set_piece(from_square, None)
+            if self._redo_stack:
+                self._redo_stack.clear()
+            piece_under_attack = self.get_piece(to_square)
+            history_entry = Move(moving_piece, piece_under_attack, from_square, to_square)
+            self._play_move(history_entry, moving_piece, piece_under_attack, self.current_player)
+
+    def make_move(self, from_square, to_square, promotion=None):
+        """
+        Plays a move for whichever player owns the piece on the starting square, and marks that piece as moved.
+        A pawn reaching the far side becomes the given promotion piece class, or a Queen by default.
+
+        Unlike move_piece, the move can be taken back exactly with unmake_move.
+        """
+        self._make_move(Move(self.get_piece(from_square), self.get_piece(to_square), from_square, to_square, promotion))
+
+    def apply_move(self, move):
+        """
+        Plays a move in the packed form returned by legal_moves. Take it back with unmake_move.
+        """
+        self._make_move(Move.from_code(move))
+
+    def _make_move(self, history_entry):
+        moving_piece = self.get_piece(history_entry.square_from)
+        piece_under_attack = self.get_piece(history_entry.square_to)
+        previous_player = self.current_player
+        self.current_player = moving_piece.player
+        self._play_move(history_entry, moving_piece, piece_under_attack, previous_player)
+        moving_piece.has_moved = True
+
+    def legal_moves(self):
+        """
+        Every legal move for the player to move, packed into ints as described in chessington.engine.data.
+        """
+        return generate_legal_moves(self)
+
+    def legal_captures(self):
+        """
+        The legal captures and promotions for the player to move, packed as in legal_moves.
+        """
+        return generate_legal_moves(self, captures_only=True)
+
+    def unmake_move(self):
+        """
+        Takes back the most recent move, restoring any captured piece, castled rook or promoted pawn.
+        """
+        last_move = self.move_list.pop()
+        moving_piece, piece_under_attack, had_moved, previous_player, en_passant_pawn, rook_squares, \
+            previous_key, previous_castling_rights, previous_en_passant_file, self.halfmove_clock, \
+            self.fullmove_number = self._undo_stack.pop()
+        self._key_history.pop()
+
+        if rook_squares is not None:
+            rook_square_from, rook_square_to = rook_squares
+            self.set_piece(rook_square_from, self.get_piece(rook_square_to))
+            self.set_piece(rook_square_to, None)
+        self.set_piece(last_move.square_from, moving_piece)
+        self.set_piece(last_move.square_to, piece_under_attack)
+        if en_passant_pawn is not None:
+            self.set_piece(Square.at(last_move.square_from.row, last_move.square_to.col), en_passant_pawn)
+
+        moving_piece.has_moved = had_moved
+        self.current_player = previous_player
+        self.zobrist_key = previous_key
+        self._castling_rights = previous_castling_rights
+        self._en_passant_file = previous_en_passant_file
+
+    def undo(self):
+        """
+        Takes back the most recent move, as unmake_move does, and keeps it so that redo can play it again. Returns the
+        move taken back, or None if there is nothing to take back. Playing another move with move_piece forgets the
+        moves kept; moves played with make_move or apply_move and taken back again, as searches do, leave them be.
+        """
+        if not self._undo_stack:
+            return None
+        move = self.move_list[-1]
+        self.unmake_move()
+        # Remember the position the move is played from, so that redo can tell whether the board has left it
+        self._redo_stack.append((move, self.zobrist_key))
+        return move
+
+    def redo(self):
+        """
+        Plays again the move most recently taken back with undo. Returns the move, or None if there is nothing to
+        play again, including when another move has been played since and not taken back.
+        """
+        if not self._redo_stack:
+            return None
+        move, key = self._redo_stack[-1]
+        if key != self.zobrist_key:
+            self._redo_stack.clear()
+            return None
+        self._redo_stack.pop()
+        self._make_move(move)
+        return move
 
-            self.move_list.append(Move(deepcopy(moving_piece), piece_under_attack, from_square, to_square))
+    def is_repetition(self):
+        """
+        Whether the current position has been seen before in this game, as search treats it.
+        """
+        return self._position_repeated(1)
 
-            self.remove_en_passant_pawn()
-            self.castle_rook()
-            self.promote_pawn()
+    def is_draw_by_repetition(self):
+        """
+        Whether the current position has been seen twice before, making a threefold repetition.
+        """
+        return self._position_repeated(2)
 
-            self.current_player = self.current_player.opponent()
+    def is_fifty_move_draw(self):
+        """
+        Whether fifty moves by each player have gone by without a capture or a pawn move.
+        """
+        return self.halfmove_clock >= 100
+
+    def _position_repeated(self, times):
+        # A capture or pawn move can never be undone, so only the positions since the last one can repeat this one,
+        # and of those only every other one has the same player to move
+        halfmove_clock = self.halfmove_clock
+        if halfmove_clock < 4:
+            return False
+        keys = self._key_history
+        key = self.zobrist_key
+        oldest = max(len(keys) - halfmove_clock, 0)
+        for index in range(len(keys) - 4, oldest - 1, -2):
+            if keys[index] == key:
+                times -= 1
+                if not times:
+                    return True
+        return False
+
+    def played_moves(self):
+        """
+        The moves that unmake_move can take back, oldest first. The move from_fen records to mark an en passant
+        square isn't one of them.
+        """
+        return self.move_list[len(self.move_list) - len(self._undo_stack):]
+
+    def starting_fen(self):
+        """
+        The FEN of the position before the moves in played_moves, worked out from the undo stack without changing
+        the board.
+        """
+        moves = self.played_moves()
+        if not moves:
+            return self.to_fen()
+        # Take the moves back on a copy of the grid, latest first
+        grid = [list(row) for row in self.board]
+        for move, undo_entry in zip(reversed(moves), reversed(self._undo_stack)):
+            moving_piece, piece_under_attack, _, _, en_passant_pawn, rook_squares = undo_entry[:6]
+            if rook_squares is not None:
+                rook_square_from, rook_square_to = rook_squares
+                grid[rook_square_from.row][rook_square_from.col] = grid[rook_square_to.row][rook_square_to.col]
+                grid[rook_square_to.row][rook_square_to.col] = None
+            square_from, square_to = move.square_from, move.square_to
+            grid[square_from.row][square_from.col] = moving_piece
+            grid[square_to.row][square_to.col] = piece_under_attack
+            if en_passant_pawn is not None:
+                grid[square_from.row][square_to.col] = en_passant_pawn
+        # The first move's undo entry holds the player to move, castling rights and counters from before it
+        first_entry = self._undo_stack[0]
+        player, castling_rights = first_entry[3], first_entry[7]
+        halfmove_clock, fullmove_number = first_entry[9], first_entry[10]
+        earlier_moves = len(self.move_list) - len(moves)
+        last_move = self.move_list[earlier_moves - 1] if earlier_moves else None
+        return format_position(grid, player, castling_rights, last_move, halfmove_clock, fullmove_number)
+
+    def _play_move(self, history_entry, moving_piece, piece_under_attack, previous_player):
+        had_moved = moving_piece.has_moved
+        undo_entry = (moving_piece, piece_under_attack, had_moved, previous_player)
+        previous_key_state = (self.zobrist_key, self._castling_rights, self._en_passant_file, self.halfmove_clock,
+                              self.fullmove_number)
+        self.set_piece(history_entry.square_to, moving_piece)
+        self.set_piece(history_entry.square_from, None)
+
+        self.move_list.append(history_entry)
+
+        en_passant_pawn = self.remove_en_passant_pawn()
+        rook_squares = self.castle_rook()
+        self.promote_pawn()
+
+        self._undo_stack.append(undo_entry + (en_passant_pawn, rook_squares) + previous_key_state)
+        self._key_history.append(previous_key_state[0])
+        # The halfmove clock counts moves since the last capture or pawn move
+        if piece_under_attack is not None or history_entry.moved_piece_type == PAWN:
+            self.halfmove_clock = 0
+        else:
+            self.halfmove_clock += 1
+        if self.current_player == Player.BLACK:
+            self.fullmove_number += 1
+        self.current_player = self.current_player.opponent()
+        self._update_zobrist_key_state()
+
+    def _update_zobrist_key_state(self):
+        """
+        Brings the side to move, castling and en passant parts of the key up to date after a move.
+        """
+        self._update_castling_key()
+        key = self.zobrist_key ^ WHITE_TO_MOVE_KEY
+        en_passant_file = self.en_passant_file()
+        if en_passant_file != self._en_passant_file:
+            if self._en_passant_file is not None:
+                key ^= EN_PASSANT_KEYS[self._en_passant_file]
+            if en_passant_file is not None:
+                key ^= EN_PASSANT_KEYS[en_passant_file]
+            self._en_passant_file = en_passant_file
+        self.zobrist_key = key
+
+    def _update_castling_key(self):
+        castling_rights = self.castling_rights()
+        if castling_rights != self._castling_rights:
+            self.zobrist_key ^= CASTLING_KEYS[self._castling_rights] ^ CASTLING_KEYS[castling_rights]
+            self._castling_rights = castling_rights
+
+    def refresh_zobrist_key(self):
+        """
+        Recomputes zobrist_key from scratch, for use after editing has_moved flags, current_player or move_list
+        directly rather than through moves.
+        """
+        self._castling_rights = self.castling_rights()
+        self._en_passant_file = self.en_passant_file()
+        self.zobrist_key = self.compute_zobrist_key()
+
+    def compute_zobrist_key(self):
+        """
+        Computes the position's key from scratch. The incrementally maintained zobrist_key should always match it.
+        """
+        key = 0
+        for piece_index, bitboard in enumerate(self.bitboards):
+            for index in iterate_bits(bitboard):
+                key ^= PIECE_KEYS[piece_index][index]
+        key ^= CASTLING_KEYS[self.castling_rights()]
+        en_passant_file = self.en_passant_file()
+        if en_passant_file is not None:
+            key ^= EN_PASSANT_KEYS[en_passant_file]
+        if self.current_player == Player.WHITE:
+            key ^= WHITE_TO_MOVE_KEY
+        return key
+
+    def castling_rights(self):
+        """
+        The castling rights still held, as a combination of the flags in chessington.engine.zobrist. A right is held
+        while the king and the rook are both on their starting squares and neither has moved.
+        """
+        rights = 0
+        for right, player, row, rook_col in CASTLING_ROOK_SQUARES:
+            king = self.board[row][4]
+            rook = self.board[row][rook_col]
+            if isinstance(king, King) and isinstance(rook, Rook) and king.player == player \
+                    and rook.player == player and not king.has_moved and not rook.has_moved:
+                rights |= right
+        return rights
+
+    def en_passant_file(self):
+        """
+        The file of a pawn that has just moved two squares, if the player to move has a pawn beside it that could
+        capture it en passant.
+        """
+        if not self.move_list:
+            return None
+        last_move = self.move_list[-1]
+        if last_move.moved_piece_type != PAWN or abs(last_move.vertical_distance_moved()) != 2:
+            return None
+        row, col = last_move.square_to.row, last_move.square_to.col
+        pawns = self.bitboards[bitboard_index(self.current_player.value, PAWN)]
+        for adjacent_col in (col - 1, col + 1):
+            if 0 <= adjacent_col < BOARD_SIZE and pawns >> square_index(row, adjacent_col) & 1:
+                return col
+        return None
 
     def remove_en_passant_pawn(self):
-        if self.move_list[-1].is_en_passant():
-            self.set_piece(self.move_list[-2].square_to, None)
+        """
+        Removes the pawn captured by an en passant move, returning it.
+        """
+        last_move = self.move_list[-1]
+        if last_move.is_en_passant():
+            # The captured pawn is beside the capturing pawn's starting square
+            captured_square = Square.at(last_move.square_from.row, last_move.square_to.col)
+            captured_pawn = self.get_piece(captured_square)
+            self.set_piece(captured_square, None)
+            return captured_pawn
+        return None
 
     def castle_rook(self):
+        """
+        Moves the rook alongside a castling king, returning the squares it moved from and to.
+        """
         last_move = self.move_list[-1]
         if last_move.is_castle():
             if last_move.horizontal_distance_moved() > 0:
@@ -105,40 +501,87 @@ class Board:
 
             self.set_piece(rook_square_to, self.get_piece(rook_square_from))
             self.set_piece(rook_square_from, None)
+            return rook_square_from, rook_square_to
+        return None
 
     def promote_pawn(self):
         last_move = self.move_list[-1]
         if last_move.is_pawn_promotion():
-            self.set_piece(last_move.square_to, Queen(self.current_player))
+            promotion = PIECE_CLASSES[last_move.promotion_type]
+            self.set_piece(last_move.square_to, promotion(self.current_player))
+
+    @property
+    def occupied(self):
+        """
+        A bitboard of every occupied square.
+        """
+        return self.occupancy[0] | self.occupancy[1]
 
     def square_contains_opponent(self, square, player):
-        piece_on_square = self.get_piece(square)
-        return piece_on_square is not None and piece_on_square.player != player
+        return bool(self.occupancy[player.opponent().value] >> square.index & 1)
 
     def square_is_empty(self, square):
-        return self.get_piece(square) is None
+        return not (self.occupancy[0] | self.occupancy[1]) >> square.index & 1
+
+    def find_king(self, player):
+        """
+        Returns the square of the given player's king, or None if they have no king on the board.
+        """
+        kings = self.bitboards[bitboard_index(player.value, KING)]
+        if not kings:
+            return None
+        return SQUARES[lowest_bit_index(kings)]
+
+    def attacked_squares(self, player):
+        """
+        Returns a bitboard of every square attacked by the given player's pieces.
+        """
+        occupied = self.occupied
+        bitboards = self.bitboards
+        base = bitboard_index(player.value, PAWN)
+        attacks = 0
+        for square in iterate_bits(bitboards[base + PAWN]):
+            attacks |= PAWN_ATTACKS[player.value][square]
+        for square in iterate_bits(bitboards[base + KNIGHT]):
+            attacks |= KNIGHT_ATTACKS[square]
+        for square in iterate_bits(bitboards[base + BISHOP] | bitboards[base + QUEEN]):
+            attacks |= bishop_attacks(square, occupied)
+        for square in iterate_bits(bitboards[base + ROOK] | bitboards[base + QUEEN]):
+            attacks |= rook_attacks(square, occupied)
+        for square in iterate_bits(bitboards[base + KING]):
+            attacks |= KING_ATTACKS[square]
+        return attacks
+
+    def is_square_attacked(self, square, by_player):
+        """
+        Whether any of the given player's pieces attack the square.
+
+        Rather than generating the attacker's moves, this looks outwards from the square itself: a knight jump, pawn
+        diagonal, king step or the first piece along each line could hold an attacker of the matching type.
+        """
+        return self._index_is_attacked(square.index, by_player.value)
+
+    def _index_is_attacked(self, index, attacker_index):
+        return bool(attackers_to(self.bitboards, index, attacker_index, self.occupancy[0] | self.occupancy[1]))
 
     def king_is_in_check(self):
-        all_squares = self.get_all_squares()
-        opposing_pieces = []
-        current_king_square = None
-        for square in all_squares:
-            piece = self.get_piece(square)
-            if piece is not None and piece.player == self.current_player:
-                opposing_pieces.append(piece)
-            if isinstance(piece, King) and piece.player != self.current_player:
-                current_king_square = square
-        if current_king_square is None:
+        """
+        Whether the king of the player who has just moved is attacked by the player whose turn it now is.
+        """
+        kings = self.bitboards[bitboard_index(self.current_player.opponent().value, KING)]
+        if not kings:
             return False
-        for piece in opposing_pieces:
-            if current_king_square in piece.get_available_moves(self):
-                return True
-        return False
+        return self._index_is_attacked(lowest_bit_index(kings), self.current_player.value)
+
+    def is_in_check(self, player):
+        """
+        Whether the given player's king is attacked by the other player.
+        """
+        kings = self.bitboards[bitboard_index(player.value, KING)]
+        if not kings:
+            return False
+        return self._index_is_attacked(lowest_bit_index(kings), 1 - player.value)
 
     @staticmethod
     def get_all_squares():
-        all_squares = []
-        for row in range(BOARD_SIZE):
-            for col in range(BOARD_SIZE):
-                all_squares.append(Square.at(row, col))
-        return all_squares
+        return list(SQUARES)
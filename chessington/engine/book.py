@@ -0,0 +1,204 @@
+"""
+Opening books in the Polyglot format, and a builder that compiles them from PGN games.
+
+A Polyglot book is a file of 16-byte big-endian entries: the position key (64 bits), a move (16 bits), a weight
+(16 bits) and a learn value (32 bits), sorted by key. Board.zobrist_key uses the Polyglot random numbers, so a
+board's key can be looked up directly. Books are read through mmap and binary searched, so opening even a very
+large book reads nothing up front, and every process that opens the same book shares one copy in the page cache.
+"""
+import argparse
+import mmap
+import random
+import struct
+import sys
+from collections import namedtuple, defaultdict
+
+from chessington.engine.board import Board
+from chessington.engine.data import MOVE_CASTLE_FLAG, MOVE_TO_SHIFT, MOVE_SQUARE_MASK, move_promotion_type
+from chessington.engine.perft import move_name
+from chessington.engine.pgn import read_games, parse_san
+
+ENTRY = struct.Struct('>QHHI')
+_KEY = struct.Struct('>Q')
+MAX_WEIGHT = 0xFFFF
+DEFAULT_MAX_PLY = 24
+
+# A book move as a packed legal move, with its weight and learn value from the book
+BookMove = namedtuple('BookMove', ['move', 'weight', 'learn'])
+
+
+def polyglot_move(move):
+    """
+    The Polyglot encoding of a packed move: from and to squares as 6 bits each, with the promotion piece above
+    them. Castling is written as the king capturing its own rook.
+    """
+    from_index = move & MOVE_SQUARE_MASK
+    to_index = move >> MOVE_TO_SHIFT & MOVE_SQUARE_MASK
+    if move & MOVE_CASTLE_FLAG:
+        to_index = to_index & ~7 | (7 if to_index & 7 == 6 else 0)
+    # The promotion types knight to queen are 1 to 4 in both encodings
+    return move_promotion_type(move) << 12 | from_index << 6 | to_index
+
+
+class OpeningBook:
+    """
+    A Polyglot book opened for reading. Close it when done, or use it as a context manager. A book can be passed to
+    other processes, which open the same file again.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        size = self._file.seek(0, 2)
+        if size % ENTRY.size:
+            self._file.close()
+            raise ValueError(f'Not a Polyglot book: {path}')
+        self.entry_count = size // ENTRY.size
+        # An empty file can't be mapped, but it is a valid book with nothing in it
+        self._entries = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+
+    def __len__(self):
+        return self.entry_count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __reduce__(self):
+        return OpeningBook, (self.path,)
+
+    def close(self):
+        if isinstance(self._entries, mmap.mmap):
+            self._entries.close()
+        self._file.close()
+
+    def entries(self, key):
+        """
+        The (polyglot move, weight, learn) entries for a position key, in the order they are stored in the book.
+        """
+        entries = self._entries
+        low, high = 0, self.entry_count
+        while low < high:
+            middle = (low + high) // 2
+            if _KEY.unpack_from(entries, middle * ENTRY.size)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        found = []
+        while low < self.entry_count:
+            entry_key, move, weight, learn = ENTRY.unpack_from(entries, low * ENTRY.size)
+            if entry_key != key:
+                break
+            found.append((move, weight, learn))
+            low += 1
+        return found
+
+    def moves(self, board):
+        """
+        The book moves for the board's position as BookMoves, heaviest first. Entries that aren't legal moves here,
+        which can only come from a key collision or a broken book, are left out.
+        """
+        entries = self.entries(board.zobrist_key)
+        if not entries:
+            return []
+        legal_moves = {polyglot_move(move): move for move in board.legal_moves()}
+        book_moves = [BookMove(legal_moves[move], weight, learn) for move, weight, learn in entries
+                      if move in legal_moves]
+        book_moves.sort(key=lambda book_move: book_move.weight, reverse=True)
+        return book_moves
+
+    def choose(self, board, generator=random):
+        """
+        Picks one of the board's book moves at random in proportion to its weight, returning it as a packed move, or
+        None if the position isn't in the book.
+        """
+        book_moves = [book_move for book_move in self.moves(board) if book_move.weight > 0]
+        if not book_moves:
+            return None
+        return generator.choices([book_move.move for book_move in book_moves],
+                                 [book_move.weight for book_move in book_moves])[0]
+
+
+def _result_scores(result):
+    # Points for (white, black) per move played: two for a win and one for a draw, as Polyglot's builder gives
+    return {'1-0': (2, 0), '0-1': (0, 2), '1/2-1/2': (1, 1)}.get(result)
+
+
+def build_book(games, path, max_ply=DEFAULT_MAX_PLY):
+    """
+    Writes a Polyglot book of the moves played in the first max_ply plies of the given PgnGames. Each move is
+    weighted by the points its side scored in the games it was played in, two for a win and one for a draw; moves
+    that only ever lost are left out, and games without a result are skipped. A game stops contributing at its
+    first unreadable move. Returns the number of games used.
+    """
+    weights = defaultdict(lambda: defaultdict(int))
+    games_used = 0
+    start_board = Board.at_starting_position()
+    for game in games:
+        scores = _result_scores(game.headers.get('Result'))
+        if scores is None:
+            continue
+        try:
+            board = Board.from_fen(game.headers['FEN']) if 'FEN' in game.headers else start_board
+        except ValueError:
+            continue
+        games_used += 1
+        played = 0
+        for san in game.moves[:max_ply]:
+            try:
+                move = parse_san(board, san)
+            except ValueError:
+                break
+            score = scores[board.current_player.value]
+            if score:
+                weights[board.zobrist_key][polyglot_move(move)] += score
+            board.apply_move(move)
+            played += 1
+        # The starting board is reused from game to game
+        for _ in range(played):
+            board.unmake_move()
+
+    heaviest = max((weight for moves in weights.values() for weight in moves.values()), default=0)
+    scale = min(1.0, MAX_WEIGHT / heaviest) if heaviest else 1.0
+    with open(path, 'wb') as book:
+        for key in sorted(weights):
+            for move, weight in sorted(weights[key].items(), key=lambda item: item[1], reverse=True):
+                book.write(ENTRY.pack(key, move, max(1, int(weight * scale)), 0))
+    return games_used
+
+
+def build_book_from_pgn(pgn_paths, path, max_ply=DEFAULT_MAX_PLY):
+    """
+    Builds a book from the games in one or more PGN files, reading them one game at a time.
+    """
+    def games():
+        for pgn_path in pgn_paths:
+            with open(pgn_path, encoding='utf-8', errors='replace') as pgn:
+                yield from read_games(pgn)
+
+    return build_book(games(), path, max_ply)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Build or look up Polyglot opening books.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help='compile a book from PGN files')
+    build.add_argument('pgn', nargs='+', help='PGN files to read games from')
+    build.add_argument('-o', '--output', required=True, help='book file to write')
+    build.add_argument('--max-ply', type=int, default=DEFAULT_MAX_PLY, help='plies of each game to add to the book')
+    probe = commands.add_parser('probe', help='list the book moves for a position')
+    probe.add_argument('book', help='Polyglot book file')
+    probe.add_argument('--fen', help='position to look up (default: starting position)')
+    options = parser.parse_args(args)
+
+    if options.command == 'build':
+        games_used = build_book_from_pgn(options.pgn, options.output, options.max_ply)
+        print(f'Games: {games_used}', file=sys.stderr)
+        return
+
+    board = Board.from_fen(options.fen) if options.fen else Board.at_starting_position()
+    with OpeningBook(options.book) as book:
+        for book_move in book.moves(board):
+            print(f'{move_name(book_move.move)} {book_move.weight}')
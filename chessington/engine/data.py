@@ -1,18 +1,17 @@
 """
 Data classes for easy representation of concepts such as a square on the board or a player.
 """
-import chessington.engine.board as board_module
+from enum import Enum
 
-from dataclasses import dataclass
-from enum import Enum, auto
+from chessington.engine.bitboards import BOARD_SIZE, PAWN, QUEEN, KING
 
 
 class Player(Enum):
     """
-    The two players in a game of chess.
+    The two players in a game of chess. The values double as indexes into per-player bitboard lists.
     """
-    WHITE = auto()
-    BLACK = auto()
+    WHITE = 0
+    BLACK = 1
 
     def opponent(self):
         if self == Player.WHITE:
@@ -21,10 +20,31 @@ class Player(Enum):
             return Player.WHITE
 
 
-@dataclass(frozen=True)
 class Square:
-    row: int
-    col: int
+    """
+    A square on the board, identified by row and column.
+
+    The 64 squares on the board are created once and shared, so Square.at(row, col) and Square(row, col) return the
+    same instance every time and each carries its index (row * 8 + col). Squares off the edge of the board can still
+    be created, for bounds checks, but are not shared and have no index.
+    """
+
+    __slots__ = ('row', 'col', 'index', '_hash')
+
+    def __new__(cls, row: int, col: int):
+        if 0 <= row < BOARD_SIZE and 0 <= col < BOARD_SIZE:
+            return SQUARES[row * BOARD_SIZE + col]
+        return cls._create(row, col)
+
+    @classmethod
+    def _create(cls, row, col):
+        square = object.__new__(cls)
+        on_board = 0 <= row < BOARD_SIZE and 0 <= col < BOARD_SIZE
+        object.__setattr__(square, 'row', row)
+        object.__setattr__(square, 'col', col)
+        object.__setattr__(square, 'index', row * BOARD_SIZE + col if on_board else None)
+        object.__setattr__(square, '_hash', row * BOARD_SIZE + col if on_board else hash((row, col)))
+        return square
 
     @classmethod
     def at(cls, row: int, col: int):
@@ -34,19 +54,140 @@ class Square:
         Square.at(...) is equivalent to Square(...).
         """
 
-        return cls(row=row, col=col)
+        return cls(row, col)
 
     def is_on_board(self):
-        return 0 <= self.row < board_module.BOARD_SIZE and 0 <= self.col < board_module.BOARD_SIZE
+        return self.index is not None
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if not isinstance(other, Square):
+            return NotImplemented
+        return self.row == other.row and self.col == other.col
+
+    def __hash__(self):
+        return self._hash
+
+    def __repr__(self):
+        return f'Square(row={self.row}, col={self.col})'
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Squares are immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError('Squares are immutable')
+
+    def __reduce__(self):
+        return Square, (self.row, self.col)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+# SQUARES[index] is the shared Square with the given index
+SQUARES = tuple(Square._create(row, col) for row in range(BOARD_SIZE) for col in range(BOARD_SIZE))
+
+
+# Moves are packed into ints: the from and to square indexes, the promotion piece type (0 if the move is not a
+# promotion), the type of the moving piece, the type of any captured piece plus one (0 if nothing is captured), and
+# flags marking castling and en passant.
+MOVE_SQUARE_MASK = 0x3F
+MOVE_TO_SHIFT = 6
+MOVE_PROMOTION_SHIFT = 12
+MOVE_PIECE_SHIFT = 15
+MOVE_CAPTURED_SHIFT = 18
+MOVE_CASTLE_FLAG = 1 << 21
+MOVE_EN_PASSANT_FLAG = 1 << 22
+
+
+def encode_move(from_index, to_index, piece_type, captured_type=None, promotion_type=0, flags=0):
+    captured = 0 if captured_type is None else captured_type + 1
+    return from_index | to_index << MOVE_TO_SHIFT | promotion_type << MOVE_PROMOTION_SHIFT \
+        | piece_type << MOVE_PIECE_SHIFT | captured << MOVE_CAPTURED_SHIFT | flags
+
+
+def move_from_index(move):
+    return move & MOVE_SQUARE_MASK
+
+
+def move_to_index(move):
+    return move >> MOVE_TO_SHIFT & MOVE_SQUARE_MASK
+
+
+def move_promotion_type(move):
+    return move >> MOVE_PROMOTION_SHIFT & 7
+
+
+def move_piece_type(move):
+    return move >> MOVE_PIECE_SHIFT & 7
+
+
+def move_captured_type(move):
+    """
+    The type of the piece the move captures, or None if it captures nothing.
+    """
+    captured = move >> MOVE_CAPTURED_SHIFT & 7
+    return captured - 1 if captured else None
 
 
 class Move:
+    """
+    A move that has been played, held as a single packed int (see encode_move) rather than copies of the pieces
+    involved.
+    """
+
+    __slots__ = ('code',)
 
-    def __init__(self, attacking_piece, defending_piece, square_from, square_to):
-        self.attacking_piece = attacking_piece
-        self.defending_piece = defending_piece
-        self.square_from = square_from
-        self.square_to = square_to
+    def __init__(self, attacking_piece, defending_piece, square_from, square_to, promotion=None):
+        """
+        Describes the attacking piece moving between the squares, capturing the defending piece if there is one.
+        A pawn reaching the far side is promoted to the given piece class, or a Queen by default.
+        """
+        piece_type = attacking_piece.piece_type
+        captured_type = None if defending_piece is None else defending_piece.piece_type
+        promotion_type = 0
+        flags = 0
+        vertical_distance = square_to.row - square_from.row
+        horizontal_distance = square_to.col - square_from.col
+        if piece_type == PAWN:
+            if defending_piece is None and horizontal_distance != 0:
+                flags |= MOVE_EN_PASSANT_FLAG
+                captured_type = PAWN
+            if square_to.row == (BOARD_SIZE - 1 if vertical_distance > 0 else 0):
+                promotion_type = QUEEN if promotion is None else promotion.piece_type
+        elif piece_type == KING and abs(horizontal_distance) == 2:
+            flags |= MOVE_CASTLE_FLAG
+        self.code = encode_move(square_from.index, square_to.index, piece_type, captured_type, promotion_type, flags)
+
+    @classmethod
+    def from_code(cls, code):
+        move = object.__new__(cls)
+        move.code = code
+        return move
+
+    @property
+    def square_from(self):
+        return SQUARES[self.code & MOVE_SQUARE_MASK]
+
+    @property
+    def square_to(self):
+        return SQUARES[self.code >> MOVE_TO_SHIFT & MOVE_SQUARE_MASK]
+
+    @property
+    def moved_piece_type(self):
+        return move_piece_type(self.code)
+
+    @property
+    def captured_piece_type(self):
+        return move_captured_type(self.code)
+
+    @property
+    def promotion_type(self):
+        return move_promotion_type(self.code)
 
     def vertical_distance_moved(self):
         return self.square_to.row - self.square_from.row
@@ -55,19 +196,21 @@ class Move:
         return self.square_to.col - self.square_from.col
 
     def is_en_passant(self):
-        import chessington.engine.pieces as pieces
-        return isinstance(self.attacking_piece, pieces.Pawn) and self.defending_piece is None \
-               and self.horizontal_distance_moved() != 0
+        return bool(self.code & MOVE_EN_PASSANT_FLAG)
 
     def is_castle(self):
-        import chessington.engine.pieces as pieces
-        return isinstance(self.attacking_piece, pieces.King) and abs(self.horizontal_distance_moved()) == 2
+        return bool(self.code & MOVE_CASTLE_FLAG)
 
     def is_pawn_promotion(self):
-        import chessington.engine.pieces as pieces
-        if isinstance(self.attacking_piece, pieces.Pawn):
-            if self.vertical_distance_moved() > 0:
-                return self.square_to.row == board_module.BOARD_SIZE - 1
-            else:
-                return self.square_to.row == 0
-        return False
+        return bool(self.code >> MOVE_PROMOTION_SHIFT & 7)
+
+    def __eq__(self, other):
+        if not isinstance(other, Move):
+            return NotImplemented
+        return self.code == other.code
+
+    def __hash__(self):
+        return hash(self.code)
+
+    def __repr__(self):
+        return f'Move({self.square_from!r} -> {self.square_to!r}, code={self.code:#x})'
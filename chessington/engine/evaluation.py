@@ -0,0 +1,162 @@
+"""
+Static evaluation of a position, in centipawns.
+
+Each piece is worth its material value plus a bonus for the square it stands on, with separate middlegame and
+endgame values. The board keeps the sum of each, and a game phase counting the remaining knights, bishops, rooks and
+queens, up to date as pieces are placed and removed, so evaluating a position only has to blend the two sums.
+
+Set CHESSINGTON_DEBUG_EVALUATION=1 (or DEBUG to True) to check every evaluation against a full recompute.
+"""
+import os
+
+from chessington.engine.bitboards import BOARD_SIZE, SQUARE_COUNT, PIECE_TYPE_COUNT, iterate_bits
+
+DEBUG = bool(os.environ.get('CHESSINGTON_DEBUG_EVALUATION'))
+
+# Indexed by piece type. The king is never captured, so it is given no material value.
+PIECE_VALUES = (100, 320, 330, 500, 900, 0)
+ENDGAME_PIECE_VALUES = (120, 300, 320, 520, 920, 0)
+
+# How much each piece type counts towards the game phase. MAX_PHASE is the total at the start of the game.
+PHASE_WEIGHTS = (0, 1, 1, 2, 4, 0)
+MAX_PHASE = 24
+
+# Square bonuses for white, laid out as the board is seen from white's side: the first row of each table is the
+# eighth rank. Black uses the same tables flipped top to bottom.
+_PAWN_MIDGAME = (
+    0, 0, 0, 0, 0, 0, 0, 0,
+    50, 50, 50, 50, 50, 50, 50, 50,
+    10, 10, 20, 30, 30, 20, 10, 10,
+    5, 5, 10, 25, 25, 10, 5, 5,
+    0, 0, 0, 20, 20, 0, 0, 0,
+    5, -5, -10, 0, 0, -10, -5, 5,
+    5, 10, 10, -20, -20, 10, 10, 5,
+    0, 0, 0, 0, 0, 0, 0, 0,
+)
+_PAWN_ENDGAME = (
+    0, 0, 0, 0, 0, 0, 0, 0,
+    80, 80, 80, 80, 80, 80, 80, 80,
+    50, 50, 50, 50, 50, 50, 50, 50,
+    30, 30, 30, 30, 30, 30, 30, 30,
+    15, 15, 15, 15, 15, 15, 15, 15,
+    5, 5, 5, 5, 5, 5, 5, 5,
+    0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0,
+)
+_KNIGHT = (
+    -50, -40, -30, -30, -30, -30, -40, -50,
+    -40, -20, 0, 0, 0, 0, -20, -40,
+    -30, 0, 10, 15, 15, 10, 0, -30,
+    -30, 5, 15, 20, 20, 15, 5, -30,
+    -30, 0, 15, 20, 20, 15, 0, -30,
+    -30, 5, 10, 15, 15, 10, 5, -30,
+    -40, -20, 0, 5, 5, 0, -20, -40,
+    -50, -40, -30, -30, -30, -30, -40, -50,
+)
+_BISHOP = (
+    -20, -10, -10, -10, -10, -10, -10, -20,
+    -10, 0, 0, 0, 0, 0, 0, -10,
+    -10, 0, 5, 10, 10, 5, 0, -10,
+    -10, 5, 5, 10, 10, 5, 5, -10,
+    -10, 0, 10, 10, 10, 10, 0, -10,
+    -10, 10, 10, 10, 10, 10, 10, -10,
+    -10, 5, 0, 0, 0, 0, 5, -10,
+    -20, -10, -10, -10, -10, -10, -10, -20,
+)
+_ROOK = (
+    0, 0, 0, 0, 0, 0, 0, 0,
+    5, 10, 10, 10, 10, 10, 10, 5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    0, 0, 0, 5, 5, 0, 0, 0,
+)
+_QUEEN = (
+    -20, -10, -10, -5, -5, -10, -10, -20,
+    -10, 0, 0, 0, 0, 0, 0, -10,
+    -10, 0, 5, 5, 5, 5, 0, -10,
+    -5, 0, 5, 5, 5, 5, 0, -5,
+    0, 0, 5, 5, 5, 5, 0, -5,
+    -10, 5, 5, 5, 5, 5, 0, -10,
+    -10, 0, 5, 0, 0, 0, 0, -10,
+    -20, -10, -10, -5, -5, -10, -10, -20,
+)
+_KING_MIDGAME = (
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -20, -30, -30, -40, -40, -30, -30, -20,
+    -10, -20, -20, -20, -20, -20, -20, -10,
+    20, 20, 0, 0, 0, 0, 20, 20,
+    20, 30, 10, 0, 0, 10, 30, 20,
+)
+_KING_ENDGAME = (
+    -50, -40, -30, -20, -20, -30, -40, -50,
+    -30, -20, -10, 0, 0, -10, -20, -30,
+    -30, -10, 20, 30, 30, 20, -10, -30,
+    -30, -10, 30, 40, 40, 30, -10, -30,
+    -30, -10, 30, 40, 40, 30, -10, -30,
+    -30, -10, 20, 30, 30, 20, -10, -30,
+    -30, -30, 0, 0, 0, 0, -30, -30,
+    -50, -30, -30, -30, -30, -30, -30, -50,
+)
+_MIDGAME_SQUARE_BONUSES = (_PAWN_MIDGAME, _KNIGHT, _BISHOP, _ROOK, _QUEEN, _KING_MIDGAME)
+_ENDGAME_SQUARE_BONUSES = (_PAWN_ENDGAME, _KNIGHT, _BISHOP, _ROOK, _QUEEN, _KING_ENDGAME)
+
+
+def _build_tables(piece_values, square_bonuses):
+    tables = []
+    for player_index, sign in ((0, 1), (1, -1)):
+        for piece_type in range(PIECE_TYPE_COUNT):
+            table = []
+            for index in range(SQUARE_COUNT):
+                row, col = divmod(index, BOARD_SIZE)
+                layout_row = BOARD_SIZE - 1 - row if player_index == 0 else row
+                table.append(sign * (piece_values[piece_type] + square_bonuses[piece_type][layout_row * 8 + col]))
+            tables.append(tuple(table))
+    return tuple(tables)
+
+
+# MIDGAME_TABLES[bitboard_index][square] is what a piece on the square adds to the middlegame score, from white's
+# point of view: material plus square bonus, negated for black pieces. ENDGAME_TABLES is the same for the endgame.
+MIDGAME_TABLES = _build_tables(PIECE_VALUES, _MIDGAME_SQUARE_BONUSES)
+ENDGAME_TABLES = _build_tables(ENDGAME_PIECE_VALUES, _ENDGAME_SQUARE_BONUSES)
+
+
+def compute_scores(bitboards):
+    """
+    Works out the middlegame score, endgame score and game phase from scratch. The board's incrementally maintained
+    midgame_score, endgame_score and phase should always match them.
+    """
+    midgame_score = endgame_score = phase = 0
+    for piece_index, bitboard in enumerate(bitboards):
+        for index in iterate_bits(bitboard):
+            midgame_score += MIDGAME_TABLES[piece_index][index]
+            endgame_score += ENDGAME_TABLES[piece_index][index]
+            phase += PHASE_WEIGHTS[piece_index % PIECE_TYPE_COUNT]
+    return midgame_score, endgame_score, phase
+
+
+def evaluate(board):
+    """
+    Scores the position from the point of view of the player to move: positive when they are ahead.
+    """
+    if DEBUG:
+        check_evaluation(board)
+    # Promotions can take the phase past its starting total
+    phase = min(board.phase, MAX_PHASE)
+    score = (board.midgame_score * phase + board.endgame_score * (MAX_PHASE - phase)) // MAX_PHASE
+    return score if board.current_player.value == 0 else -score
+
+
+def check_evaluation(board):
+    """
+    Raises an AssertionError if the board's incremental scores have drifted from a full recompute.
+    """
+    expected = compute_scores(board.bitboards)
+    actual = (board.midgame_score, board.endgame_score, board.phase)
+    if actual != expected:
+        raise AssertionError(f'Incremental evaluation {actual} does not match recomputed {expected}')
@@ -0,0 +1,60 @@
+"""
+Static exchange evaluation (SEE): the material a capture wins or loses once every recapture on its square has been
+played out, worked out from the attackers of that square without making any moves.
+"""
+from chessington.engine.bitboards import PAWN, KING, PIECE_TYPE_COUNT, attackers_to, lowest_bit_index
+from chessington.engine.data import MOVE_SQUARE_MASK, MOVE_TO_SHIFT, MOVE_EN_PASSANT_FLAG, move_captured_type, \
+    move_piece_type, move_promotion_type
+from chessington.engine.evaluation import PIECE_VALUES
+
+# A king can capture too, but never into a square that is still attacked, which a huge value makes sure of
+EXCHANGE_VALUES = PIECE_VALUES[:KING] + (20000,)
+
+
+def static_exchange_evaluation(board, move):
+    """
+    The material the player to move gains from the packed move if both sides keep recapturing on its destination
+    with their least valuable piece, each stopping when recapturing would lose material. Negative for a capture that
+    loses material.
+    """
+    from_index = move & MOVE_SQUARE_MASK
+    to_index = move >> MOVE_TO_SHIFT & MOVE_SQUARE_MASK
+    captured_type = move_captured_type(move)
+    promotion_type = move_promotion_type(move)
+    bitboards = board.bitboards
+
+    occupied = (board.occupancy[0] | board.occupancy[1]) ^ (1 << from_index)
+    if move & MOVE_EN_PASSANT_FLAG:
+        # The captured pawn stands beside the capturing pawn, not on the destination
+        occupied ^= 1 << (from_index & ~7 | to_index & 7)
+
+    gains = [EXCHANGE_VALUES[captured_type] if captured_type is not None else 0]
+    piece_on_square = move_piece_type(move)
+    if promotion_type:
+        gains[0] += EXCHANGE_VALUES[promotion_type] - EXCHANGE_VALUES[PAWN]
+        piece_on_square = promotion_type
+
+    side = 1 - board.current_player.value
+    while True:
+        # Pieces already used in the exchange are gone from occupied, uncovering any sliders behind them
+        attackers = attackers_to(bitboards, to_index, side, occupied) & occupied
+        if not attackers:
+            break
+        base = side * PIECE_TYPE_COUNT
+        for piece_type in range(PIECE_TYPE_COUNT):
+            least_valuable = attackers & bitboards[base + piece_type]
+            if least_valuable:
+                break
+        gains.append(EXCHANGE_VALUES[piece_on_square] - gains[-1])
+        if max(-gains[-2], gains[-1]) < 0:
+            # Neither side can do better by carrying on
+            break
+        occupied ^= 1 << lowest_bit_index(least_valuable)
+        piece_on_square = piece_type
+        side = 1 - side
+
+    # Each side may stop recapturing when carrying on would cost them, so fold the gains back from the end
+    while len(gains) > 1:
+        last_gain = gains.pop()
+        gains[-1] = -max(-gains[-1], last_gain)
+    return gains[0]
@@ -0,0 +1,173 @@
+"""
+Reading and writing positions in Forsyth-Edwards Notation (FEN).
+
+Parsing builds the grid of pieces directly from lookup tables, without going through Board.set_piece, so that test
+suites and position databases can be loaded in bulk. Board.from_fen and Board.to_fen are the usual entry points.
+"""
+from collections import namedtuple
+
+from chessington.engine.bitboards import BOARD_SIZE, PAWN
+from chessington.engine.data import Player
+from chessington.engine.pieces import Pawn, Knight, Bishop, Rook, Queen, King
+from chessington.engine.zobrist import WHITE_KING_SIDE, WHITE_QUEEN_SIDE, BLACK_KING_SIDE, BLACK_QUEEN_SIDE
+
+STARTING_FEN = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1'
+
+PIECES_BY_LETTER = {'p': Pawn, 'n': Knight, 'b': Bishop, 'r': Rook, 'q': Queen, 'k': King}
+PIECE_LETTERS = 'pnbrqk'
+
+# The piece class and player for each letter, and the number of empty squares for each digit
+_PLACEMENT_CHARACTERS = dict(
+    [(letter, (piece_class, Player.BLACK)) for letter, piece_class in PIECES_BY_LETTER.items()]
+    + [(letter.upper(), (piece_class, Player.WHITE)) for letter, piece_class in PIECES_BY_LETTER.items()]
+    + [(str(count), count) for count in range(1, BOARD_SIZE + 1)])
+
+# The king's row and the rook's column for each castling letter
+CASTLING_ROOKS = {
+    'K': (Player.WHITE, 0, 7),
+    'Q': (Player.WHITE, 0, 0),
+    'k': (Player.BLACK, 7, 7),
+    'q': (Player.BLACK, 7, 0),
+}
+CASTLING_LETTERS = ((WHITE_KING_SIDE, 'K'), (WHITE_QUEEN_SIDE, 'Q'), (BLACK_KING_SIDE, 'k'), (BLACK_QUEEN_SIDE, 'q'))
+
+# The parsed layout of recently seen rows, keyed by (row, text)
+_ROW_LAYOUTS = {}
+_ROW_LAYOUT_CACHE_SIZE = 100000
+
+_SIDES_TO_MOVE = {'w': Player.WHITE, 'b': Player.BLACK}
+_FILES = 'abcdefgh'
+
+# The parts of a FEN string. en_passant is the (row, col) of the square a pawn can capture onto, or None.
+FenPosition = namedtuple('FenPosition', ['grid', 'player', 'en_passant', 'halfmove_clock', 'fullmove_number'])
+
+
+def parse_fen(fen):
+    """
+    Splits a FEN string into its parts, with the piece placement as an 8x8 grid of new pieces.
+
+    Castling rights are expressed through has_moved: a king or rook keeps has_moved False only if it is on its
+    starting square and a castling right depends on it. Pawns count as moved once they leave their starting row.
+    The halfmove clock and fullmove number are optional and default to 0 and 1.
+    """
+    fields = fen.split()
+    if not 4 <= len(fields) <= 6:
+        raise ValueError(f'Not a valid FEN: {fen!r}')
+    placement, side_to_move, castling, en_passant = fields[:4]
+
+    rows = placement.split('/')
+    if len(rows) != BOARD_SIZE:
+        raise ValueError(f'Not a valid FEN: {fen!r}')
+    grid = []
+    # FEN lists the rows from the top of the board down
+    for row, row_text in enumerate(reversed(rows)):
+        row_layout = _ROW_LAYOUTS.get((row, row_text))
+        if row_layout is None:
+            row_layout = _parse_row(row, row_text, fen)
+        grid.append([None if square is None else _create_piece(*square) for square in row_layout])
+
+    player = _SIDES_TO_MOVE.get(side_to_move)
+    if player is None:
+        raise ValueError(f'Not a valid FEN: {fen!r}')
+
+    if castling != '-':
+        for letter in castling:
+            if letter not in CASTLING_ROOKS:
+                raise ValueError(f'Not a valid FEN: {fen!r}')
+            castling_player, row, col = CASTLING_ROOKS[letter]
+            king, rook = grid[row][4], grid[row][col]
+            if isinstance(king, King) and king.player == castling_player \
+                    and isinstance(rook, Rook) and rook.player == castling_player:
+                king.has_moved = False
+                rook.has_moved = False
+
+    if en_passant == '-':
+        en_passant_square = None
+    elif len(en_passant) == 2 and en_passant[0] in _FILES and en_passant[1] in '36':
+        en_passant_square = (int(en_passant[1]) - 1, _FILES.index(en_passant[0]))
+    else:
+        raise ValueError(f'Not a valid FEN: {fen!r}')
+
+    try:
+        halfmove_clock = int(fields[4]) if len(fields) > 4 else 0
+        fullmove_number = int(fields[5]) if len(fields) > 5 else 1
+    except ValueError:
+        raise ValueError(f'Not a valid FEN: {fen!r}') from None
+
+    return FenPosition(grid, player, en_passant_square, halfmove_clock, fullmove_number)
+
+
+def _parse_row(row, row_text, fen):
+    """
+    Works out the (piece class, player, has_moved) to place on each square of one row, remembering the answer since
+    the same rows turn up again and again in a collection of positions.
+    """
+    row_layout = []
+    for character in row_text:
+        entry = _PLACEMENT_CHARACTERS.get(character)
+        if entry is None:
+            raise ValueError(f'Not a valid FEN: {fen!r}')
+        if entry.__class__ is int:
+            row_layout.extend([None] * entry)
+        else:
+            piece_class, player = entry
+            # Only pawns on their starting row, and kings and rooks with castling rights, can count as unmoved
+            has_moved = piece_class is not Pawn or row != (1 if player == Player.WHITE else BOARD_SIZE - 2)
+            row_layout.append((piece_class, player, has_moved))
+    if len(row_layout) != BOARD_SIZE:
+        raise ValueError(f'Not a valid FEN: {fen!r}')
+    if len(_ROW_LAYOUTS) >= _ROW_LAYOUT_CACHE_SIZE:
+        _ROW_LAYOUTS.clear()
+    row_layout = tuple(row_layout)
+    _ROW_LAYOUTS[row, row_text] = row_layout
+    return row_layout
+
+
+def _create_piece(piece_class, player, has_moved):
+    piece = piece_class(player)
+    piece.has_moved = has_moved
+    return piece
+
+
+def format_fen(board):
+    """
+    Writes out the board's position as a FEN string.
+
+    The en passant square is given after every two-square pawn move, whether or not a capture is possible.
+    """
+    return format_position(board.board, board.current_player, board.castling_rights(),
+                           board.move_list[-1] if board.move_list else None, board.halfmove_clock,
+                           board.fullmove_number)
+
+
+def format_position(grid, player, castling_rights, last_move, halfmove_clock, fullmove_number):
+    """
+    Writes out a position given by its parts as a FEN string: the grid of pieces, the player to move, the castling
+    rights as flags, the Move that led to the position (or None), and the move counters.
+    """
+    rows = []
+    for pieces in reversed(grid):
+        row_text = ''
+        empty_count = 0
+        for piece in pieces:
+            if piece is None:
+                empty_count += 1
+                continue
+            if empty_count:
+                row_text += str(empty_count)
+                empty_count = 0
+            letter = PIECE_LETTERS[piece.piece_type]
+            row_text += letter.upper() if piece.player == Player.WHITE else letter
+        if empty_count:
+            row_text += str(empty_count)
+        rows.append(row_text)
+
+    castling = ''.join(letter for right, letter in CASTLING_LETTERS if castling_rights & right) or '-'
+
+    en_passant = '-'
+    if last_move is not None and last_move.moved_piece_type == PAWN and abs(last_move.vertical_distance_moved()) == 2:
+        row = (last_move.square_from.row + last_move.square_to.row) // 2
+        en_passant = f'{_FILES[last_move.square_to.col]}{row + 1}'
+
+    side_to_move = 'w' if player == Player.WHITE else 'b'
+    return f'{"/".join(rows)} {side_to_move} {castling} {en_passant} {halfmove_clock} {fullmove_number}'
@@ -0,0 +1,221 @@
+"""
+Generation of every legal move for the player to move, in a single pass over the board's bitboards.
+
+Checking pieces and absolutely pinned pieces are found once up front, so no move has to be played out to test
+whether it leaves the king in check. Moves are returned in the packed int form described in chessington.engine.data.
+"""
+from chessington.engine.bitboards import PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, BOARD_SIZE, FULL_BOARD, \
+    STRAIGHT_DIRECTIONS, KNIGHT_ATTACKS, KING_ATTACKS, PAWN_ATTACKS, RAYS, BETWEEN, attackers_to, bishop_attacks, \
+    bitboard_index, iterate_bits, lowest_bit_index, nearest_bit_index, rook_attacks, square_index
+from chessington.engine.data import MOVE_TO_SHIFT, MOVE_PROMOTION_SHIFT, MOVE_PIECE_SHIFT, MOVE_CAPTURED_SHIFT, \
+    MOVE_CASTLE_FLAG, MOVE_EN_PASSANT_FLAG
+from chessington.engine.zobrist import WHITE_KING_SIDE, WHITE_QUEEN_SIDE, BLACK_KING_SIDE, BLACK_QUEEN_SIDE
+
+PROMOTION_TYPES = (QUEEN, KNIGHT, ROOK, BISHOP)
+
+# For each castling right: the king's starting square, the squares that must be empty, and the squares the king
+# crosses or lands on, which must not be attacked
+_CASTLING = {
+    WHITE_KING_SIDE: (square_index(0, 4), (square_index(0, 5), square_index(0, 6)),
+                      (square_index(0, 5), square_index(0, 6))),
+    WHITE_QUEEN_SIDE: (square_index(0, 4), (square_index(0, 1), square_index(0, 2), square_index(0, 3)),
+                       (square_index(0, 3), square_index(0, 2))),
+    BLACK_KING_SIDE: (square_index(7, 4), (square_index(7, 5), square_index(7, 6)),
+                      (square_index(7, 5), square_index(7, 6))),
+    BLACK_QUEEN_SIDE: (square_index(7, 4), (square_index(7, 1), square_index(7, 2), square_index(7, 3)),
+                       (square_index(7, 3), square_index(7, 2))),
+}
+_PLAYER_CASTLING_RIGHTS = ((WHITE_KING_SIDE, WHITE_QUEEN_SIDE), (BLACK_KING_SIDE, BLACK_QUEEN_SIDE))
+# The squares each slider could reach from each square on an empty board, for skipping sliders that can't reach any
+# of the destinations asked for
+_SLIDER_LINES = {
+    BISHOP: [bishop_attacks(index, 0) for index in range(BOARD_SIZE * BOARD_SIZE)],
+    ROOK: [rook_attacks(index, 0) for index in range(BOARD_SIZE * BOARD_SIZE)],
+    QUEEN: [bishop_attacks(index, 0) | rook_attacks(index, 0) for index in range(BOARD_SIZE * BOARD_SIZE)],
+}
+
+
+def find_pins(bitboards, king, own, attacker_index, occupied):
+    """
+    Maps each of the king's absolutely pinned pieces to the squares it may still move to: the line from the king up
+    to and including the pinning piece.
+    """
+    base = bitboard_index(attacker_index, PAWN)
+    straight_sliders = bitboards[base + ROOK] | bitboards[base + QUEEN]
+    diagonal_sliders = bitboards[base + BISHOP] | bitboards[base + QUEEN]
+    pins = {}
+    for direction, rays in enumerate(RAYS):
+        sliders = straight_sliders if direction in STRAIGHT_DIRECTIONS else diagonal_sliders
+        ray = rays[king]
+        if not ray & sliders:
+            continue
+        first_blocker = nearest_bit_index(ray & occupied, direction)
+        if not own >> first_blocker & 1:
+            continue
+        beyond = rays[first_blocker] & occupied
+        if not beyond:
+            continue
+        second_blocker = nearest_bit_index(beyond, direction)
+        if sliders >> second_blocker & 1:
+            pins[first_blocker] = ray & ~rays[second_blocker]
+    return pins
+
+
+def en_passant_capture_square(board):
+    """
+    The index of the pawn that can be captured en passant, or None if the last move was not a two-square pawn move.
+    """
+    if not board.move_list:
+        return None
+    last_move = board.move_list[-1]
+    if last_move.moved_piece_type != PAWN or abs(last_move.vertical_distance_moved()) != 2:
+        return None
+    return last_move.square_to.index
+
+
+def generate_legal_moves(board, captures_only=False, destinations=FULL_BOARD):
+    """
+    Every legal move for the player to move. With captures_only, just the captures (en passant included) and
+    promotions. Only moves to the squares in the destinations bitboard are generated, which saves most of the work
+    when looking for the moves to one square.
+    """
+    player_index = board.current_player.value
+    opponent_index = 1 - player_index
+    bitboards = board.bitboards
+    grid = board.board
+    own = board.occupancy[player_index]
+    enemy = board.occupancy[opponent_index]
+    occupied = own | enemy
+    base = bitboard_index(player_index, PAWN)
+    moves = []
+
+    kings = bitboards[base + KING]
+    if kings:
+        king = lowest_bit_index(kings)
+        checkers = attackers_to(bitboards, king, opponent_index, occupied)
+        pins = find_pins(bitboards, king, own, opponent_index, occupied)
+    else:
+        king = None
+        checkers = 0
+        pins = {}
+
+    def captured_bits(to_index):
+        piece = grid[to_index >> 3][to_index & 7]
+        return 0 if piece is None else (piece.piece_type + 1) << MOVE_CAPTURED_SHIFT
+
+    if king is not None:
+        piece_bits = KING << MOVE_PIECE_SHIFT
+        # The king must not be able to hide behind itself from a slider it is moving away from
+        occupied_without_king = occupied ^ (1 << king)
+        for to_index in iterate_bits(KING_ATTACKS[king] & (enemy if captures_only else ~own) & destinations):
+            if not attackers_to(bitboards, to_index, opponent_index, occupied_without_king):
+                moves.append(king | to_index << MOVE_TO_SHIFT | piece_bits | captured_bits(to_index))
+
+    if checkers & (checkers - 1):
+        # In double check only the king can move
+        return moves
+    if checkers:
+        target = (checkers | BETWEEN[king][lowest_bit_index(checkers)]) & destinations
+    else:
+        target = destinations
+        if not captures_only:
+            _add_castling_moves(board, moves, player_index, king, occupied, destinations)
+
+    _add_pawn_moves(board, moves, player_index, king, pins, target, occupied, enemy, captured_bits, captures_only,
+                    destinations)
+
+    not_own_targets = target & (enemy if captures_only else ~own)
+    piece_bits = KNIGHT << MOVE_PIECE_SHIFT
+    for from_index in iterate_bits(bitboards[base + KNIGHT]):
+        if from_index in pins:
+            continue
+        for to_index in iterate_bits(KNIGHT_ATTACKS[from_index] & not_own_targets):
+            moves.append(from_index | to_index << MOVE_TO_SHIFT | piece_bits | captured_bits(to_index))
+
+    for piece_type in (BISHOP, ROOK, QUEEN):
+        piece_bits = piece_type << MOVE_PIECE_SHIFT
+        lines = _SLIDER_LINES[piece_type]
+        for from_index in iterate_bits(bitboards[base + piece_type]):
+            if not lines[from_index] & target:
+                continue
+            if piece_type == BISHOP:
+                attacks = bishop_attacks(from_index, occupied)
+            elif piece_type == ROOK:
+                attacks = rook_attacks(from_index, occupied)
+            else:
+                attacks = bishop_attacks(from_index, occupied) | rook_attacks(from_index, occupied)
+            attacks &= not_own_targets & pins.get(from_index, FULL_BOARD)
+            for to_index in iterate_bits(attacks):
+                moves.append(from_index | to_index << MOVE_TO_SHIFT | piece_bits | captured_bits(to_index))
+
+    return moves
+
+
+def _add_castling_moves(board, moves, player_index, king, occupied, destinations):
+    rights = None
+    for right in _PLAYER_CASTLING_RIGHTS[player_index]:
+        king_square, empty_squares, king_path = _CASTLING[right]
+        if not destinations >> king_path[-1] & 1:
+            continue
+        if rights is None:
+            rights = board.castling_rights()
+        if not rights & right:
+            continue
+        if king != king_square or any(occupied >> index & 1 for index in empty_squares):
+            continue
+        if any(attackers_to(board.bitboards, index, 1 - player_index, occupied) for index in king_path):
+            continue
+        moves.append(king | king_path[-1] << MOVE_TO_SHIFT | KING << MOVE_PIECE_SHIFT | MOVE_CASTLE_FLAG)
+
+
+def _add_pawn_moves(board, moves, player_index, king, pins, target, occupied, enemy, captured_bits, captures_only,
+                    destination_mask):
+    bitboards = board.bitboards
+    pawns = bitboards[bitboard_index(player_index, PAWN)]
+    forward = BOARD_SIZE if player_index == 0 else -BOARD_SIZE
+    start_row = 1 if player_index == 0 else BOARD_SIZE - 2
+    promotion_row = BOARD_SIZE - 1 if player_index == 0 else 0
+    piece_bits = PAWN << MOVE_PIECE_SHIFT
+
+    for from_index in iterate_bits(pawns):
+        if from_index >> 3 == promotion_row:
+            # Only reachable by placing a pawn there by hand; it has nowhere to go
+            continue
+        allowed = target & pins.get(from_index, FULL_BOARD)
+        if not allowed:
+            continue
+        destinations = []
+        to_index = from_index + forward
+        # Of the pushes, only those that promote are wanted alongside captures
+        if not occupied >> to_index & 1 and (not captures_only or to_index >> 3 == promotion_row):
+            if allowed >> to_index & 1:
+                destinations.append(to_index)
+            two_forward = to_index + forward
+            if from_index >> 3 == start_row and not occupied >> two_forward & 1 and allowed >> two_forward & 1:
+                destinations.append(two_forward)
+        destinations.extend(iterate_bits(PAWN_ATTACKS[player_index][from_index] & enemy & allowed))
+
+        for to_index in destinations:
+            move = from_index | to_index << MOVE_TO_SHIFT | piece_bits | captured_bits(to_index)
+            if to_index >> 3 == promotion_row:
+                for promotion_type in PROMOTION_TYPES:
+                    moves.append(move | promotion_type << MOVE_PROMOTION_SHIFT)
+            else:
+                moves.append(move)
+
+    captured_index = en_passant_capture_square(board)
+    if captured_index is None or not enemy >> captured_index & 1:
+        return
+    to_index = captured_index + forward
+    if occupied >> to_index & 1 or not destination_mask >> to_index & 1:
+        return
+    for from_index in iterate_bits(PAWN_ATTACKS[1 - player_index][to_index] & pawns):
+        if king is not None:
+            # Play the capture out on the occupancy alone, which catches pins, checks and the case where both pawns
+            # leave the king's row at once
+            occupied_after = occupied ^ (1 << from_index) ^ (1 << captured_index) | (1 << to_index)
+            attackers = attackers_to(bitboards, king, 1 - player_index, occupied_after) & ~(1 << captured_index)
+            if attackers:
+                continue
+        moves.append(from_index | to_index << MOVE_TO_SHIFT | piece_bits | (PAWN + 1) << MOVE_CAPTURED_SHIFT
+                     | MOVE_EN_PASSANT_FLAG)
@@ -0,0 +1,86 @@
+"""
+Move ordering for alpha-beta search, which prunes the most when the best move is tried first.
+
+Moves are tried in this order: the move stored in the transposition table, captures and queen promotions (most
+valuable victim first, then least valuable attacker), the two killer moves for the ply, and then the remaining
+quiet moves by their history score.
+"""
+import random
+
+from chessington.engine.bitboards import QUEEN, SQUARE_COUNT
+from chessington.engine.data import MOVE_PROMOTION_SHIFT, MOVE_PIECE_SHIFT, MOVE_CAPTURED_SHIFT
+
+# The deepest ply killer moves are kept for
+MAX_PLY = 128
+# The from and to square bits of a packed move, which index the history table
+FROM_TO_MASK = SQUARE_COUNT * SQUARE_COUNT - 1
+
+TABLE_MOVE_SCORE = 1 << 30
+CAPTURE_SCORE = 1 << 28
+KILLER_SCORE = 1 << 26
+# History scores are halved when one reaches this, so they stay below the killer moves and favour recent cutoffs
+HISTORY_LIMIT = 1 << 24
+# The largest random starting history score for a seeded MoveOrderer; a cutoff at depth 3 outweighs it
+HISTORY_JITTER = 8
+
+
+class MoveOrderer:
+    """
+    The killer moves and history table built up over a search, used to sort the moves at each node.
+
+    Given a seed, the history table starts with small random scores, which shuffles the order of quiet moves that
+    have not yet caused a cutoff. Parallel searches use this to send each worker down different lines.
+    """
+
+    def __init__(self, seed=None):
+        self.seed = seed
+        self.clear()
+
+    def order(self, moves, ply, table_move=0):
+        """
+        Sorts the packed moves in place, best first, and returns them.
+        """
+        first_killer, second_killer = self.killers[ply] if ply < MAX_PLY else (0, 0)
+        history = self.history
+
+        def score(move):
+            if move == table_move:
+                return TABLE_MOVE_SCORE
+            captured = move >> MOVE_CAPTURED_SHIFT & 7
+            promotion = move >> MOVE_PROMOTION_SHIFT & 7
+            if captured or promotion == QUEEN:
+                # Most valuable victim, least valuable attacker. captured is the victim's type plus one.
+                return CAPTURE_SCORE + (captured + promotion) * 8 - (move >> MOVE_PIECE_SHIFT & 7)
+            if move == first_killer:
+                return KILLER_SCORE + 1
+            if move == second_killer:
+                return KILLER_SCORE
+            return history[move & FROM_TO_MASK]
+
+        moves.sort(key=score, reverse=True)
+        return moves
+
+    def record_cutoff(self, move, ply, depth):
+        """
+        Remembers a move that caused a beta cutoff. Only quiet moves are recorded, as captures are already ordered
+        ahead of them.
+        """
+        if move >> MOVE_CAPTURED_SHIFT & 7 or move >> MOVE_PROMOTION_SHIFT & 7 == QUEEN:
+            return
+        if ply < MAX_PLY:
+            killers = self.killers[ply]
+            if killers[0] != move:
+                killers[1] = killers[0]
+                killers[0] = move
+        index = move & FROM_TO_MASK
+        self.history[index] += depth * depth
+        if self.history[index] >= HISTORY_LIMIT:
+            self.history = [value // 2 for value in self.history]
+
+    def clear(self):
+        self.killers = [[0, 0] for _ in range(MAX_PLY)]
+        if self.seed is None:
+            self.history = [0] * (FROM_TO_MASK + 1)
+        else:
+            generator = random.Random(self.seed)
+            self.history = [generator.randrange(HISTORY_JITTER) for _ in range(FROM_TO_MASK + 1)]
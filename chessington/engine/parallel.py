@@ -0,0 +1,142 @@
+"""
+Parallel search over several processes ("Lazy SMP").
+
+Every worker process searches the same root position with its own iterative deepening, and all of them share one
+transposition table held in shared memory. Half of the helper workers skip the first iteration, and each helper
+orders untried quiet moves differently, so they explore different lines and fill the table with results the others
+can reuse. When the first worker finishes the rest are told to stop, and the result of the deepest completed
+iteration across all workers is returned.
+
+Running ``chessington-smp-benchmark`` measures the time taken to reach a fixed depth with 1 to N workers.
+"""
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from chessington.engine.board import Board
+from chessington.engine.fen import STARTING_FEN
+from chessington.engine.ordering import MoveOrderer
+from chessington.engine.search import Searcher
+from chessington.engine.transposition import SharedTranspositionTable
+
+# Set in each worker process when the pool starts
+_stop_event = None
+# The shared tables each worker process has attached to, by name
+_attached_tables = {}
+
+
+def _initialise_worker(stop_event):
+    global _stop_event
+    _stop_event = stop_event
+
+
+def _search_worker(fen, moves, table_name, table_size_mb, worker_index, time_limit, depth, nodes):
+    table = _attached_tables.get(table_name)
+    if table is None:
+        table = _attached_tables[table_name] = SharedTranspositionTable.attach(table_name, table_size_mb)
+    if worker_index == 0:
+        orderer, start_depth = MoveOrderer(), 1
+    else:
+        orderer, start_depth = MoveOrderer(seed=worker_index), 1 + worker_index % 2
+    # Playing the game's moves from its starting position gives the worker the history that repetitions and the
+    # fifty-move rule are judged by
+    board = Board.from_fen(fen)
+    for move in moves:
+        board.apply_move(move)
+    searcher = Searcher(board, table, orderer, _stop_event)
+    return searcher.search(time_limit, depth, nodes, start_depth=start_depth)
+
+
+class ParallelSearcher:
+    """
+    A pool of worker processes and the shared transposition table they search into. The pool and table are kept
+    between searches, so create one for a game or an analysis session and close() it at the end.
+    """
+
+    def __init__(self, workers=None, size_mb=64):
+        self.workers = workers or os.cpu_count() or 1
+        self.transposition_table = SharedTranspositionTable(size_mb)
+        context = multiprocessing.get_context()
+        self._stop_event = context.Event()
+        self._executor = ProcessPoolExecutor(self.workers, mp_context=context, initializer=_initialise_worker,
+                                             initargs=(self._stop_event,))
+
+    def search(self, board, time_limit=None, depth=None, nodes=None):
+        """
+        Searches the board's position in every worker, returning a SearchResult as chessington.engine.search.search
+        does. nodes limits each worker separately. The result's nodes and nodes_per_second cover all workers, and its
+        statistics add the depth each worker reached.
+        """
+        self._stop_event.clear()
+        start = time.perf_counter()
+        fen = board.starting_fen()
+        moves = [move.code for move in board.played_moves()]
+        table = self.transposition_table
+        futures = [self._executor.submit(_search_worker, fen, moves, table.name, table.size_mb, worker_index,
+                                         time_limit, depth, nodes)
+                   for worker_index in range(self.workers)]
+        # The helpers only exist to speed up the first worker, so stop them as soon as it is done
+        first_result = futures[0].result()
+        self._stop_event.set()
+        results = [first_result] + [future.result() for future in futures[1:]]
+        elapsed = time.perf_counter() - start
+
+        # max keeps the earliest of equally deep results, which favours the first worker
+        best = max(results, key=lambda result: result.depth)
+        total_nodes = sum(result.nodes for result in results)
+        statistics = dict(best.statistics, workers=self.workers, worker_depths=[result.depth for result in results])
+        return best._replace(nodes=total_nodes, time=elapsed,
+                             nodes_per_second=int(total_nodes / elapsed) if elapsed > 0 else 0,
+                             statistics=statistics)
+
+    def close(self):
+        self._executor.shutdown()
+        self.transposition_table.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def parallel_search(board, workers=None, time_limit=None, depth=None, nodes=None, size_mb=64):
+    """
+    Runs a single search with a temporary pool of worker processes. Use ParallelSearcher to keep the pool and its
+    transposition table between searches.
+    """
+    with ParallelSearcher(workers, size_mb) as searcher:
+        return searcher.search(board, time_limit, depth, nodes)
+
+
+def benchmark(fen, depth, max_workers, size_mb=64):
+    """
+    Times a search to the given depth with 1 to max_workers workers, each starting from an empty table. Returns a
+    list of (workers, seconds, nodes) tuples.
+    """
+    timings = []
+    for workers in range(1, max_workers + 1):
+        with ParallelSearcher(workers, size_mb) as searcher:
+            # Start the worker processes before the clock does
+            searcher.search(Board.from_fen(fen), depth=1)
+            searcher.transposition_table.clear()
+            result = searcher.search(Board.from_fen(fen), depth=depth)
+        timings.append((workers, result.time, result.nodes))
+    return timings
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Measure how parallel search scales with the number of workers.')
+    parser.add_argument('depth', type=int, help='depth to search to')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='most workers to try')
+    parser.add_argument('--fen', default=STARTING_FEN, help='position to search (default: starting position)')
+    parser.add_argument('--hash', type=int, default=64, help='transposition table size in MB')
+    options = parser.parse_args(args)
+
+    timings = benchmark(options.fen, options.depth, options.workers, options.hash)
+    single_worker_time = timings[0][1]
+    print(f'{"Workers":>7} {"Time":>9} {"Nodes":>10} {"Speed-up":>8}')
+    for workers, seconds, nodes in timings:
+        print(f'{workers:>7} {seconds:>8.3f}s {nodes:>10} {single_worker_time / seconds:>7.2f}x')
@@ -0,0 +1,73 @@
+"""
+Performance testing ("perft") of move generation: counting every position reachable in a fixed number of moves.
+
+The counts for well-known positions are published, so they check that move generation is correct, and the time
+taken to reach them measures how fast it is.
+"""
+import argparse
+import time
+
+from chessington.engine.data import move_from_index, move_to_index, move_promotion_type
+from chessington.engine.board import Board
+from chessington.engine.fen import STARTING_FEN
+
+SQUARE_NAMES = [f'{"abcdefgh"[index % 8]}{index // 8 + 1}' for index in range(64)]
+PROMOTION_LETTERS = ['', 'n', 'b', 'r', 'q']
+
+
+def perft(board, depth):
+    """
+    Counts the leaf positions reachable from the board in exactly depth moves.
+    """
+    moves = board.legal_moves()
+    if depth <= 1:
+        return len(moves) if depth == 1 else 1
+    nodes = 0
+    for move in moves:
+        board.apply_move(move)
+        nodes += perft(board, depth - 1)
+        board.unmake_move()
+    return nodes
+
+
+def divide(board, depth):
+    """
+    Splits the perft count by first move, which narrows down where two move generators disagree.
+    """
+    counts = {}
+    for move in board.legal_moves():
+        board.apply_move(move)
+        counts[move_name(move)] = perft(board, depth - 1)
+        board.unmake_move()
+    return counts
+
+
+def move_name(move):
+    """
+    The move in long algebraic notation, e.g. e2e4 or e7e8q.
+    """
+    return SQUARE_NAMES[move_from_index(move)] + SQUARE_NAMES[move_to_index(move)] \
+        + PROMOTION_LETTERS[move_promotion_type(move)]
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Count the positions reachable from a chess position.')
+    parser.add_argument('depth', type=int, help='number of moves to search')
+    parser.add_argument('--fen', default=STARTING_FEN, help='position to start from (default: starting position)')
+    parser.add_argument('--divide', action='store_true', help='show the count below each first move')
+    options = parser.parse_args(args)
+
+    board = Board.from_fen(options.fen)
+    start = time.perf_counter()
+    if options.divide:
+        counts = divide(board, options.depth)
+        for name in sorted(counts):
+            print(f'{name}: {counts[name]}')
+        nodes = sum(counts.values())
+    else:
+        nodes = perft(board, options.depth)
+    elapsed = time.perf_counter() - start
+
+    print(f'Nodes: {nodes}')
+    print(f'Time: {elapsed:.3f}s')
+    print(f'Nodes per second: {nodes / elapsed if elapsed > 0 else 0:.0f}')
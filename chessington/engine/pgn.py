@@ -0,0 +1,239 @@
+"""
+Reading games in Portable Game Notation (PGN), turning their Standard Algebraic Notation (SAN) moves into the
+engine's moves, and replaying them.
+
+Games are read one at a time from a stream of lines, so a file of any size is read in constant memory. A game that
+can't be read or replayed is reported and skipped, and reading carries on with the next one: a line holding a tag
+pair such as [Event "..."] always starts a new game, even after an unclosed comment or variation.
+
+Running ``chessington-replay games.pgn`` replays every game in a file and reports how many games per second were
+replayed.
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from collections import namedtuple
+
+from chessington.engine.bitboards import PAWN
+from chessington.engine.board import Board
+from chessington.engine.data import SQUARES, MOVE_SQUARE_MASK, MOVE_TO_SHIFT, MOVE_PROMOTION_SHIFT, MOVE_PIECE_SHIFT, \
+    MOVE_CASTLE_FLAG
+from chessington.engine.fen import PIECE_LETTERS
+from chessington.engine.movegen import generate_legal_moves
+from chessington.engine.perft import SQUARE_NAMES
+
+RESULTS = ('1-0', '0-1', '1/2-1/2', '*')
+
+# A game's tag pairs as a dict, and its main line as a list of SAN moves
+PgnGame = namedtuple('PgnGame', ['headers', 'moves'])
+# A replayed game: its tag pairs, the (from, to) Square pair of each move played, an error message if the game could
+# not be replayed to the end (or None), and the board at the last position reached
+ReplayedGame = namedtuple('ReplayedGame', ['headers', 'moves', 'error', 'board'])
+
+_TAG = re.compile(r'\[\s*(\w+)\s+"((?:[^"\\]|\\.)*)"\s*\]$')
+# Comments, variations and numeric annotations are matched so they can be skipped; anything else is a move, a move
+# number or a result
+_MOVETEXT_TOKEN = re.compile(r'\{[^}]*\}?|;.*|\(|\)|\$\d+|[^\s{}();$]+')
+_MOVE_NUMBER = re.compile(r'\d+\.*$')
+_MOVE_NUMBER_PREFIX = re.compile(r'^\d+\.+')
+_SAN = re.compile(r'([NBRQK])?([a-h])?([1-8])?x?([a-h][1-8])(?:=?([NBRQ]))?$')
+_CASTLING = {'O-O': False, '0-0': False, 'O-O-O': True, '0-0-0': True}
+
+# SAN moves already parsed, as (piece type, from file, from rank, to index, promotion type); the same few thousand
+# moves make up almost every game
+_PARSED_SAN = {}
+_PARSED_SAN_CACHE_SIZE = 100000
+
+
+def read_games(source):
+    """
+    Yields a PgnGame for each game in a PGN file, given its path, an open file or any other iterable of lines. Only
+    the current game is held in memory. Moves inside comments and variations are left out of the main line.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, encoding='utf-8', errors='replace') as lines:
+            yield from read_games(lines)
+        return
+
+    headers = {}
+    moves = []
+    in_movetext = False
+    finished = False
+    variation_depth = 0
+    open_comment = False
+    for line in source:
+        stripped = line.strip()
+        tag = _TAG.match(stripped) if stripped.startswith('[') else None
+        if tag is not None:
+            # A tag pair after movetext starts the next game, closing anything the last one left open
+            if in_movetext:
+                yield PgnGame(headers, moves)
+                headers, moves, in_movetext, finished = {}, [], False, False
+            open_comment, variation_depth = False, 0
+            headers[tag.group(1)] = tag.group(2).replace('\\"', '"').replace('\\\\', '\\')
+            continue
+        if open_comment:
+            # Everything up to the closing brace of a comment that spans lines is skipped
+            end = stripped.find('}')
+            if end < 0:
+                continue
+            stripped = stripped[end + 1:].strip()
+            open_comment = False
+        if not stripped or stripped.startswith('%') or stripped.startswith('['):
+            continue
+        if finished:
+            # Moves after the result, with no tag pairs in between, belong to a game with no headers
+            yield PgnGame(headers, moves)
+            headers, moves, finished = {}, [], False
+        in_movetext = True
+        for token in _MOVETEXT_TOKEN.findall(stripped):
+            if token[0] == '{':
+                open_comment = not token.endswith('}')
+            elif token[0] in ';$':
+                continue
+            elif token == '(':
+                variation_depth += 1
+            elif token == ')':
+                variation_depth = max(0, variation_depth - 1)
+            elif variation_depth == 0 and not _MOVE_NUMBER.match(token):
+                if token in RESULTS:
+                    headers.setdefault('Result', token)
+                    finished = True
+                else:
+                    # A move may be written straight after its number, as in 4.e4 or 4...0-0
+                    moves.append(_MOVE_NUMBER_PREFIX.sub('', token) if token[0].isdigit() else token)
+    if in_movetext or headers:
+        yield PgnGame(headers, moves)
+
+
+def _parse_san_text(san):
+    parsed = _PARSED_SAN.get(san)
+    if parsed is None:
+        match = _SAN.match(san.rstrip('+#!?'))
+        if match is None:
+            raise ValueError(f'Not a SAN move: {san}')
+        piece_letter, from_file, from_rank, to_name, promotion_letter = match.groups()
+        parsed = (PIECE_LETTERS.index(piece_letter.lower()) if piece_letter else PAWN,
+                  'abcdefgh'.index(from_file) if from_file else None,
+                  int(from_rank) - 1 if from_rank else None,
+                  SQUARE_NAMES.index(to_name),
+                  PIECE_LETTERS.index(promotion_letter.lower()) if promotion_letter else 0)
+        if len(_PARSED_SAN) < _PARSED_SAN_CACHE_SIZE:
+            _PARSED_SAN[san] = parsed
+    return parsed
+
+
+def parse_san(board, san, moves=None):
+    """
+    The packed legal move for the player to move that a SAN move such as Nbd7, exd6, e8=Q or O-O-O stands for.
+    Pass the board's legal moves if they are already known. Raises ValueError if the move isn't legal or is
+    ambiguous.
+    """
+    text = san.rstrip('+#!?')
+    if text in _CASTLING:
+        queen_side = _CASTLING[text]
+        for move in board.legal_moves() if moves is None else moves:
+            if move & MOVE_CASTLE_FLAG and (move >> MOVE_TO_SHIFT & 7 == 2) == queen_side:
+                return move
+        raise ValueError(f'Not a legal move: {san}')
+
+    piece_type, from_file, from_rank, to_index, promotion_type = _parse_san_text(san)
+    if moves is None:
+        # Only the moves to the destination square are needed
+        moves = generate_legal_moves(board, destinations=1 << to_index)
+    found = None
+    for move in moves:
+        if move >> MOVE_TO_SHIFT & MOVE_SQUARE_MASK != to_index or move >> MOVE_PIECE_SHIFT & 7 != piece_type \
+                or move >> MOVE_PROMOTION_SHIFT & 7 != promotion_type:
+            continue
+        from_index = move & MOVE_SQUARE_MASK
+        if from_file is not None and from_index & 7 != from_file \
+                or from_rank is not None and from_index >> 3 != from_rank:
+            continue
+        if found is not None:
+            raise ValueError(f'Ambiguous move: {san}')
+        found = move
+    if found is None:
+        raise ValueError(f'Not a legal move: {san}')
+    return found
+
+
+class GameReplayer:
+    """
+    Replays games on one Board, which is taken back to its starting position between games rather than created
+    again, and counts the games, moves and errors seen so far.
+    """
+
+    def __init__(self, board=None):
+        self.board = board if board is not None else Board.at_starting_position()
+        self.games = 0
+        self.malformed_games = 0
+        self.moves = 0
+        self.elapsed = 0.0
+
+    @property
+    def games_per_second(self):
+        return self.games / self.elapsed if self.elapsed > 0 else 0.0
+
+    def replay(self, source):
+        """
+        Yields a ReplayedGame for each game in a PGN source (see read_games). Each game's board is only valid until
+        the next game is requested. A game with a FEN tag pair is replayed on a board of its own.
+        """
+        start = time.perf_counter()
+        try:
+            for game in read_games(source):
+                replayed = self._replay_game(game)
+                self.elapsed += time.perf_counter() - start
+                yield replayed
+                start = time.perf_counter()
+                if replayed.board is self.board:
+                    for _ in replayed.moves:
+                        self.board.unmake_move()
+        finally:
+            self.elapsed += time.perf_counter() - start
+
+    def _replay_game(self, game):
+        self.games += 1
+        board = self.board
+        played = []
+        error = None
+        if 'FEN' in game.headers:
+            try:
+                board = Board.from_fen(game.headers['FEN'])
+            except ValueError as exception:
+                error = str(exception)
+        if error is None:
+            for san in game.moves:
+                try:
+                    move = parse_san(board, san)
+                except ValueError as exception:
+                    error = f'Move {len(played) + 1}: {exception}'
+                    break
+                board.apply_move(move)
+                played.append((SQUARES[move & MOVE_SQUARE_MASK], SQUARES[move >> MOVE_TO_SHIFT & MOVE_SQUARE_MASK]))
+        if error is not None:
+            self.malformed_games += 1
+        self.moves += len(played)
+        return ReplayedGame(game.headers, played, error, board)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Replay every game in a PGN file.')
+    parser.add_argument('pgn', help='PGN file to read, or - for standard input')
+    parser.add_argument('--quiet', action='store_true', help="don't list the games that couldn't be replayed")
+    options = parser.parse_args(args)
+
+    replayer = GameReplayer()
+    source = sys.stdin if options.pgn == '-' else options.pgn
+    for game in replayer.replay(source):
+        if game.error is not None and not options.quiet:
+            print(f'Game {replayer.games}: {game.error}', file=sys.stderr)
+
+    print(f'Games: {replayer.games}')
+    print(f'Malformed games: {replayer.malformed_games}')
+    print(f'Moves: {replayer.moves}')
+    print(f'Time: {replayer.elapsed:.3f}s')
+    print(f'Games per second: {replayer.games_per_second:.1f}')
@@ -1,12 +1,12 @@
 """
 Definitions of each of the different chess pieces.
 """
-import chessington.engine.board as board_module
-
 from abc import ABC, abstractmethod
-from copy import deepcopy
 
+from chessington.engine.bitboards import PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, BOARD_SIZE, EAST, WEST, \
+    STRAIGHT_DIRECTIONS, DIAGONAL_DIRECTIONS
 from chessington.engine.data import Player, Square
+from chessington.engine.tables import KNIGHT_MOVES, KING_MOVES, PAWN_CAPTURES, RAY_SQUARES
 
 
 class Piece(ABC):
@@ -14,6 +14,9 @@ class Piece(ABC):
     An abstract base class from which all pieces inherit.
     """
 
+    __slots__ = ('player', 'has_moved')
+    piece_type = None
+
     def __init__(self, player):
         self.player = player
         self.has_moved = False
@@ -52,67 +55,50 @@ class Piece(ABC):
                 return True
 
     def get_straight_moves(self, board, current_square, max_step_count):
-        straight_moves = []
-
-        direction_array = [-1, 1]
-
-        for i in direction_array:
-            straight_moves.extend(self.get_moves_in_direction(board, current_square, i, 0, max_step_count))
-            straight_moves.extend(self.get_moves_in_direction(board, current_square, 0, i, max_step_count))
-
-        return straight_moves
+        return self.get_moves_along_rays(board, current_square, STRAIGHT_DIRECTIONS, max_step_count)
 
     def get_diagonal_moves(self, board, current_square, max_step_count):
+        return self.get_moves_along_rays(board, current_square, DIAGONAL_DIRECTIONS, max_step_count)
 
-        diagonal_moves = []
-
-        direction_array = [-1, 1]
-
-        for i in direction_array:
-            for j in direction_array:
-                diagonal_moves.extend(self.get_moves_in_direction(board, current_square, i, j, max_step_count))
-
-        return diagonal_moves
-
-    def get_moves_in_direction(self, board, current_square, horizontal_step, vertical_step, max_step_count):
-        directional_squares = []
-
-        horizontal_offset = horizontal_step
-        vertical_offset = vertical_step
-
-        do_next_step = True
-
-        step_count = 0
-
-        while do_next_step:
-            square = Square.at(current_square.row + vertical_offset, current_square.col + horizontal_offset)
-            if square.is_on_board():
-                if board.square_is_empty(square):
-                    directional_squares.append(square)
-                elif board.square_contains_opponent(square, self.player):
-                    directional_squares.append(square)
-                    do_next_step = False
+    def get_moves_along_rays(self, board, current_square, directions, max_step_count):
+        """
+        Walks outwards along each of the given directions, stopping at the first occupied square, which is
+        included if it holds an opponent's piece.
+        """
+        moves = []
+        rays = RAY_SQUARES[current_square.index]
+        for direction in directions:
+            ray = rays[direction]
+            if max_step_count < len(ray):
+                ray = ray[:max_step_count]
+            for square in ray:
+                piece_on_square = board.get_piece(square)
+                if piece_on_square is None:
+                    moves.append(square)
                 else:
-                    do_next_step = False
-            else:
-                do_next_step = False
-            vertical_offset += vertical_step
-            horizontal_offset += horizontal_step
-            step_count += 1
+                    if piece_on_square.player != self.player:
+                        moves.append(square)
+                    break
+        return moves
 
-            if step_count == max_step_count:
-                do_next_step = False
-
-        return directional_squares
+    def get_moves_to_squares(self, board, squares):
+        """
+        Filters the given squares down to those that are empty or hold an opponent's piece.
+        """
+        moves = []
+        for square in squares:
+            piece_on_square = board.get_piece(square)
+            if piece_on_square is None or piece_on_square.player != self.player:
+                moves.append(square)
+        return moves
 
     @staticmethod
     def remove_moves_that_leave_self_in_check(board, current_square, available_moves):
         for move in list(available_moves):
-            board_copy = deepcopy(board)
-            board_copy.primary_board = False
-            board_copy.move_piece(current_square, move)
-            if board_copy.king_is_in_check():
+            board.make_move(current_square, move)
+            if board.king_is_in_check():
                 available_moves.remove(move)
+            board.unmake_move()
         return available_moves
 
 
@@ -121,6 +107,9 @@ class Pawn(Piece):
     A class representing a chess pawn.
     """
 
+    __slots__ = ()
+    piece_type = PAWN
+
     def get_piece_specific_moves(self, board):
 
         available_moves = []
@@ -141,30 +130,26 @@ class Pawn(Piece):
         if square_in_front.is_on_board() and board.square_is_empty(square_in_front):
             straight_moves.append(square_in_front)
             square_two_in_front = Square.at(current_square.row + direction * 2, current_square.col)
-            if not self.has_moved and board.square_is_empty(square_two_in_front):
+            if not self.has_moved and square_two_in_front.is_on_board() and board.square_is_empty(square_two_in_front):
                 straight_moves.append(square_two_in_front)
 
         return straight_moves
 
     def get_pawn_diagonal_moves(self, board, current_square, direction):
-        diagonal_moves = []
-
-        diagonal_moves.extend(self.get_moves_in_direction(board, current_square, 1, direction, 1))
-        diagonal_moves.extend(self.get_moves_in_direction(board, current_square, -1, direction, 1))
-
         attacking_diagonal_moves = []
 
-        for square in diagonal_moves:
+        for square in PAWN_CAPTURES[self.player][current_square.index]:
             if board.square_contains_opponent(square, self.player):
                 attacking_diagonal_moves.append(square)
-            elif len(board.move_list) > 0 and self.en_passant_possible(board, current_square, square):
+            elif len(board.move_list) > 0 and board.square_is_empty(square) \
+                    and self.en_passant_possible(board, current_square, square):
                 attacking_diagonal_moves.append(square)
         return attacking_diagonal_moves
 
     @staticmethod
     def en_passant_possible(board, current_square, diagonal_square):
         last_move = board.move_list[-1]
-        is_pawn = isinstance(last_move.attacking_piece, Pawn)
+        is_pawn = last_move.moved_piece_type == PAWN
         same_col = last_move.square_to.col == diagonal_square.col
         same_row = last_move.square_to.row == current_square.row
 
@@ -176,24 +161,12 @@ class Knight(Piece):
     A class representing a chess knight.
     """
 
-    def get_piece_specific_moves(self, board):
-
-        available_moves = []
+    __slots__ = ()
+    piece_type = KNIGHT
 
+    def get_piece_specific_moves(self, board):
         current_square = board.find_piece(self)
-
-        minus_two_to_two_excluding_zero = [-2, -1, 1, 2]
-
-        for i in minus_two_to_two_excluding_zero:
-            for j in minus_two_to_two_excluding_zero:
-                if self.abs_not_equal(i, j):
-                    available_moves.extend(self.get_moves_in_direction(board, current_square, i, j, 1))
-
-        return available_moves
-
-    @staticmethod
-    def abs_not_equal(i, j):
-        return abs(i) != abs(j)
+        return self.get_moves_to_squares(board, KNIGHT_MOVES[current_square.index])
 
 
 class Bishop(Piece):
@@ -201,8 +174,11 @@ class Bishop(Piece):
     A class representing a chess bishop.
     """
 
+    __slots__ = ()
+    piece_type = BISHOP
+
     def get_piece_specific_moves(self, board):
-        return self.get_diagonal_moves(board, board.find_piece(self), board_module.BOARD_SIZE)
+        return self.get_diagonal_moves(board, board.find_piece(self), BOARD_SIZE)
 
 
 class Rook(Piece):
@@ -210,8 +186,11 @@ class Rook(Piece):
     A class representing a chess rook.
     """
 
+    __slots__ = ()
+    piece_type = ROOK
+
     def get_piece_specific_moves(self, board):
-        return self.get_straight_moves(board, board.find_piece(self), board_module.BOARD_SIZE)
+        return self.get_straight_moves(board, board.find_piece(self), BOARD_SIZE)
 
 
 class Queen(Piece):
@@ -219,11 +198,14 @@ class Queen(Piece):
     A class representing a chess queen.
     """
 
+    __slots__ = ()
+    piece_type = QUEEN
+
     def get_piece_specific_moves(self, board):
         current_square = board.find_piece(self)
 
-        available_moves = self.get_straight_moves(board, current_square, board_module.BOARD_SIZE)
-        available_moves.extend(self.get_diagonal_moves(board, current_square, board_module.BOARD_SIZE))
+        available_moves = self.get_straight_moves(board, current_square, BOARD_SIZE)
+        available_moves.extend(self.get_diagonal_moves(board, current_square, BOARD_SIZE))
 
         return available_moves
 
@@ -233,11 +215,15 @@ class King(Piece):
     A class representing a chess king.
     """
 
+    __slots__ = ()
+    piece_type = KING
+
     def get_piece_specific_moves(self, board):
         current_square = board.find_piece(self)
 
-        available_moves = self.get_straight_moves(board, current_square, 1)
-        available_moves.extend(self.get_diagonal_moves(board, current_square, 1))
+        king_moves = KING_MOVES[current_square.index]
+
+        available_moves = self.get_moves_to_squares(board, king_moves)
         available_moves.extend(self.get_castle_moves(board, current_square))
 
         return available_moves
@@ -259,16 +245,28 @@ class King(Piece):
         return self.can_castle(board, current_square, -4)
 
     def can_castle(self, board, current_square, distance_to_rook):
+        """
+        A king may castle if neither it nor the rook has moved, the squares between them are empty, and the king
+        is not in check and does not pass through or land on an attacked square.
+        """
         if self.has_moved:
             return False
-        direction = 1
-        if distance_to_rook < 0:
-            direction = - 1
-        rook_column = current_square.col + distance_to_rook
-        rook_square = Square.at(current_square.row, rook_column)
+        rook_square = Square.at(current_square.row, current_square.col + distance_to_rook)
+        if not rook_square.is_on_board():
+            return False
         rook = board.get_piece(rook_square)
-        if not isinstance(rook, Rook):
+        if not isinstance(rook, Rook) or rook.player != self.player:
+            return False
+        direction = EAST if distance_to_rook > 0 else WEST
+        rays = RAY_SQUARES[current_square.index]
+        castle_squares = rays[direction][:abs(distance_to_rook) - 1]
+        castle_squares_are_empty = all(board.square_is_empty(square) for square in castle_squares)
+        if rook.has_moved or not castle_squares_are_empty:
             return False
-        castle_squares = self.get_moves_in_direction(board, current_square, 1 * direction, 0, abs(distance_to_rook))
-        castle_squares_are_empty = len(castle_squares) == abs(distance_to_rook) - 1
-        return not rook.has_moved and castle_squares_are_empty
+        opponent = self.player.opponent()
+        king_path = (current_square,) + castle_squares[:2]
+        return not any(board.is_square_attacked(square, opponent) for square in king_path)
+
+
+# Each piece class, indexed by its piece_type
+PIECE_CLASSES = (Pawn, Knight, Bishop, Rook, Queen, King)
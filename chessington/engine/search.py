@@ -0,0 +1,307 @@
+"""
+Choosing a move: negamax alpha-beta search with iterative deepening, limited by time, depth or node count.
+
+Each iteration searches one move deeper than the last, and the result of the deepest completed iteration is
+returned, so a search that runs out of time still has a move to play. In CPython expect something in the region of
+10,000 to 15,000 nodes per second, depending on the position.
+"""
+import time
+from collections import namedtuple
+
+from chessington.engine.bitboards import PAWN, QUEEN
+from chessington.engine.data import MOVE_CAPTURED_SHIFT, MOVE_PROMOTION_SHIFT
+from chessington.engine.evaluation import PIECE_VALUES, evaluate
+from chessington.engine.exchange import static_exchange_evaluation
+from chessington.engine.tablebase import DRAW, WIN
+from chessington.engine.ordering import MoveOrderer
+from chessington.engine.transposition import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+
+MATE_SCORE = 100000
+INFINITY = MATE_SCORE + 1
+# Scores this close to MATE_SCORE are mates, found the given number of plies from the root
+MATE_THRESHOLD = MATE_SCORE - 1000
+MAX_DEPTH = 64
+DEFAULT_DEPTH = 4
+# The size of the transposition table a search allocates when it isn't given one. Pass a table to search() to keep
+# it from one search to the next.
+DEFAULT_TABLE_SIZE_MB = 1
+# Quiescence search stops extending captures this many plies from the root
+MAX_QUIESCENCE_PLY = 128
+# How far a capture's gain may fall short of alpha before the capture is pruned without being searched
+DELTA_MARGIN = 200
+# The clock is read once per this many nodes, which keeps the overshoot past a deadline to a few milliseconds
+CLOCK_CHECK_INTERVAL = 16
+
+# best_move and principal_variation hold moves in the packed form returned by Board.legal_moves. time is in seconds.
+# statistics holds counters for judging how well the search is working; see Searcher.statistics.
+SearchResult = namedtuple('SearchResult', ['best_move', 'score', 'depth', 'principal_variation', 'nodes', 'time',
+                                           'nodes_per_second', 'statistics'])
+
+
+class _SearchAborted(Exception):
+    pass
+
+
+def search(board, time_limit=None, depth=None, nodes=None, transposition_table=None, on_iteration=None, workers=1,
+           tablebases=None):
+    """
+    Searches for the best move for the player to move, returning a SearchResult.
+
+    time_limit is in seconds; depth is the deepest iteration to search; nodes caps the number of positions visited.
+    With no limits at all the search goes to DEFAULT_DEPTH. on_iteration, if given, is called with the SearchResult
+    of each completed iteration. tablebases, a chessington.engine.tablebase.Tablebases, scores positions it has
+    tables for exactly instead of searching them. The board is left as it was found.
+
+    With more than one worker the search runs in parallel over that many processes (see
+    chessington.engine.parallel), and transposition_table, on_iteration and tablebases are not used.
+    """
+    if workers > 1:
+        from chessington.engine.parallel import parallel_search
+        return parallel_search(board, workers, time_limit, depth, nodes)
+    return Searcher(board, transposition_table, tablebases=tablebases).search(time_limit, depth, nodes, on_iteration)
+
+
+class Searcher:
+    """
+    The state of a search of one position: the board being searched, a transposition table, move ordering
+    heuristics, and counters.
+    """
+
+    def __init__(self, board, transposition_table=None, orderer=None, stop_event=None, tablebases=None):
+        """
+        stop_event, if given, is an object such as a multiprocessing.Event whose is_set() ends the search early.
+        """
+        self.board = board
+        self.transposition_table = transposition_table if transposition_table is not None \
+            else TranspositionTable(DEFAULT_TABLE_SIZE_MB)
+        self.orderer = orderer if orderer is not None else MoveOrderer()
+        self.stop_event = stop_event
+        self.tablebases = tablebases
+        self.nodes = 0
+        self.quiescence_nodes = 0
+        self.tablebase_hits = 0
+        self.beta_cutoffs = 0
+        self.first_move_cutoffs = 0
+        self._deadline = None
+        self._node_limit = None
+        self._can_abort = False
+        self._root_score = 0
+        self._principal_variations = [[] for _ in range(MAX_DEPTH + 1)]
+
+    def search(self, time_limit=None, depth=None, nodes=None, on_iteration=None, start_depth=1):
+        """
+        Runs the iterative deepening search; see search(). Iterations shallower than start_depth are skipped.
+        """
+        if time_limit is None and depth is None and nodes is None:
+            depth = DEFAULT_DEPTH
+        max_depth = min(depth, MAX_DEPTH) if depth is not None else MAX_DEPTH
+        start = time.perf_counter()
+        self._deadline = start + time_limit if time_limit is not None else None
+        self._node_limit = nodes
+        self.nodes = self.quiescence_nodes = self.tablebase_hits = self.beta_cutoffs = self.first_move_cutoffs = 0
+
+        if not self.board.legal_moves():
+            score = -MATE_SCORE if self.board.is_in_check(self.board.current_player) else 0
+            return SearchResult(None, score, 0, [], 0, 0.0, 0, self.statistics())
+
+        result = None
+        start_depth = min(start_depth, max_depth)
+        for iteration_depth in range(start_depth, max_depth + 1):
+            # The first iteration can only be stopped once it has searched one root move, so there is always a move
+            # to return
+            self._can_abort = iteration_depth > start_depth
+            try:
+                score = self._negamax(iteration_depth, -INFINITY, INFINITY, 0)
+            except _SearchAborted:
+                if result is None:
+                    # The best root move found so far, from a first iteration that didn't finish
+                    principal_variation = list(self._principal_variations[0])
+                    result = SearchResult(principal_variation[0], self._root_score, iteration_depth,
+                                          principal_variation, self.nodes, 0.0, 0, None)
+                break
+            principal_variation = list(self._principal_variations[0])
+            elapsed = time.perf_counter() - start
+            result = SearchResult(principal_variation[0], score, iteration_depth, principal_variation, self.nodes,
+                                  elapsed, int(self.nodes / elapsed) if elapsed > 0 else 0, self.statistics())
+            if on_iteration is not None:
+                on_iteration(result)
+            if abs(score) >= MATE_THRESHOLD or self._limit_reached():
+                break
+
+        elapsed = time.perf_counter() - start
+        return result._replace(nodes=self.nodes, time=elapsed,
+                               nodes_per_second=int(self.nodes / elapsed) if elapsed > 0 else 0,
+                               statistics=self.statistics())
+
+    def statistics(self):
+        """
+        Counters for the search so far. Nodes are split between the main search and the quiescence search that
+        extends its leaves. first_move_cutoff_rate is the share of beta cutoffs caused by the first move tried,
+        which measures how well moves are being ordered; the transposition table's counters are included too.
+        """
+        statistics = {
+            'main_nodes': self.nodes - self.quiescence_nodes,
+            'quiescence_nodes': self.quiescence_nodes,
+            'tablebase_hits': self.tablebase_hits,
+            'beta_cutoffs': self.beta_cutoffs,
+            'first_move_cutoffs': self.first_move_cutoffs,
+            'first_move_cutoff_rate': self.first_move_cutoffs / self.beta_cutoffs if self.beta_cutoffs else 0.0,
+        }
+        statistics.update(self.transposition_table.stats())
+        return statistics
+
+    def _limit_reached(self):
+        if self._deadline is not None and time.perf_counter() >= self._deadline:
+            return True
+        if self.stop_event is not None and self.stop_event.is_set():
+            return True
+        return self._node_limit is not None and self.nodes >= self._node_limit
+
+    def _negamax(self, depth, alpha, beta, ply):
+        principal_variation = self._principal_variations[ply]
+        principal_variation.clear()
+        board = self.board
+        # A position repeated on the way here could be repeated forever, so it is scored as a draw
+        if ply > 0 and (board.is_repetition() or board.is_fifty_move_draw()):
+            return 0
+        if self.tablebases is not None and ply > 0:
+            result = self.tablebases.probe(board)
+            if result is not None:
+                self.tablebase_hits += 1
+                if result.wdl == DRAW:
+                    return 0
+                # Scored like a mate found by the search, result.plies beyond this node
+                score = MATE_SCORE - ply - result.plies
+                return score if result.wdl == WIN else -score
+        if depth <= 0:
+            return self._quiescence(alpha, beta, ply)
+
+        self.nodes += 1
+        if self._can_abort and self.nodes % CLOCK_CHECK_INTERVAL == 0 and self._limit_reached():
+            raise _SearchAborted()
+
+        key = board.zobrist_key
+        original_alpha = alpha
+        entry = self.transposition_table.probe(key)
+        table_move = entry.best_move if entry is not None else 0
+        if entry is not None and ply > 0 and entry.depth >= depth:
+            score = _score_from_table(entry.score, ply)
+            if entry.bound == EXACT \
+                    or entry.bound == LOWER_BOUND and score >= beta \
+                    or entry.bound == UPPER_BOUND and score <= alpha:
+                if entry.best_move:
+                    principal_variation.append(entry.best_move)
+                return score
+
+        moves = board.legal_moves()
+        if not moves:
+            return -MATE_SCORE + ply if board.is_in_check(board.current_player) else 0
+
+        best_score = -INFINITY
+        best_move = 0
+        for move_number, move in enumerate(self.orderer.order(moves, ply, table_move)):
+            board.apply_move(move)
+            try:
+                score = -self._negamax(depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                board.unmake_move()
+            if ply == 0:
+                self._can_abort = True
+            if score > best_score:
+                best_score = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    principal_variation[:] = [move] + self._principal_variations[ply + 1]
+                    if ply == 0:
+                        self._root_score = score
+                    if alpha >= beta:
+                        self.beta_cutoffs += 1
+                        if move_number == 0:
+                            self.first_move_cutoffs += 1
+                        self.orderer.record_cutoff(move, ply, depth)
+                        break
+
+        if best_score <= original_alpha:
+            bound = UPPER_BOUND
+        elif best_score >= beta:
+            bound = LOWER_BOUND
+        else:
+            bound = EXACT
+        self.transposition_table.store(key, depth, _score_to_table(best_score, ply), bound, best_move)
+        return best_score
+
+    def _quiescence(self, alpha, beta, ply):
+        """
+        Extends a leaf of the main search with captures and promotions until the position is quiet, so that it is
+        not scored in the middle of an exchange. The side to move may stand pat on the static evaluation instead
+        of capturing, unless it is in check, when every move is searched.
+        """
+        self.nodes += 1
+        self.quiescence_nodes += 1
+        if self._can_abort and self.nodes % CLOCK_CHECK_INTERVAL == 0 and self._limit_reached():
+            raise _SearchAborted()
+
+        board = self.board
+        if ply >= MAX_QUIESCENCE_PLY:
+            return evaluate(board)
+
+        in_check = board.is_in_check(board.current_player)
+        if in_check:
+            moves = board.legal_moves()
+            if not moves:
+                return -MATE_SCORE + ply
+            best_score = -INFINITY
+        else:
+            stand_pat = evaluate(board)
+            if stand_pat >= beta:
+                return stand_pat
+            if stand_pat + PIECE_VALUES[QUEEN] + DELTA_MARGIN < alpha:
+                # Not even winning a queen would bring the score up to alpha
+                return stand_pat
+            alpha = max(alpha, stand_pat)
+            best_score = stand_pat
+            moves = board.legal_captures()
+
+        for move_number, move in enumerate(self.orderer.order(moves, ply)):
+            if not in_check:
+                captured = move >> MOVE_CAPTURED_SHIFT & 7
+                promotion = move >> MOVE_PROMOTION_SHIFT & 7
+                gain = (PIECE_VALUES[captured - 1] if captured else 0) \
+                    + (PIECE_VALUES[promotion] - PIECE_VALUES[PAWN] if promotion else 0)
+                if stand_pat + gain + DELTA_MARGIN <= alpha:
+                    continue
+                if static_exchange_evaluation(board, move) < 0:
+                    continue
+            board.apply_move(move)
+            try:
+                score = -self._quiescence(-beta, -alpha, ply + 1)
+            finally:
+                board.unmake_move()
+            if score > best_score:
+                best_score = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        self.beta_cutoffs += 1
+                        if move_number == 0:
+                            self.first_move_cutoffs += 1
+                        break
+        return best_score
+
+
+def _score_to_table(score, ply):
+    # Mate scores are stored relative to the node rather than the root, so they stay correct wherever it recurs
+    if score >= MATE_THRESHOLD:
+        return score + ply
+    if score <= -MATE_THRESHOLD:
+        return score - ply
+    return score
+
+
+def _score_from_table(score, ply):
+    if score >= MATE_THRESHOLD:
+        return score - ply
+    if score <= -MATE_THRESHOLD:
+        return score + ply
+    return score
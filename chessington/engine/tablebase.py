@@ -0,0 +1,593 @@
+"""
+Endgame tablebases for a side with a few pieces against a lone king, generated locally by retrograde analysis.
+
+A table holds every position of one material signature, such as KQvK or KBNvK, with the side that has the pieces
+shown as white. Each position is stored as one byte: 0 for a draw, 1 to 127 for a win for the side to move in that
+many plies, and 128 plus N for a loss in N plies. Positions are indexed by side to move, then the square of the
+stronger king, the weaker king and each other piece. The board's symmetries are used to keep the stronger king on
+the a1-d1-d4 triangle (or files a-d when there are pawns), so tables are up to eight times smaller.
+
+Tables are generated from the positions that are mated or stalemated, working backwards through the moves that lead
+to them, with moves made by the same attack tables as chessington.engine.movegen. Castling is not covered. A table
+that can leave its material by a capture or promotion needs the tables it leads to, which are generated first;
+generate_tablebases works through the signatures over a pool of processes as their dependencies become available.
+Probing maps the table files with mmap, so a lookup reads a single byte.
+"""
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from collections import namedtuple, defaultdict
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from itertools import product
+
+from chessington.engine.bitboards import PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, PIECE_TYPE_COUNT, SQUARE_COUNT, \
+    KING_ATTACKS, KNIGHT_ATTACKS, PAWN_ATTACKS, bishop_attacks, rook_attacks, queen_attacks, iterate_bits, \
+    lowest_bit_index
+from chessington.engine.board import Board
+from chessington.engine.fen import PIECE_LETTERS
+
+DEFAULT_SIGNATURES = ('KQvK', 'KRvK', 'KPvK', 'KBNvK')
+# The most pieces, kings included, in a position a table can cover
+MAX_PIECES = 5
+FILE_EXTENSION = '.ctb'
+HEADER = struct.Struct('<4sB11s')
+MAGIC = b'CHTB'
+VERSION = 1
+LOSS_OFFSET = 128
+
+WIN = 1
+LOSS = -1
+DRAW = 0
+
+# The result for the side to move, and the plies to mate with best play (0 for a draw)
+TablebaseResult = namedtuple('TablebaseResult', ['wdl', 'plies'])
+
+# Piece types in the order they are listed in a signature
+_SIGNATURE_ORDER = (QUEEN, ROOK, BISHOP, KNIGHT, PAWN)
+_PROMOTION_TYPES = (QUEEN, ROOK, BISHOP, KNIGHT)
+
+# States of a position during generation
+_UNKNOWN, _WIN, _LOSS, _DRAW, _INVALID = range(5)
+
+
+def _transformed_square(square, flip_cols, flip_rows, transpose):
+    row, col = divmod(square, 8)
+    if transpose:
+        row, col = col, row
+    if flip_rows:
+        row = 7 - row
+    if flip_cols:
+        col = 7 - col
+    return row * 8 + col
+
+
+# TRANSFORMS[t][square] is the square's image under each of the board's eight symmetries; the first two keep rows
+TRANSFORMS = tuple(tuple(_transformed_square(square, flip_cols, flip_rows, transpose) for square in range(SQUARE_COUNT))
+                   for transpose, flip_rows, flip_cols in product((False, True), repeat=3))
+_IDENTITY, _FLIP_COLS = 0, 1
+
+
+def signature_name(piece_types):
+    """
+    The signature of a stronger side with these piece types (besides its king) against a lone king, e.g. KBNvK.
+    """
+    ordered = sorted(piece_types, key=_SIGNATURE_ORDER.index)
+    return 'K' + ''.join(PIECE_LETTERS[piece_type].upper() for piece_type in ordered) + 'vK'
+
+
+def parse_signature(signature):
+    """
+    The piece types of the stronger side of a signature, besides its king, in signature order.
+    """
+    strong, _, weak = signature.upper().partition('V')
+    if weak != 'K' or not strong.startswith('K') or not all(letter in 'QRBNP' for letter in strong[1:]):
+        raise ValueError(f'Not a supported signature: {signature}')
+    if len(strong) + 1 > MAX_PIECES:
+        raise ValueError(f'Too many pieces for a tablebase: {signature}')
+    return tuple(sorted((PIECE_LETTERS.index(letter.lower()) for letter in strong[1:]), key=_SIGNATURE_ORDER.index))
+
+
+def is_insufficient_material(piece_types):
+    """
+    Whether a king with these pieces can't force mate against a lone king, so every position is a draw.
+    """
+    return len(piece_types) == 0 or len(piece_types) == 1 and piece_types[0] in (BISHOP, KNIGHT)
+
+
+def dependencies(signature):
+    """
+    The signatures whose tables are needed to generate this one: those reached by the lone king capturing a piece or
+    by a pawn promoting.
+    """
+    piece_types = parse_signature(signature)
+    needed = set()
+    for position, piece_type in enumerate(piece_types):
+        rest = piece_types[:position] + piece_types[position + 1:]
+        children = [rest]
+        if piece_type == PAWN:
+            children += [rest + (promotion_type,) for promotion_type in _PROMOTION_TYPES]
+        needed.update(signature_name(child) for child in children if not is_insufficient_material(child))
+    return needed
+
+
+class _Layout:
+    """
+    How the positions of one signature are laid out in its table.
+    """
+
+    def __init__(self, signature):
+        self.piece_types = parse_signature(signature)
+        self.signature = signature_name(self.piece_types)
+        self.piece_count = len(self.piece_types)
+        has_pawns = PAWN in self.piece_types
+        transforms = (_IDENTITY, _FLIP_COLS) if has_pawns else range(len(TRANSFORMS))
+        if has_pawns:
+            self.king_squares = [square for square in range(SQUARE_COUNT) if square % 8 < 4]
+        else:
+            self.king_squares = [square for square in range(SQUARE_COUNT) if square // 8 <= square % 8 < 4]
+        self._king_slots = {square: slot for slot, square in enumerate(self.king_squares)}
+        # For each square of the stronger king, the symmetries that take it into king_squares
+        self._king_transforms = [[TRANSFORMS[t] for t in transforms if TRANSFORMS[t][square] in self._king_slots]
+                                 for square in range(SQUARE_COUNT)]
+        # Runs of equal piece types, whose squares are sorted so each position has one index
+        self._equal_runs = []
+        start = 0
+        for end in range(1, self.piece_count + 1):
+            if end == self.piece_count or self.piece_types[end] != self.piece_types[start]:
+                if end - start > 1:
+                    self._equal_runs.append((start, end))
+                start = end
+        self.pieces_size = SQUARE_COUNT ** self.piece_count
+        self.size = 2 * len(self.king_squares) * SQUARE_COUNT * self.pieces_size
+
+    def index(self, side_to_move, king, lone_king, squares):
+        """
+        The index of a position, given the player to move (0 for the stronger side), the two kings' squares and the
+        squares of the other pieces in signature order.
+        """
+        transforms = self._king_transforms[king]
+        transform = transforms[0]
+        if len(transforms) > 1:
+            # The king is on a line of symmetry, so the other pieces decide which image to use
+            other = transforms[1]
+            if self._image(other, lone_king, squares) < self._image(transform, lone_king, squares):
+                transform = other
+        index = (side_to_move * len(self.king_squares) + self._king_slots[transform[king]]) * SQUARE_COUNT \
+            + transform[lone_king]
+        for square in self._image(transform, lone_king, squares)[1:]:
+            index = index * SQUARE_COUNT + square
+        return index
+
+    def _image(self, transform, lone_king, squares):
+        image = [transform[square] for square in squares]
+        for start, end in self._equal_runs:
+            image[start:end] = sorted(image[start:end])
+        return [transform[lone_king]] + image
+
+    def position(self, index):
+        """
+        The (side to move, king, lone king, squares) position at an index.
+        """
+        squares = []
+        for _ in range(self.piece_count):
+            index, square = divmod(index, SQUARE_COUNT)
+            squares.append(square)
+        squares.reverse()
+        index, lone_king = divmod(index, SQUARE_COUNT)
+        side_to_move, slot = divmod(index, len(self.king_squares))
+        return side_to_move, self.king_squares[slot], lone_king, squares
+
+
+def _attacks(piece_type, square, occupied):
+    if piece_type == KNIGHT:
+        return KNIGHT_ATTACKS[square]
+    if piece_type == BISHOP:
+        return bishop_attacks(square, occupied)
+    if piece_type == ROOK:
+        return rook_attacks(square, occupied)
+    if piece_type == QUEEN:
+        return queen_attacks(square, occupied)
+    if piece_type == PAWN:
+        return PAWN_ATTACKS[0][square]
+    return KING_ATTACKS[square]
+
+
+def _encode(state, plies):
+    if state == _WIN:
+        return plies
+    if state == _LOSS:
+        return LOSS_OFFSET + plies
+    return 0
+
+
+def _decode(value):
+    if value == 0:
+        return TablebaseResult(DRAW, 0)
+    if value < LOSS_OFFSET:
+        return TablebaseResult(WIN, value)
+    return TablebaseResult(LOSS, value - LOSS_OFFSET)
+
+
+class TablebaseFile:
+    """
+    One generated table, mapped into memory.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as table_file:
+            self._data = mmap.mmap(table_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, signature = HEADER.unpack_from(self._data)
+        self.layout = _Layout(signature.rstrip(b'\0').decode('ascii')) if magic == MAGIC else None
+        if version != VERSION or self.layout is None or len(self._data) != HEADER.size + self.layout.size:
+            self._data.close()
+            raise ValueError(f'Not a tablebase file: {path}')
+        self.signature = self.layout.signature
+
+    def close(self):
+        self._data.close()
+
+    def value(self, side_to_move, king, lone_king, squares):
+        """
+        The stored byte for a position, laid out as for _Layout.index.
+        """
+        return self._data[HEADER.size + self.layout.index(side_to_move, king, lone_king, squares)]
+
+    def probe(self, side_to_move, king, lone_king, squares):
+        return _decode(self.value(side_to_move, king, lone_king, squares))
+
+
+class Tablebases:
+    """
+    The tables in a directory, opened as they are first needed. Close it when done, or use it as a context manager.
+    Tablebases can be passed to other processes, which open the same files again.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._tables = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __reduce__(self):
+        return Tablebases, (self.directory,)
+
+    def close(self):
+        for table in self._tables.values():
+            if table is not None:
+                table.close()
+        self._tables.clear()
+
+    def table(self, signature):
+        """
+        The TablebaseFile for a signature, or None if it hasn't been generated.
+        """
+        if signature not in self._tables:
+            path = os.path.join(self.directory, signature + FILE_EXTENSION)
+            self._tables[signature] = TablebaseFile(path) if os.path.exists(path) else None
+        return self._tables[signature]
+
+    def probe(self, board):
+        """
+        The TablebaseResult for the board's position, or None if it has more material than a king and pieces against
+        a lone king, castling rights, or no table.
+        """
+        bitboards = board.bitboards
+        white, black = board.occupancy
+        if bin(white | black).count('1') > MAX_PIECES:
+            return None
+        white_pieces = white & ~bitboards[KING]
+        black_pieces = black & ~bitboards[PIECE_TYPE_COUNT + KING]
+        if white_pieces and black_pieces:
+            return None
+        # The table shows the stronger side as white, so a position where black has the pieces is turned round
+        strong = 1 if black_pieces else 0
+        flip = 56 * strong
+        base = strong * PIECE_TYPE_COUNT
+        piece_types = []
+        squares = []
+        for piece_type in _SIGNATURE_ORDER:
+            for square in iterate_bits(bitboards[base + piece_type]):
+                piece_types.append(piece_type)
+                squares.append(square ^ flip)
+        if is_insufficient_material(piece_types):
+            return TablebaseResult(DRAW, 0)
+        # Tables don't cover castling, which needs a rook
+        if bitboards[base + ROOK] and board.castling_rights():
+            return None
+        table = self.table(signature_name(piece_types))
+        if table is None:
+            return None
+        return table.probe(board.current_player.value ^ strong, lowest_bit_index(bitboards[base + KING]) ^ flip,
+                           lowest_bit_index(bitboards[PIECE_TYPE_COUNT - base + KING]) ^ flip, squares)
+
+
+class _Generator:
+    """
+    Retrograde analysis of one signature. Positions resolved as won or lost are processed a ply at a time, in
+    order of their distance to mate, and each one resolves the positions that lead to it.
+    """
+
+    def __init__(self, signature, tablebases):
+        self.layout = _Layout(signature)
+        self.tablebases = tablebases
+        size = self.layout.size
+        self.states = bytearray([_INVALID]) * size
+        self.plies = bytearray(size)
+        # For each position with the lone king to move, its moves not yet known to lose
+        self.remaining = bytearray(size)
+        # Positions resolved at each ply, and moves out of the table whose result is known at each ply
+        self.resolved = defaultdict(lambda: array('I'))
+        self.exit_wins = defaultdict(list)
+        self.exit_losses = defaultdict(list)
+
+    def generate(self):
+        self._initialise()
+        self._propagate()
+        values = bytearray(self.layout.size)
+        states, plies = self.states, self.plies
+        for index in range(self.layout.size):
+            state = states[index]
+            if state == _WIN or state == _LOSS:
+                if plies[index] >= LOSS_OFFSET:
+                    raise ValueError(f'Mate too deep to store in {self.layout.signature}')
+                values[index] = _encode(state, plies[index])
+        return values
+
+    def _initialise(self):
+        layout = self.layout
+        piece_types = layout.piece_types
+        has_pawns = PAWN in piece_types
+        needs_canonical_check = bool(layout._equal_runs)
+        index = 0
+        for side_to_move in (0, 1):
+            for king in layout.king_squares:
+                diagonal = len(layout._king_transforms[king]) > 1
+                for lone_king in range(SQUARE_COUNT):
+                    if lone_king == king or KING_ATTACKS[king] >> lone_king & 1:
+                        index += layout.pieces_size
+                        continue
+                    kings = 1 << king | 1 << lone_king
+                    for squares in product(range(SQUARE_COUNT), repeat=layout.piece_count):
+                        position_index = index
+                        index += 1
+                        pieces = 0
+                        for square in squares:
+                            pieces |= 1 << square
+                        if pieces & kings or bin(pieces).count('1') != len(squares):
+                            continue
+                        if has_pawns and any(piece_type == PAWN and not 8 <= square < 56
+                                             for piece_type, square in zip(piece_types, squares)):
+                            continue
+                        if (diagonal or needs_canonical_check) \
+                                and layout.index(side_to_move, king, lone_king, squares) != position_index:
+                            continue
+                        self._initialise_position(position_index, side_to_move, king, lone_king, squares,
+                                                  pieces | kings)
+
+    def _initialise_position(self, index, side_to_move, king, lone_king, squares, occupied):
+        piece_types = self.layout.piece_types
+        if side_to_move == 0:
+            # The side not to move can't be in check
+            attacks = KING_ATTACKS[king]
+            for piece_type, square in zip(piece_types, squares):
+                attacks |= _attacks(piece_type, square, occupied)
+            if attacks >> lone_king & 1:
+                return
+            self.states[index] = _UNKNOWN
+            self._add_promotions(index, king, lone_king, squares, occupied)
+            return
+
+        self.states[index] = _UNKNOWN
+        # Squares the lone king can't go to, seen through its own square
+        through_king = occupied & ~(1 << lone_king)
+        attacks = KING_ATTACKS[king]
+        for piece_type, square in zip(piece_types, squares):
+            attacks |= _attacks(piece_type, square, through_king)
+        targets = KING_ATTACKS[lone_king] & ~attacks
+        if not targets:
+            if attacks >> lone_king & 1:
+                self._resolve(index, _LOSS, 0)
+            else:
+                self.states[index] = _DRAW
+            return
+
+        children = set()
+        move_count = 0
+        for target in iterate_bits(targets):
+            if occupied >> target & 1:
+                # A capture, which leaves the table
+                move_count += 1
+                position = squares.index(target)
+                rest_types = piece_types[:position] + piece_types[position + 1:]
+                rest_squares = squares[:position] + squares[position + 1:]
+                result = self._probe_exit(rest_types, 0, king, target, rest_squares)
+                if result.wdl == WIN:
+                    self.exit_wins[result.plies].append(index)
+            else:
+                children.add(self.layout.index(0, king, target, squares))
+        self.remaining[index] = move_count + len(children)
+
+    def _add_promotions(self, index, king, lone_king, squares, occupied):
+        for position, (piece_type, square) in enumerate(zip(self.layout.piece_types, squares)):
+            if piece_type != PAWN or square < 48 or occupied >> (square + 8) & 1:
+                continue
+            rest_types = self.layout.piece_types[:position] + self.layout.piece_types[position + 1:]
+            rest_squares = squares[:position] + squares[position + 1:]
+            for promotion_type in _PROMOTION_TYPES:
+                result = self._probe_exit(rest_types + (promotion_type,), 1, king, lone_king,
+                                          rest_squares + (square + 8,))
+                if result.wdl == LOSS:
+                    self.exit_losses[result.plies].append(index)
+
+    def _probe_exit(self, piece_types, side_to_move, king, lone_king, squares):
+        if is_insufficient_material(piece_types):
+            return TablebaseResult(DRAW, 0)
+        ordered = sorted(zip(piece_types, squares), key=lambda piece: _SIGNATURE_ORDER.index(piece[0]))
+        table = self.tablebases.table(signature_name(piece_types))
+        if table is None:
+            raise ValueError(f'{self.layout.signature} needs the {signature_name(piece_types)} table')
+        return table.probe(side_to_move, king, lone_king, [square for _, square in ordered])
+
+    def _resolve(self, index, state, plies):
+        self.states[index] = state
+        self.plies[index] = plies
+        self.resolved[plies].append(index)
+
+    def _propagate(self):
+        states = self.states
+        plies = 0
+        while self.resolved or self.exit_wins or self.exit_losses:
+            # A move out of the table into a lost position wins for the side making it
+            for index in self.exit_losses.pop(plies, ()):
+                if states[index] == _UNKNOWN:
+                    self._resolve(index, _WIN, plies + 1)
+            for index in self.exit_wins.pop(plies, ()):
+                self._lose_a_move(index, plies)
+            for index in self.resolved.pop(plies, ()):
+                side_to_move, king, lone_king, squares = self.layout.position(index)
+                if states[index] == _LOSS:
+                    for predecessor in self._predecessors(side_to_move, king, lone_king, squares):
+                        if states[predecessor] == _UNKNOWN:
+                            self._resolve(predecessor, _WIN, plies + 1)
+                else:
+                    for predecessor in self._predecessors(side_to_move, king, lone_king, squares):
+                        self._lose_a_move(predecessor, plies)
+            plies += 1
+        # Whatever is left can't be forced either way
+        for index in range(self.layout.size):
+            if states[index] == _UNKNOWN:
+                states[index] = _DRAW
+
+    def _lose_a_move(self, index, plies):
+        """
+        Records that one of a lone-king position's moves leads to a win for the other side at the given ply, which
+        loses the position once it has no other moves.
+        """
+        if self.states[index] != _UNKNOWN:
+            return
+        self.remaining[index] -= 1
+        if not self.remaining[index]:
+            self._resolve(index, _LOSS, plies + 1)
+
+    def _predecessors(self, side_to_move, king, lone_king, squares):
+        """
+        The indexes of the valid positions from which a move that stays in the table leads to this one, each once.
+        """
+        layout = self.layout
+        states = self.states
+        occupied = 1 << king | 1 << lone_king
+        for square in squares:
+            occupied |= 1 << square
+        empty = ~occupied
+        predecessors = set()
+        if side_to_move == 0:
+            for origin in iterate_bits(KING_ATTACKS[lone_king] & empty):
+                predecessors.add(layout.index(1, king, origin, squares))
+        else:
+            for origin in iterate_bits(KING_ATTACKS[king] & empty):
+                predecessors.add(layout.index(0, origin, lone_king, squares))
+            for position, (piece_type, square) in enumerate(zip(layout.piece_types, squares)):
+                if piece_type == PAWN:
+                    origins = 0
+                    if square >= 16 and empty >> (square - 8) & 1:
+                        origins = 1 << (square - 8)
+                        if square >> 3 == 3 and empty >> (square - 16) & 1:
+                            origins |= 1 << (square - 16)
+                else:
+                    origins = _attacks(piece_type, square, occupied) & empty
+                for origin in iterate_bits(origins):
+                    moved = list(squares)
+                    moved[position] = origin
+                    predecessors.add(layout.index(0, king, lone_king, moved))
+        return [predecessor for predecessor in predecessors if states[predecessor] != _INVALID]
+
+
+def generate_table(signature, directory):
+    """
+    Generates one signature's table into the directory, which must already hold the tables it depends on. Returns
+    the time taken in seconds.
+    """
+    start = time.perf_counter()
+    layout = _Layout(signature)
+    with Tablebases(directory) as tablebases:
+        values = _Generator(layout.signature, tablebases).generate()
+    path = os.path.join(directory, layout.signature + FILE_EXTENSION)
+    # Write to a temporary file first so a half-written table is never found by a probe
+    temporary_path = path + '.tmp'
+    with open(temporary_path, 'wb') as table_file:
+        table_file.write(HEADER.pack(MAGIC, VERSION, layout.signature.encode('ascii')))
+        table_file.write(values)
+    os.replace(temporary_path, path)
+    return time.perf_counter() - start
+
+
+def generate_tablebases(directory, signatures=DEFAULT_SIGNATURES, workers=None, on_table=None):
+    """
+    Generates the tables for the signatures, and any they depend on, that aren't already in the directory. Tables
+    are generated over a pool of worker processes, each as soon as the tables it needs are done. on_table, if given,
+    is called with each signature and the seconds it took. Returns the signatures generated.
+    """
+    os.makedirs(directory, exist_ok=True)
+    needed = {}
+    to_visit = [signature_name(parse_signature(signature)) for signature in signatures]
+    while to_visit:
+        signature = to_visit.pop()
+        if signature not in needed:
+            needed[signature] = dependencies(signature)
+            to_visit.extend(needed[signature])
+    done = {signature for signature in needed
+            if os.path.exists(os.path.join(directory, signature + FILE_EXTENSION))}
+    generated = []
+    pending = {}
+    with ProcessPoolExecutor(workers or os.cpu_count() or 1) as executor:
+        while True:
+            for signature, required in needed.items():
+                if signature not in done and signature not in pending.values() and required <= done:
+                    pending[executor.submit(generate_table, signature, directory)] = signature
+            if not pending:
+                break
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                signature = pending.pop(future)
+                seconds = future.result()
+                done.add(signature)
+                generated.append(signature)
+                if on_table is not None:
+                    on_table(signature, seconds)
+    return generated
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Generate or probe endgame tablebases.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    generate = commands.add_parser('generate', help='generate tables into a directory')
+    generate.add_argument('directory', help='directory to write tables to')
+    generate.add_argument('signatures', nargs='*', default=DEFAULT_SIGNATURES,
+                          help=f'material signatures such as KQvK (default: {" ".join(DEFAULT_SIGNATURES)})')
+    generate.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='number of worker processes')
+    probe = commands.add_parser('probe', help='look up a position')
+    probe.add_argument('directory', help='directory holding the tables')
+    probe.add_argument('fen', help='position to look up')
+    options = parser.parse_args(args)
+
+    if options.command == 'generate':
+        generate_tablebases(options.directory, options.signatures, options.workers,
+                            lambda signature, seconds: print(f'{signature}: {seconds:.1f}s', file=sys.stderr))
+        return
+
+    with Tablebases(options.directory) as tablebases:
+        result = tablebases.probe(Board.from_fen(options.fen))
+    if result is None:
+        print('Not in the tablebases')
+    else:
+        description = {WIN: 'Win', DRAW: 'Draw', LOSS: 'Loss'}[result.wdl]
+        print(description + (f' in {result.plies} plies' if result.plies else ''))
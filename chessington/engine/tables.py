@@ -0,0 +1,43 @@
+"""
+Destination squares for each square on the board, built once at import time so that move generation can walk
+them without bounds checks or creating new squares.
+
+Every table is indexed by square index (row * 8 + col).
+"""
+from chessington.engine.bitboards import BOARD_SIZE, DIRECTION_STEPS, KNIGHT_STEPS
+from chessington.engine.data import Player, Square
+
+
+def _squares_from_steps(row, col, steps):
+    return tuple(Square.at(row + row_step, col + col_step) for row_step, col_step in steps
+                 if Square.at(row + row_step, col + col_step).is_on_board())
+
+
+def _ray(row, col, row_step, col_step):
+    squares = []
+    square = Square.at(row + row_step, col + col_step)
+    while square.is_on_board():
+        squares.append(square)
+        square = Square.at(square.row + row_step, square.col + col_step)
+    return tuple(squares)
+
+
+def _build_tables():
+    knight_moves = []
+    king_moves = []
+    pawn_captures = {Player.WHITE: [], Player.BLACK: []}
+    rays = []
+    for row in range(BOARD_SIZE):
+        for col in range(BOARD_SIZE):
+            knight_moves.append(_squares_from_steps(row, col, KNIGHT_STEPS))
+            king_moves.append(_squares_from_steps(row, col, DIRECTION_STEPS))
+            pawn_captures[Player.WHITE].append(_squares_from_steps(row, col, ((1, 1), (1, -1))))
+            pawn_captures[Player.BLACK].append(_squares_from_steps(row, col, ((-1, 1), (-1, -1))))
+            rays.append(tuple(_ray(row, col, row_step, col_step) for row_step, col_step in DIRECTION_STEPS))
+    return knight_moves, king_moves, pawn_captures, rays
+
+
+# KNIGHT_MOVES[square] and KING_MOVES[square] are the squares those pieces can reach from the given square.
+# PAWN_CAPTURES[player][square] are the diagonal squares a pawn of that player can capture on.
+# RAY_SQUARES[square][direction] are the squares in the given direction (see bitboards.DIRECTION_STEPS), nearest first.
+KNIGHT_MOVES, KING_MOVES, PAWN_CAPTURES, RAY_SQUARES = _build_tables()
@@ -0,0 +1,204 @@
+"""
+A fixed-size transposition table for caching search results by position key.
+"""
+from array import array
+from collections import namedtuple
+
+EMPTY = 0
+EXACT = 1
+LOWER_BOUND = 2
+UPPER_BOUND = 3
+
+# Bytes used by one entry across all of the table's arrays
+ENTRY_SIZE = array('Q').itemsize + array('h').itemsize + array('i').itemsize + array('B').itemsize \
+             + array('I').itemsize
+BUCKET_SIZE = 2
+
+TableEntry = namedtuple('TableEntry', ['depth', 'score', 'bound', 'best_move'])
+
+
+def _entry_checksum(depth, score, bound, best_move):
+    """
+    A 64-bit value that changes with any of an entry's fields, for checking that they were all written together.
+    """
+    fields = (depth & 0xFFFF) | bound << 16 | (score & 0xFFFFFFFF) << 24
+    return (fields ^ best_move * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+
+
+class TranspositionTable:
+    """
+    A table of search results keyed by Board.zobrist_key, held in preallocated arrays so that its memory use is
+    fixed when it is created.
+
+    Entries are stored in buckets of two slots. The first slot keeps whichever entry was searched deepest, and the
+    second slot always takes the newest entry that did not qualify for the first. Best moves are stored as
+    non-negative integers chosen by the caller, with 0 meaning no move.
+    """
+
+    def __init__(self, size_mb=16):
+        self.bucket_count = max(1, int(size_mb * 1024 * 1024) // (ENTRY_SIZE * BUCKET_SIZE))
+        self._allocate(self.bucket_count * BUCKET_SIZE)
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+        self.overwrites = 0
+
+    def _allocate(self, entry_count):
+        # Repeating a one-element array fills the whole array in one step, without building a zeroed bytes object
+        # to copy from first
+        self.keys = array('Q', [0]) * entry_count
+        self.depths = array('h', [0]) * entry_count
+        self.scores = array('i', [0]) * entry_count
+        self.bounds = array('B', [0]) * entry_count
+        self.best_moves = array('I', [0]) * entry_count
+
+    @property
+    def size_bytes(self):
+        return self.bucket_count * BUCKET_SIZE * ENTRY_SIZE
+
+    def probe(self, key):
+        """
+        Returns the TableEntry stored for the key, or None if there isn't one.
+        """
+        slot = (key % self.bucket_count) * BUCKET_SIZE
+        for index in (slot, slot + 1):
+            stored_key, entry = self._read(index)
+            if stored_key == key and entry.bound != EMPTY:
+                self.hits += 1
+                return entry
+        if self.bounds[slot] != EMPTY or self.bounds[slot + 1] != EMPTY:
+            self.collisions += 1
+        else:
+            self.misses += 1
+        return None
+
+    def store(self, key, depth, score, bound, best_move=0):
+        """
+        Records a search result, replacing an older entry if the bucket is full.
+        """
+        slot = (key % self.bucket_count) * BUCKET_SIZE
+        slot_key, slot_entry = self._read(slot)
+        if slot_entry.bound == EMPTY or slot_key == key or depth >= slot_entry.depth:
+            if slot_entry.bound != EMPTY and slot_key != key:
+                # Demote the shallower entry to the always-replace slot rather than losing it outright
+                self._write(slot + 1, slot_key, *slot_entry)
+            self._write(slot, key, depth, score, bound, best_move)
+        else:
+            self._write(slot + 1, key, depth, score, bound, best_move)
+
+    def _read(self, index):
+        """
+        The key stored at an index, and its TableEntry.
+        """
+        return self.keys[index], TableEntry(self.depths[index], self.scores[index], self.bounds[index],
+                                            self.best_moves[index])
+
+    def _write(self, index, key, depth, score, bound, best_move):
+        if self.bounds[index] != EMPTY and self._read(index)[0] != key:
+            self.overwrites += 1
+        self._write_key(index, key, depth, score, bound, best_move)
+        self.depths[index] = depth
+        self.scores[index] = score
+        self.bounds[index] = bound
+        self.best_moves[index] = best_move
+
+    def _write_key(self, index, key, depth, score, bound, best_move):
+        self.keys[index] = key
+
+    def clear(self):
+        entry_count = len(self.keys)
+        self._allocate(entry_count)
+        self.hits = self.misses = self.collisions = self.overwrites = 0
+
+    def stats(self):
+        """
+        The table's counters, for reporting how well it is performing.
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'collisions': self.collisions,
+            'overwrites': self.overwrites,
+        }
+
+
+class SharedTranspositionTable(TranspositionTable):
+    """
+    A TranspositionTable whose arrays live in a multiprocessing.shared_memory block, so that searches running in
+    several processes read and write the same entries. The process that creates the table owns the block and must
+    close() it; other processes attach to it by name, which is what happens when the table is pickled.
+
+    Entries are written field by field without locking, so a reader can see fields from two different writes. To
+    catch this, the key is stored XORed with a checksum of the entry's other fields, and a probe only matches when
+    the stored key XORed with the checksum of the fields it read gives back the key it is looking for.
+    """
+
+    # Largest items first, so every array starts suitably aligned
+    _LAYOUT = (('keys', 'Q'), ('best_moves', 'I'), ('scores', 'i'), ('depths', 'h'), ('bounds', 'B'))
+
+    def __init__(self, size_mb=16, name=None):
+        self.size_mb = size_mb
+        self._shared_memory = None
+        self._name = name
+        super().__init__(size_mb)
+
+    @classmethod
+    def attach(cls, name, size_mb):
+        """
+        Opens a table created by another process, given its name and the size_mb it was created with.
+        """
+        return cls(size_mb, name)
+
+    @property
+    def name(self):
+        return self._shared_memory.name
+
+    def _allocate(self, entry_count):
+        from multiprocessing import shared_memory
+
+        size = entry_count * ENTRY_SIZE
+        if self._shared_memory is None:
+            if self._name is None:
+                self._shared_memory = shared_memory.SharedMemory(create=True, size=size)
+                self._owner = True
+            else:
+                self._shared_memory = shared_memory.SharedMemory(name=self._name)
+                self._owner = False
+        else:
+            self._shared_memory.buf[:size] = bytes(size)
+
+        offset = 0
+        for attribute, typecode in self._LAYOUT:
+            array_size = entry_count * array(typecode).itemsize
+            setattr(self, attribute, self._shared_memory.buf[offset:offset + array_size].cast(typecode))
+            offset += array_size
+
+    def _read(self, index):
+        depth, score, bound, best_move = self.depths[index], self.scores[index], self.bounds[index], \
+            self.best_moves[index]
+        stored_key = self.keys[index] ^ _entry_checksum(depth, score, bound, best_move)
+        return stored_key, TableEntry(depth, score, bound, best_move)
+
+    def _write_key(self, index, key, depth, score, bound, best_move):
+        self.keys[index] = key ^ _entry_checksum(depth, score, bound, best_move)
+
+    def clear(self):
+        # Zero the existing block rather than allocating a new one, so attached processes see the change
+        self._allocate(self.bucket_count * BUCKET_SIZE)
+        self.hits = self.misses = self.collisions = self.overwrites = 0
+
+    def close(self):
+        """
+        Detaches from the shared block, and frees it if this process created it.
+        """
+        if self._shared_memory is None:
+            return
+        for attribute, _ in self._LAYOUT:
+            getattr(self, attribute).release()
+        self._shared_memory.close()
+        if self._owner:
+            self._shared_memory.unlink()
+        self._shared_memory = None
+
+    def __reduce__(self):
+        return SharedTranspositionTable.attach, (self.name, self.size_mb)
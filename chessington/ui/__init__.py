@@ -2,11 +2,15 @@
 A GUI chess board that can be interacted with, and pieces moved around on.
 """
 
+import os
 import tkinter as tk
 from typing import Iterable
 
 from chessington.engine.board import Board, BOARD_SIZE
-from chessington.engine.data import Square
+from chessington.engine.book import OpeningBook
+from chessington.engine.data import Player, Square, SQUARES, move_from_index, move_to_index
+from chessington.engine.search import search
+from chessington.engine.transposition import TranspositionTable
 from chessington.ui.colours import Colour
 from chessington.ui.images import ImageRepository
 
@@ -47,13 +51,20 @@ def highlight_squares(window: tk.Tk, board: Board, from_square: Square, to_squar
         update_square(window, board, square, Colour.TO_SQUARE)
 
 
+def get_legal_destinations(board: Board, from_square: Square):
+    """Find the squares the piece on from_square can legally move to"""
+    from_index = from_square.index
+    return [SQUARES[move_to_index(move)] for move in board.legal_moves() if move_from_index(move) == from_index]
+
+
 def square_id(square: Square):
     """Generate a tkinter-suitable name for a square"""
     return f'square@{square.row}{square.col}'
 
 
-def play_game():
-    """Launch Chessington!"""
+def play_game(computer_player: Player = None, time_limit: float = 1.0, book: OpeningBook = None):
+    """Launch Chessington! If computer_player is given, the computer plays that side, thinking for time_limit seconds
+    unless the position is in the opening book"""
     window = tk.Tk()
     window.title('Chessington')
     window.resizable(False, False)
@@ -61,6 +72,38 @@ def play_game():
 
     from_square = None
     to_squares = []
+    computer_move_pending = False
+    # One table for the whole game, so each move's search starts with what the last one found
+    transposition_table = TranspositionTable()
+
+    def play_computer_move():
+        nonlocal computer_move_pending
+        computer_move_pending = False
+        move = book.choose(board) if book is not None else None
+        if move is None:
+            move = search(board, time_limit=time_limit, transposition_table=transposition_table).best_move
+        if move is not None:
+            board.apply_move(move)
+        update_pieces_and_colours(window, board)
+
+    def schedule_computer_move():
+        # Let the window redraw the last move before the computer starts thinking
+        nonlocal computer_move_pending
+        if board.current_player == computer_player:
+            computer_move_pending = True
+            window.after(10, play_computer_move)
+
+    def take_back():
+        nonlocal from_square, to_squares
+        # Wait for the computer to finish its move rather than take back a position it is still thinking about
+        if computer_move_pending:
+            return
+        # Against the computer, take back its reply too so that it is the player's turn again
+        if board.undo() is not None and board.current_player == computer_player:
+            board.undo()
+        from_square, to_squares = None, []
+        update_pieces_and_colours(window, board)
+        schedule_computer_move()
 
     def generate_click_handler(clicked_square: Square):
         def handle_click():
@@ -71,11 +114,12 @@ def play_game():
             if from_square is not None and clicked_square in to_squares:
                 board.get_piece(from_square).move_to(board, clicked_square)
                 from_square, to_squares = None, []
+                schedule_computer_move()
 
             # If clicking on a piece whose turn it is, get its allowed moves
-            elif clicked_piece is not None and clicked_piece.player == board.current_player:
+            elif clicked_piece is not None and clicked_piece.player == board.current_player != computer_player:
                 from_square = clicked_square
-                to_squares = clicked_piece.get_available_moves(board)
+                to_squares = get_legal_destinations(board, clicked_square)
 
             # Otherwise reset everthing to default
             else:
@@ -104,6 +148,21 @@ def play_game():
             btn = tk.Button(frame, command=generate_click_handler(square), name='button')
             btn.grid(sticky='wens')
 
+    tk.Button(window, text='Take back', command=take_back, name='takeback').grid(row=BOARD_SIZE, column=0,
+                                                                                columnspan=BOARD_SIZE, sticky='we')
+
     update_pieces_and_colours(window, board)
+    schedule_computer_move()
     window.mainloop()
 
+
+def play_against_computer():
+    """Launch Chessington with the computer playing black, using the Polyglot book at $CHESSINGTON_BOOK if set"""
+    book_path = os.environ.get('CHESSINGTON_BOOK')
+    book = OpeningBook(book_path) if book_path else None
+    try:
+        play_game(computer_player=Player.BLACK, book=book)
+    finally:
+        if book is not None:
+            book.close()
+
@@ -0,0 +1,81 @@
+import io
+import json
+
+from chessington.engine.analyse import read_positions, completed_lines, analyse, analyse_position, COMPLETION_ORDER
+
+POSITIONS = """# Mate in one, then the starting position
+6k1/5ppp/8/8/8/8/8/R5K1 w - - bm Ra8#; id "back rank";
+
+rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1
+4k3/8/8/3q4/8/8/3R4/4K3 w - - 3 40 id "free queen";
+"""
+
+
+class TestAnalyse:
+
+    @staticmethod
+    def test_reads_epd_and_fen_lines():
+
+        # Act
+        positions = list(read_positions(io.StringIO(POSITIONS)))
+
+        # Assert
+        assert positions == [
+            (2, '6k1/5ppp/8/8/8/8/8/R5K1 w - -', 'back rank'),
+            (4, 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1', None),
+            (5, '4k3/8/8/3q4/8/8/3R4/4K3 w - - 3 40', 'free queen'),
+        ]
+
+    @staticmethod
+    def test_unreadable_position_gives_an_error():
+
+        # Act
+        result = analyse_position(7, 'not a position', None, depth=1)
+
+        # Assert
+        assert result['line'] == 7
+        assert 'error' in result
+
+    @staticmethod
+    def test_results_are_written_in_input_order():
+
+        # Arrange
+        output = io.StringIO()
+
+        # Act
+        analysed = analyse(read_positions(io.StringIO(POSITIONS)), output, workers=2, chunk_size=1, depth=2)
+
+        # Assert
+        results = [json.loads(line) for line in output.getvalue().splitlines()]
+        assert analysed == 3
+        assert [result['line'] for result in results] == [2, 4, 5]
+        assert results[0]['best_move'] == 'a1a8'
+        assert results[2]['best_move'] == 'd2d5'
+        assert all(result['nodes'] > 0 for result in results)
+
+    @staticmethod
+    def test_completed_lines_are_skipped():
+
+        # Arrange
+        output = io.StringIO()
+
+        # Act
+        analyse(read_positions(io.StringIO(POSITIONS)), output, workers=1, order=COMPLETION_ORDER, depth=1,
+                skip_lines={2, 5})
+
+        # Assert
+        assert [json.loads(line)['line'] for line in output.getvalue().splitlines()] == [4]
+
+    @staticmethod
+    def test_resume_drops_partly_written_line(tmp_path):
+
+        # Arrange
+        path = tmp_path / 'results.jsonl'
+        path.write_text('{"line": 2, "best_move": "a1a8"}\n{"line": 4, "best_mo')
+
+        # Act
+        lines = completed_lines(str(path))
+
+        # Assert
+        assert lines == {2}
+        assert path.read_text() == '{"line": 2, "best_move": "a1a8"}\n'
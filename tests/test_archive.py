@@ -0,0 +1,129 @@
+import pickle
+import random
+
+import pytest
+
+from chessington.engine.archive import ArchiveWriter, GameArchive, write_archive
+from chessington.engine.board import Board
+from chessington.engine.perft import move_name
+
+
+def play_moves(board, names):
+    for name in names:
+        board.apply_move(next(move for move in board.legal_moves() if move_name(move) == name))
+    return board
+
+
+def play_random_game(seed, plies):
+    generator = random.Random(seed)
+    board = Board.at_starting_position()
+    for _ in range(plies):
+        moves = board.legal_moves()
+        if not moves:
+            break
+        board.apply_move(generator.choice(moves))
+    return board
+
+
+class TestGameArchive:
+
+    @staticmethod
+    def test_move_lists_are_restored(tmp_path):
+
+        # Arrange
+        path = tmp_path / 'games.chga'
+        boards = [play_random_game(seed, 150) for seed in range(10)]
+
+        # Act
+        write_archive(path, boards)
+        with GameArchive(path) as archive:
+            restored = [archive.board(number) for number in range(len(archive))]
+
+        # Assert
+        assert [[move.code for move in board.move_list] for board in restored] == \
+               [[move.code for move in board.move_list] for board in boards]
+        assert [board.to_fen() for board in restored] == [board.to_fen() for board in boards]
+
+    @staticmethod
+    def test_special_moves_are_restored(tmp_path):
+
+        # Arrange
+        path = tmp_path / 'games.chga'
+        board = play_moves(Board.from_fen('r3k3/6P1/8/8/3p4/8/4P3/R3K2R w KQq - 0 1'),
+                           ['e2e4', 'd4e3', 'e1g1', 'e8c8', 'g7g8n'])
+
+        # Act
+        write_archive(path, [board])
+        with GameArchive(path) as archive:
+            restored = archive.board(0)
+
+        # Assert
+        assert restored.move_list == board.move_list
+        assert restored.to_fen() == board.to_fen()
+
+    @staticmethod
+    def test_games_are_read_by_number(tmp_path):
+
+        # Arrange
+        path = tmp_path / 'games.chga'
+        with ArchiveWriter(path) as writer:
+            for number in range(100):
+                writer.write(play_moves(Board.at_starting_position(), ['e2e4', 'e7e5'][:number % 3]),
+                             {'Round': str(number)})
+
+        # Act
+        with GameArchive(path) as archive:
+            games = [archive.game(number) for number in (58, 0, 97)]
+
+        # Assert
+        assert [game.headers for game in games] == [{'Round': '58'}, {'Round': '0'}, {'Round': '97'}]
+        assert [len(game.moves) for game in games] == [1, 0, 1]
+
+    @staticmethod
+    def test_starting_position_is_recorded_and_the_board_left_unchanged(tmp_path):
+
+        # Arrange
+        path = tmp_path / 'games.chga'
+        fen = '4k3/8/8/8/8/8/4P3/4K3 w - - 0 1'
+        board = play_moves(Board.from_fen(fen), ['e2e4', 'e8d7'])
+        final_fen = board.to_fen()
+
+        # Act
+        write_archive(path, [(board, {'Event': 'Endgame'})])
+        with GameArchive(path) as archive:
+            headers = archive.game(0).headers
+
+        # Assert
+        assert headers == {'Event': 'Endgame', 'FEN': fen}
+        assert board.to_fen() == final_fen
+        assert len(board.move_list) == 2
+
+    @staticmethod
+    def test_games_are_much_smaller_than_pickled_boards(tmp_path):
+
+        # Arrange
+        path = tmp_path / 'games.chga'
+        boards = [play_random_game(seed, 80) for seed in range(20)]
+
+        # Act
+        write_archive(path, boards)
+
+        # Assert
+        pickled_size = sum(len(pickle.dumps(board)) for board in boards)
+        assert path.stat().st_size * 20 <= pickled_size
+
+    @staticmethod
+    def test_unfinished_archive_is_rejected(tmp_path):
+
+        # Arrange
+        path = tmp_path / 'games.chga'
+        writer = ArchiveWriter(path)
+        writer.write(Board.at_starting_position())
+        writer._file.flush()
+
+        # Act / Assert
+        with pytest.raises(ValueError):
+            GameArchive(path)
+        writer.close()
+        with GameArchive(path) as archive:
+            assert len(archive) == 1
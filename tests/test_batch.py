@@ -0,0 +1,116 @@
+import random
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from chessington.engine.batch import PositionBatch, attacked_squares, in_check, mobility, popcount, \
+    to_square_masks  # noqa: E402
+from chessington.engine.bitboards import PIECE_TYPE_COUNT  # noqa: E402
+from chessington.engine.board import Board  # noqa: E402
+from chessington.engine.data import Player  # noqa: E402
+
+FENS = [
+    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1',
+    'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1',
+    'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R b KQkq - 0 1',
+    '8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1',
+    'r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1',
+    'rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8',
+    '4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 2',
+    '4k3/8/8/8/4pP2/8/8/4K3 b - f3 0 2',
+    'R5k1/5ppp/8/8/8/8/8/6K1 b - - 1 1',
+]
+
+
+def corpus():
+    """
+    The standard test positions plus positions from random games, so every kind of move turns up.
+    """
+    boards = [Board.from_fen(fen) for fen in FENS]
+    generator = random.Random(18)
+    for _ in range(20):
+        board = Board.at_starting_position()
+        for _ in range(generator.randrange(1, 80)):
+            moves = board.legal_moves()
+            if not moves:
+                break
+            board.apply_move(generator.choice(moves))
+        boards.append(board)
+    return boards
+
+
+def scalar_mobility(board):
+    counts = [0] * PIECE_TYPE_COUNT
+    for piece, _ in board.get_pieces(board.current_player):
+        counts[piece.piece_type] += len(piece.get_piece_specific_moves(board))
+    return counts
+
+
+class TestBatch:
+
+    @staticmethod
+    def test_attacked_squares_match_board():
+
+        # Arrange
+        boards = corpus()
+        batch = PositionBatch.from_boards(boards)
+
+        # Act
+        white_attacks = attacked_squares(batch, 0)
+        black_attacks = attacked_squares(batch, 1)
+
+        # Assert
+        assert [int(attacks) for attacks in white_attacks] == [board.attacked_squares(Player.WHITE) for board in boards]
+        assert [int(attacks) for attacks in black_attacks] == [board.attacked_squares(Player.BLACK) for board in boards]
+
+    @staticmethod
+    def test_in_check_matches_board():
+
+        # Arrange
+        boards = corpus()
+        batch = PositionBatch.from_boards(boards)
+
+        # Act
+        checks = in_check(batch)
+
+        # Assert
+        assert list(checks) == [board.is_in_check(board.current_player) for board in boards]
+        assert checks.any()
+
+    @staticmethod
+    def test_mobility_matches_piece_moves():
+
+        # Arrange
+        boards = corpus()
+        batch = PositionBatch.from_boards(boards)
+
+        # Act
+        counts = mobility(batch)
+
+        # Assert
+        assert counts.tolist() == [scalar_mobility(board) for board in boards]
+
+    @staticmethod
+    def test_batch_can_be_built_from_fens():
+
+        # Act
+        batch = PositionBatch.from_fens(FENS[:2])
+
+        # Assert
+        assert len(batch) == 2
+        assert mobility(batch).sum(axis=1).tolist() == [20, 48]
+
+    @staticmethod
+    def test_square_masks_and_popcount():
+
+        # Arrange
+        bitboards = np.array([0, 1, (1 << 63) | (1 << 9)], dtype=np.uint64)
+
+        # Act
+        masks = to_square_masks(bitboards)
+
+        # Assert
+        assert masks.shape == (3, 64)
+        assert masks.sum(axis=1).tolist() == popcount(bitboards).tolist() == [0, 1, 2]
+        assert masks[2, 63] and masks[2, 9] and masks[1, 0]
@@ -1,5 +1,7 @@
 from chessington.engine.board import Board
 from chessington.engine.data import Player, Square
+from chessington.engine.pieces import King, Pawn, Queen, Rook
+from chessington.engine.search import search
 
 def test_new_board_has_white_pieces_at_bottom():
 
@@ -35,4 +37,387 @@ def test_pieces_can_be_moved_on_the_board():
     board.move_piece(from_square, to_square)
 
     assert board.get_piece(from_square) is None
-    assert board.get_piece(to_square) is piece
\ No newline at end of file
+    assert board.get_piece(to_square) is piece
+
+def test_moving_a_piece_updates_occupancy():
+
+    # Arrange
+    board = Board.at_starting_position()
+    from_square = Square.at(1, 4)
+    to_square = Square.at(3, 4)
+
+    # Act
+    board.move_piece(from_square, to_square)
+
+    # Assert
+    assert board.square_is_empty(from_square)
+    assert not board.square_is_empty(to_square)
+    assert board.square_contains_opponent(to_square, Player.BLACK)
+    assert not board.square_contains_opponent(to_square, Player.WHITE)
+
+
+def test_king_is_in_check_after_exposing_it_to_a_rook():
+
+    # Arrange
+    board = Board.empty()
+    board.set_piece(Square.at(0, 4), King(Player.WHITE))
+    board.set_piece(Square.at(1, 4), Queen(Player.WHITE))
+    board.set_piece(Square.at(7, 4), Rook(Player.BLACK))
+
+    # Act
+    board.move_piece(Square.at(1, 4), Square.at(1, 0))
+
+    # Assert
+    assert board.find_king(Player.WHITE) == Square.at(0, 4)
+    assert board.king_is_in_check()
+
+
+def test_blocked_rook_does_not_give_check():
+
+    # Arrange
+    board = Board.empty()
+    board.set_piece(Square.at(0, 4), King(Player.WHITE))
+    board.set_piece(Square.at(1, 4), Queen(Player.WHITE))
+    board.set_piece(Square.at(7, 4), Rook(Player.BLACK))
+
+    # Act
+    board.move_piece(Square.at(1, 4), Square.at(2, 4))
+
+    # Assert
+    assert not board.king_is_in_check()
+
+
+def test_unmake_move_restores_a_capture():
+
+    # Arrange
+    board = Board.empty()
+    queen = Queen(Player.WHITE)
+    rook = Rook(Player.BLACK)
+    board.set_piece(Square.at(0, 0), queen)
+    board.set_piece(Square.at(7, 0), rook)
+
+    # Act
+    board.make_move(Square.at(0, 0), Square.at(7, 0))
+    board.unmake_move()
+
+    # Assert
+    assert board.get_piece(Square.at(0, 0)) is queen
+    assert board.get_piece(Square.at(7, 0)) is rook
+    assert not queen.has_moved
+    assert board.current_player == Player.WHITE
+    assert board.move_list == []
+
+
+def test_unmake_move_restores_castling_rook():
+
+    # Arrange
+    board = Board.empty()
+    king = King(Player.WHITE)
+    rook = Rook(Player.WHITE)
+    board.set_piece(Square.at(0, 4), king)
+    board.set_piece(Square.at(0, 0), rook)
+
+    # Act
+    board.make_move(Square.at(0, 4), Square.at(0, 2))
+    castled_rook = board.get_piece(Square.at(0, 3))
+    board.unmake_move()
+
+    # Assert
+    assert castled_rook is rook
+    assert board.get_piece(Square.at(0, 4)) is king
+    assert board.get_piece(Square.at(0, 0)) is rook
+    assert board.square_is_empty(Square.at(0, 3))
+    assert board.square_is_empty(Square.at(0, 2))
+
+
+def test_unmake_move_restores_en_passant_capture():
+
+    # Arrange
+    board = Board.empty()
+    white_pawn = Pawn(Player.WHITE)
+    black_pawn = Pawn(Player.BLACK)
+    board.set_piece(Square.at(1, 4), white_pawn)
+    board.set_piece(Square.at(3, 5), black_pawn)
+    board.move_piece(Square.at(1, 4), Square.at(3, 4))
+
+    # Act
+    board.make_move(Square.at(3, 5), Square.at(2, 4))
+    captured_during_move = board.square_is_empty(Square.at(3, 4))
+    board.unmake_move()
+
+    # Assert
+    assert captured_during_move
+    assert board.get_piece(Square.at(3, 4)) is white_pawn
+    assert board.get_piece(Square.at(3, 5)) is black_pawn
+    assert board.current_player == Player.BLACK
+
+
+def test_unmake_move_restores_promoted_pawn():
+
+    # Arrange
+    board = Board.empty()
+    pawn = Pawn(Player.WHITE)
+    board.set_piece(Square.at(6, 0), pawn)
+
+    # Act
+    board.make_move(Square.at(6, 0), Square.at(7, 0))
+    promoted_piece = board.get_piece(Square.at(7, 0))
+    board.unmake_move()
+
+    # Assert
+    assert isinstance(promoted_piece, Queen)
+    assert board.get_piece(Square.at(6, 0)) is pawn
+    assert board.square_is_empty(Square.at(7, 0))
+    assert board.bitboards == Board(Player.WHITE, board.board).bitboards
+
+
+def test_find_piece_follows_moved_piece():
+
+    # Arrange
+    board = Board.at_starting_position()
+    knight_square = Square.at(0, 6)
+    knight = board.get_piece(knight_square)
+
+    # Act
+    knight.move_to(board, Square.at(2, 5))
+
+    # Assert
+    assert board.find_piece(knight) == Square.at(2, 5)
+
+
+def test_get_pieces_omits_captured_pieces():
+
+    # Arrange
+    board = Board.empty()
+    queen = Queen(Player.WHITE)
+    rook = Rook(Player.BLACK)
+    board.set_piece(Square.at(0, 0), queen)
+    board.set_piece(Square.at(7, 0), rook)
+
+    # Act
+    board.move_piece(Square.at(0, 0), Square.at(7, 0))
+
+    # Assert
+    assert board.get_pieces(Player.WHITE) == [(queen, Square.at(7, 0))]
+    assert board.get_pieces(Player.BLACK) == []
+
+
+def test_starting_position_has_sixteen_pieces_each():
+
+    # Arrange
+    board = Board.at_starting_position()
+
+    # Act
+    white_pieces = board.get_pieces(Player.WHITE)
+    black_pieces = board.get_pieces(Player.BLACK)
+
+    # Assert
+    assert len(white_pieces) == 16
+    assert len(black_pieces) == 16
+    assert all(board.get_piece(square) is piece for piece, square in white_pieces + black_pieces)
+
+
+def test_square_attacked_by_pawn_only_diagonally_forwards():
+
+    # Arrange
+    board = Board.empty()
+    board.set_piece(Square.at(3, 3), Pawn(Player.WHITE))
+
+    # Act / Assert
+    assert board.is_square_attacked(Square.at(4, 4), Player.WHITE)
+    assert board.is_square_attacked(Square.at(4, 2), Player.WHITE)
+    assert not board.is_square_attacked(Square.at(4, 3), Player.WHITE)
+    assert not board.is_square_attacked(Square.at(2, 4), Player.WHITE)
+    assert not board.is_square_attacked(Square.at(4, 4), Player.BLACK)
+
+
+def test_square_attack_along_a_line_is_blocked_by_first_piece():
+
+    # Arrange
+    board = Board.empty()
+    board.set_piece(Square.at(0, 0), Queen(Player.BLACK))
+    board.set_piece(Square.at(3, 3), Pawn(Player.WHITE))
+
+    # Act / Assert
+    assert board.is_square_attacked(Square.at(3, 3), Player.BLACK)
+    assert not board.is_square_attacked(Square.at(5, 5), Player.BLACK)
+    assert board.is_square_attacked(Square.at(0, 7), Player.BLACK)
+
+
+def test_starting_position_has_standard_polyglot_key():
+
+    # Arrange
+    board = Board.at_starting_position()
+
+    # Act
+    board.move_piece(Square.at(1, 4), Square.at(3, 4))
+
+    # Assert
+    assert board.zobrist_key == 0x823C9B50FD114196
+
+
+def test_transposed_positions_have_the_same_key():
+
+    # Arrange
+    board_1 = Board.at_starting_position()
+    board_2 = Board.at_starting_position()
+
+    # Act
+    for from_square, to_square in [((0, 6), (2, 5)), ((7, 6), (5, 5)), ((0, 1), (2, 2)), ((7, 1), (5, 2))]:
+        board_1.get_piece(Square.at(*from_square)).move_to(board_1, Square.at(*to_square))
+    for from_square, to_square in [((0, 1), (2, 2)), ((7, 1), (5, 2)), ((0, 6), (2, 5)), ((7, 6), (5, 5))]:
+        board_2.get_piece(Square.at(*from_square)).move_to(board_2, Square.at(*to_square))
+
+    # Assert
+    assert board_1.zobrist_key == board_2.zobrist_key
+    assert board_1.zobrist_key == board_1.compute_zobrist_key()
+
+
+def test_castling_changes_the_key():
+
+    # Arrange
+    board = Board.empty()
+    board.set_piece(Square.at(0, 4), King(Player.WHITE))
+    board.set_piece(Square.at(0, 7), Rook(Player.WHITE))
+    board.set_piece(Square.at(7, 4), King(Player.BLACK))
+    original_key = board.compute_zobrist_key()
+
+    # Act
+    board.make_move(Square.at(0, 4), Square.at(0, 6))
+    key_after_castling = board.zobrist_key
+    recomputed_key_after_castling = board.compute_zobrist_key()
+    board.unmake_move()
+
+    # Assert
+    assert key_after_castling != original_key
+    assert key_after_castling == recomputed_key_after_castling
+    assert board.zobrist_key == original_key
+
+
+def test_starting_fen_is_the_position_before_the_played_moves():
+
+    # Arrange
+    fen = '4k3/8/8/8/3p4/8/4P3/4K3 w - - 0 1'
+    board = Board.from_fen(fen)
+    board.make_move(Square.at(1, 4), Square.at(3, 4))
+    board.make_move(Square.at(3, 3), Square.at(2, 4))
+    final_fen = board.to_fen()
+
+    # Act
+    starting_fen = board.starting_fen()
+
+    # Assert
+    assert starting_fen == fen
+    assert len(board.played_moves()) == 2
+    assert board.to_fen() == final_fen
+
+
+def test_undo_and_redo_step_through_a_game():
+
+    # Arrange
+    board = Board.from_fen('r3k3/6P1/8/8/3p4/8/4P3/R3K2R w KQq - 0 1')
+    fens = [board.to_fen()]
+    for from_square, to_square in [((1, 4), (3, 4)), ((3, 3), (2, 4)), ((0, 4), (0, 6)), ((7, 4), (7, 2)),
+                                   ((6, 6), (7, 6))]:
+        board.make_move(Square.at(*from_square), Square.at(*to_square))
+        fens.append(board.to_fen())
+    key_after_moves = board.zobrist_key
+
+    # Act
+    undone_fens = []
+    while board.undo() is not None:
+        undone_fens.append(board.to_fen())
+    redone_fens = []
+    while board.redo() is not None:
+        redone_fens.append(board.to_fen())
+
+    # Assert
+    assert undone_fens == fens[-2::-1]
+    assert redone_fens == fens[1:]
+    assert board.zobrist_key == key_after_moves
+
+
+def test_playing_a_move_forgets_the_moves_undone():
+
+    # Arrange
+    board = Board.at_starting_position()
+    board.make_move(Square.at(1, 4), Square.at(3, 4))
+    board.undo()
+
+    # Act
+    board.get_piece(Square.at(1, 3)).move_to(board, Square.at(3, 3))
+
+    # Assert
+    assert board.redo() is None
+    assert board.get_piece(Square.at(3, 3)) is not None
+    assert board.get_piece(Square.at(3, 4)) is None
+
+
+def test_repeated_positions_are_detected():
+
+    # Arrange
+    board = Board.at_starting_position()
+    knight_moves = [((0, 6), (2, 5)), ((7, 6), (5, 5)), ((2, 5), (0, 6)), ((5, 5), (7, 6))]
+
+    # Act
+    repeated = []
+    for _ in range(2):
+        for from_square, to_square in knight_moves:
+            board.make_move(Square.at(*from_square), Square.at(*to_square))
+            repeated.append((board.is_repetition(), board.is_draw_by_repetition()))
+    board.undo()
+
+    # Assert
+    assert repeated == [(False, False)] * 3 + [(True, False)] * 4 + [(True, True)]
+    assert not board.is_draw_by_repetition()
+
+
+def test_pawn_move_resets_the_fifty_move_count():
+
+    # Arrange
+    board = Board.from_fen('4k3/8/8/8/8/8/4P3/4K1N1 w - - 99 80')
+
+    # Act
+    board.make_move(Square.at(0, 6), Square.at(2, 5))
+    fifty_moves_after_knight_move = board.is_fifty_move_draw()
+    board.undo()
+    board.make_move(Square.at(1, 4), Square.at(3, 4))
+
+    # Assert
+    assert fifty_moves_after_knight_move
+    assert not board.is_fifty_move_draw()
+
+
+def test_looking_ahead_keeps_the_moves_undone():
+
+    # Arrange
+    board = Board.at_starting_position()
+    board.make_move(Square.at(1, 4), Square.at(3, 4))
+    played_fen = board.to_fen()
+    board.undo()
+
+    # Act
+    board.get_piece(Square.at(0, 6)).get_available_moves(board)
+    search(board, depth=2)
+    redone_move = board.redo()
+
+    # Assert
+    assert redone_move is not None
+    assert board.to_fen() == played_fen
+
+
+def test_starting_fen_leaves_pieces_moved_by_hand_unchanged():
+
+    # Arrange
+    board = Board.at_starting_position()
+    for from_square, to_square in [((1, 4), (3, 4)), ((6, 4), (4, 4)), ((0, 4), (1, 4)), ((7, 4), (6, 4)),
+                                   ((1, 4), (0, 4)), ((6, 4), (7, 4))]:
+        board.move_piece(Square.at(*from_square), Square.at(*to_square))
+    fen = board.to_fen()
+
+    # Act
+    starting_fen = board.starting_fen()
+
+    # Assert
+    assert starting_fen == 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1'
+    assert board.to_fen() == fen
@@ -0,0 +1,120 @@
+import random
+
+from chessington.engine.board import Board
+from chessington.engine.book import OpeningBook, build_book, polyglot_move, ENTRY
+from chessington.engine.perft import move_name
+from chessington.engine.pgn import read_games
+
+GAMES = """[Event "First"]
+[Result "1-0"]
+
+1. e4 e5 2. Nf3 Nc6 3. Bb5 a6 4. Ba4 Nf6 5. O-O Be7 1-0
+
+[Event "Second"]
+[Result "1/2-1/2"]
+
+1. e4 c5 2. Nf3 d6 1/2-1/2
+
+[Event "Third"]
+[Result "0-1"]
+
+1. d4 d5 0-1
+
+[Event "Unfinished"]
+[Result "*"]
+
+1. c4 *
+"""
+
+
+def find_move(board, name):
+    return next(move for move in board.legal_moves() if move_name(move) == name)
+
+
+class TestOpeningBook:
+
+    @staticmethod
+    def test_starting_position_key_finds_its_entries(tmp_path):
+
+        # Arrange
+        path = tmp_path / 'book.bin'
+        key = Board.at_starting_position().zobrist_key
+        path.write_bytes(ENTRY.pack(key - 1, 1, 1, 0) + ENTRY.pack(key, 0x031C, 10, 0) + ENTRY.pack(key, 0x2D3, 5, 0)
+                         + ENTRY.pack(key + 1, 1, 1, 0))
+
+        # Act
+        with OpeningBook(str(path)) as book:
+            moves = book.moves(Board.at_starting_position())
+
+        # Assert
+        assert [(move_name(book_move.move), book_move.weight) for book_move in moves] == [('e2e4', 10), ('d2d3', 5)]
+
+    @staticmethod
+    def test_castling_is_encoded_as_the_king_taking_its_rook():
+
+        # Arrange
+        board = Board.from_fen('r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1')
+
+        # Act
+        king_side = polyglot_move(find_move(board, 'e1g1'))
+        queen_side = polyglot_move(find_move(board, 'e1c1'))
+
+        # Assert
+        assert king_side == 4 << 6 | 7
+        assert queen_side == 4 << 6 | 0
+
+    @staticmethod
+    def test_built_book_weights_moves_by_result(tmp_path):
+
+        # Arrange
+        path = str(tmp_path / 'book.bin')
+
+        # Act
+        games_used = build_book(read_games(GAMES.splitlines()), path)
+
+        # Assert
+        assert games_used == 3
+        with OpeningBook(path) as book:
+            start = Board.at_starting_position()
+            assert [(move_name(book_move.move), book_move.weight) for book_move in book.moves(start)] \
+                == [('e2e4', 3)]
+            start.apply_move(find_move(start, 'e2e4'))
+            assert sorted((move_name(book_move.move), book_move.weight) for book_move in book.moves(start)) \
+                == [('c7c5', 1)]
+            start.apply_move(find_move(start, 'e7e5'))
+            start.apply_move(find_move(start, 'g1f3'))
+            start.apply_move(find_move(start, 'b8c6'))
+            for name in ('f1b5', 'a7a6', 'b5a4', 'g8f6'):
+                start.apply_move(find_move(start, name))
+            assert [move_name(book_move.move) for book_move in book.moves(start)] == ['e1g1']
+
+    @staticmethod
+    def test_choose_returns_none_out_of_book(tmp_path):
+
+        # Arrange
+        path = str(tmp_path / 'book.bin')
+        build_book(read_games(GAMES.splitlines()), path)
+        board = Board.from_fen('4k3/8/8/8/8/8/8/4K3 w - - 0 1')
+
+        # Act
+        with OpeningBook(path) as book:
+            out_of_book = book.choose(board)
+            in_book = book.choose(Board.at_starting_position(), random.Random(1))
+
+        # Assert
+        assert out_of_book is None
+        assert move_name(in_book) == 'e2e4'
+
+    @staticmethod
+    def test_empty_book_has_no_moves(tmp_path):
+
+        # Arrange
+        path = tmp_path / 'book.bin'
+        path.write_bytes(b'')
+
+        # Act
+        with OpeningBook(str(path)) as book:
+            moves = book.moves(Board.at_starting_position())
+
+        # Assert
+        assert moves == []
@@ -0,0 +1,87 @@
+import random
+
+import pytest
+
+import chessington.engine.evaluation as evaluation
+from chessington.engine.board import Board
+from chessington.engine.data import Square
+from chessington.engine.evaluation import compute_scores, evaluate
+
+
+class TestEvaluation:
+
+    @staticmethod
+    def test_starting_position_is_level():
+
+        # Arrange
+        board = Board.at_starting_position()
+
+        # Act
+        score = evaluate(board)
+
+        # Assert
+        assert score == 0
+        assert board.phase == evaluation.MAX_PHASE
+
+    @staticmethod
+    def test_score_is_from_side_to_move():
+
+        # Arrange
+        white_to_move = Board.from_fen('4k3/8/8/8/8/8/8/3QK3 w - - 0 1')
+        black_to_move = Board.from_fen('4k3/8/8/8/8/8/8/3QK3 b - - 0 1')
+
+        # Act / Assert
+        assert evaluate(white_to_move) > 800
+        assert evaluate(black_to_move) == -evaluate(white_to_move)
+
+    @staticmethod
+    def test_mirrored_positions_score_the_same():
+
+        # Arrange
+        board = Board.from_fen('r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3')
+        mirrored = Board.from_fen('rnbqkb1r/pppp1ppp/5n2/4p3/4P3/2N5/PPPP1PPP/R1BQKBNR b KQkq - 2 3')
+
+        # Act / Assert
+        assert evaluate(board) == evaluate(mirrored)
+
+    @staticmethod
+    def test_central_king_is_preferred_in_the_endgame():
+
+        # Arrange
+        central = Board.from_fen('4k3/8/8/8/3K4/8/8/8 w - - 0 1')
+        cornered = Board.from_fen('4k3/8/8/8/8/8/8/K7 w - - 0 1')
+
+        # Act / Assert
+        assert evaluate(central) > evaluate(cornered)
+
+    @staticmethod
+    def test_incremental_scores_match_recompute_through_moves():
+
+        # Arrange
+        board = Board.from_fen('r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1')
+        initial_scores = (board.midgame_score, board.endgame_score, board.phase)
+        random.seed(1)
+
+        # Act / Assert
+        for _ in range(60):
+            moves = board.legal_moves()
+            if not moves:
+                break
+            board.apply_move(random.choice(moves))
+            assert (board.midgame_score, board.endgame_score, board.phase) == compute_scores(board.bitboards)
+        while board.move_list:
+            board.unmake_move()
+        assert (board.midgame_score, board.endgame_score, board.phase) == initial_scores
+
+    @staticmethod
+    def test_debug_mode_detects_drift(monkeypatch):
+
+        # Arrange
+        board = Board.at_starting_position()
+        board.get_piece(Square.at(1, 4)).move_to(board, Square.at(3, 4))
+        board.midgame_score += 1
+        monkeypatch.setattr(evaluation, 'DEBUG', True)
+
+        # Act / Assert
+        with pytest.raises(AssertionError):
+            evaluate(board)
@@ -0,0 +1,82 @@
+from chessington.engine.board import Board
+from chessington.engine.exchange import static_exchange_evaluation
+from chessington.engine.perft import move_name
+
+
+def find_move(board, name):
+    return next(move for move in board.legal_moves() if move_name(move) == name)
+
+
+class TestStaticExchangeEvaluation:
+
+    @staticmethod
+    def test_undefended_piece_wins_its_value():
+
+        # Arrange
+        board = Board.from_fen('4k3/8/8/3r4/8/8/3R4/4K3 w - - 0 1')
+
+        # Act
+        gain = static_exchange_evaluation(board, find_move(board, 'd2d5'))
+
+        # Assert
+        assert gain == 500
+
+    @staticmethod
+    def test_queen_taking_a_defended_pawn_loses():
+
+        # Arrange
+        board = Board.from_fen('4k3/8/2p5/3p4/8/8/3Q4/4K3 w - - 0 1')
+
+        # Act
+        gain = static_exchange_evaluation(board, find_move(board, 'd2d5'))
+
+        # Assert
+        assert gain == 100 - 900
+
+    @staticmethod
+    def test_pawn_taking_a_defended_knight_wins():
+
+        # Arrange
+        board = Board.from_fen('4k3/8/2p5/3n4/4P3/8/8/4K3 w - - 0 1')
+
+        # Act
+        gain = static_exchange_evaluation(board, find_move(board, 'e4d5'))
+
+        # Assert
+        assert gain == 320 - 100
+
+    @staticmethod
+    def test_rook_behind_a_rook_joins_the_exchange():
+
+        # Arrange
+        board = Board.from_fen('3rk3/8/8/3p4/8/8/3R4/3RK3 w - - 0 1')
+
+        # Act
+        gain = static_exchange_evaluation(board, find_move(board, 'd2d5'))
+
+        # Assert
+        assert gain == 100
+
+    @staticmethod
+    def test_defender_x_rayed_behind_the_captured_piece_wins_it_back():
+
+        # Arrange
+        board = Board.from_fen('3rk3/3r4/8/3p4/8/8/3R4/4K3 w - - 0 1')
+
+        # Act
+        gain = static_exchange_evaluation(board, find_move(board, 'd2d5'))
+
+        # Assert
+        assert gain == 100 - 500
+
+    @staticmethod
+    def test_en_passant_capture():
+
+        # Arrange
+        board = Board.from_fen('4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 2')
+
+        # Act
+        gain = static_exchange_evaluation(board, find_move(board, 'e5d6'))
+
+        # Assert
+        assert gain == 100
@@ -0,0 +1,131 @@
+import pytest
+
+from chessington.engine.board import Board
+from chessington.engine.data import Player, Square
+from chessington.engine.fen import STARTING_FEN
+from chessington.engine.pieces import Pawn, Rook, King
+
+
+class TestFen:
+
+    @staticmethod
+    def test_starting_position_round_trips():
+
+        # Act
+        board = Board.from_fen(STARTING_FEN)
+
+        # Assert
+        assert board.to_fen() == STARTING_FEN
+        assert Board.at_starting_position().to_fen() == STARTING_FEN
+        assert board.zobrist_key == Board.at_starting_position().zobrist_key
+
+    @staticmethod
+    def test_side_to_move_is_honoured():
+
+        # Act
+        board = Board.from_fen('4k3/8/8/8/8/8/8/4K3 b - - 0 1')
+
+        # Assert
+        assert board.current_player == Player.BLACK
+        assert Board(Player.BLACK, Board.empty().board).current_player == Player.BLACK
+
+    @staticmethod
+    def test_castling_rights_map_onto_has_moved():
+
+        # Act
+        board = Board.from_fen('r3k2r/8/8/8/8/8/8/R3K2R w Kq - 0 1')
+
+        # Assert
+        assert not board.get_piece(Square.at(0, 4)).has_moved
+        assert not board.get_piece(Square.at(0, 7)).has_moved
+        assert board.get_piece(Square.at(0, 0)).has_moved
+        assert not board.get_piece(Square.at(7, 0)).has_moved
+        assert board.get_piece(Square.at(7, 7)).has_moved
+        assert board.to_fen() == 'r3k2r/8/8/8/8/8/8/R3K2R w Kq - 0 1'
+
+    @staticmethod
+    def test_only_pawns_on_their_starting_row_are_unmoved():
+
+        # Act
+        board = Board.from_fen('4k3/p7/1p6/8/8/6P1/7P/4K3 w - - 0 1')
+
+        # Assert
+        assert not board.get_piece(Square.at(6, 0)).has_moved
+        assert board.get_piece(Square.at(5, 1)).has_moved
+        assert board.get_piece(Square.at(2, 6)).has_moved
+        assert not board.get_piece(Square.at(1, 7)).has_moved
+
+    @staticmethod
+    def test_en_passant_square_allows_capture():
+
+        # Arrange
+        board = Board.from_fen('4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 2')
+        pawn = board.get_piece(Square.at(4, 4))
+
+        # Act
+        moves = pawn.get_available_moves(board)
+
+        # Assert
+        assert Square.at(5, 3) in moves
+        assert board.to_fen() == '4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 2'
+
+    @staticmethod
+    def test_move_counters_follow_moves():
+
+        # Arrange
+        board = Board.from_fen('4k3/8/8/8/8/8/4P3/R3K3 w Q - 5 10')
+
+        # Act
+        board.get_piece(Square.at(0, 0)).move_to(board, Square.at(0, 1))
+        after_rook_move = board.to_fen()
+        board.get_piece(Square.at(7, 4)).move_to(board, Square.at(7, 3))
+        after_king_move = board.to_fen()
+        board.get_piece(Square.at(1, 4)).move_to(board, Square.at(3, 4))
+
+        # Assert
+        assert after_rook_move == '4k3/8/8/8/8/8/4P3/1R2K3 b - - 6 10'
+        assert after_king_move == '3k4/8/8/8/8/8/4P3/1R2K3 w - - 7 11'
+        assert board.to_fen() == '3k4/8/8/8/4P3/8/8/1R2K3 b - e3 0 11'
+
+    @staticmethod
+    def test_unmake_move_restores_move_counters():
+
+        # Arrange
+        fen = 'r3k3/8/8/8/8/8/8/R3K3 b Qq - 3 7'
+        board = Board.from_fen(fen)
+
+        # Act
+        board.make_move(Square.at(7, 0), Square.at(0, 0))
+        board.unmake_move()
+
+        # Assert
+        assert board.to_fen() == fen
+        assert isinstance(board.get_piece(Square.at(7, 0)), Rook)
+        assert isinstance(board.get_piece(Square.at(0, 4)), King)
+
+    @staticmethod
+    def test_move_counters_are_optional():
+
+        # Act
+        board = Board.from_fen('4k3/8/8/8/8/8/P7/4K3 w - -')
+
+        # Assert
+        assert board.to_fen() == '4k3/8/8/8/8/8/P7/4K3 w - - 0 1'
+        assert isinstance(board.get_piece(Square.at(1, 0)), Pawn)
+
+    @staticmethod
+    @pytest.mark.parametrize('fen', [
+        '',
+        'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP w KQkq - 0 1',
+        'rnbqkbnr/pppppppp/9/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1',
+        'rnbqkbnr/ppppxppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1',
+        'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR x KQkq - 0 1',
+        'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkx - 0 1',
+        'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq e5 0 1',
+        'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - zero 1',
+    ])
+    def test_invalid_fen_is_rejected(fen):
+
+        # Act / Assert
+        with pytest.raises(ValueError):
+            Board.from_fen(fen)
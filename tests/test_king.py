@@ -107,3 +107,67 @@ class TestKings:
 
         # Assert
         assert Square.at(0, 6) not in moves
+
+    @staticmethod
+    def test_king_in_corner_has_three_moves():
+
+        # Arrange
+        board = Board.empty()
+        king = King(Player.WHITE)
+        square = Square.at(0, 7)
+        board.set_piece(square, king)
+        king.has_moved = True
+
+        # Act
+        moves = king.get_available_moves(board)
+
+        # Assert
+        assert len(moves) == 3
+
+    @staticmethod
+    def test_king_cannot_castle_through_attacked_square():
+
+        # Arrange
+        board = Board.empty()
+        king = King(Player.WHITE)
+        board.set_piece(Square.at(0, 4), king)
+        board.set_piece(Square.at(0, 7), Rook(Player.WHITE))
+        board.set_piece(Square.at(7, 5), Rook(Player.BLACK))
+
+        # Act
+        moves = king.get_available_moves(board)
+
+        # Assert
+        assert Square.at(0, 6) not in moves
+
+    @staticmethod
+    def test_king_cannot_castle_out_of_check():
+
+        # Arrange
+        board = Board.empty()
+        king = King(Player.WHITE)
+        board.set_piece(Square.at(0, 4), king)
+        board.set_piece(Square.at(0, 0), Rook(Player.WHITE))
+        board.set_piece(Square.at(7, 4), Rook(Player.BLACK))
+
+        # Act
+        moves = king.get_available_moves(board)
+
+        # Assert
+        assert Square.at(0, 2) not in moves
+
+    @staticmethod
+    def test_king_can_castle_queen_side_when_only_rook_passes_attacked_square():
+
+        # Arrange
+        board = Board.empty()
+        king = King(Player.WHITE)
+        board.set_piece(Square.at(0, 4), king)
+        board.set_piece(Square.at(0, 0), Rook(Player.WHITE))
+        board.set_piece(Square.at(7, 1), Rook(Player.BLACK))
+
+        # Act
+        moves = king.get_available_moves(board)
+
+        # Assert
+        assert Square.at(0, 2) in moves
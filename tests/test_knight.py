@@ -23,3 +23,34 @@ class TestKnights:
         # Assert
         assert Square.at(valid_destination[0], valid_destination[1]) in moves
         assert Square.at(valid_destination[1], valid_destination[0]) in moves
+
+    @staticmethod
+    def test_knight_in_corner_has_two_moves():
+
+        # Arrange
+        board = Board.empty()
+        knight = Knight(Player.WHITE)
+        square = Square.at(0, 0)
+        board.set_piece(square, knight)
+
+        # Act
+        moves = knight.get_available_moves(board)
+
+        # Assert
+        assert sorted((move.row, move.col) for move in moves) == [(1, 2), (2, 1)]
+
+    @staticmethod
+    def test_knight_cannot_land_on_friend():
+
+        # Arrange
+        board = Board.empty()
+        knight = Knight(Player.WHITE)
+        square = Square.at(0, 0)
+        board.set_piece(square, knight)
+        board.set_piece(Square.at(1, 2), Knight(Player.WHITE))
+
+        # Act
+        moves = knight.get_available_moves(board)
+
+        # Assert
+        assert moves == [Square.at(2, 1)]
@@ -0,0 +1,171 @@
+from chessington.engine.bitboards import square_index
+from chessington.engine.board import Board
+from chessington.engine.data import Player, Square, move_from_index, move_to_index, move_promotion_type
+from chessington.engine.pieces import Bishop, King, Knight, Pawn, Queen, Rook
+
+
+def destinations(moves, from_square):
+    from_index = square_index(from_square.row, from_square.col)
+    return {divmod(move_to_index(move), 8) for move in moves if move_from_index(move) == from_index}
+
+
+class TestLegalMoves:
+
+    @staticmethod
+    def test_starting_position_has_twenty_moves():
+
+        # Arrange
+        board = Board.at_starting_position()
+
+        # Act
+        moves = board.legal_moves()
+
+        # Assert
+        assert len(moves) == 20
+
+    @staticmethod
+    def test_pinned_piece_can_only_move_along_pin():
+
+        # Arrange
+        board = Board.empty()
+        board.set_piece(Square.at(0, 4), King(Player.WHITE))
+        board.set_piece(Square.at(2, 4), Rook(Player.WHITE))
+        board.set_piece(Square.at(7, 4), Rook(Player.BLACK))
+
+        # Act
+        moves = board.legal_moves()
+
+        # Assert
+        assert destinations(moves, Square.at(2, 4)) == {(1, 4), (3, 4), (4, 4), (5, 4), (6, 4), (7, 4)}
+
+    @staticmethod
+    def test_pinned_knight_cannot_move():
+
+        # Arrange
+        board = Board.empty()
+        board.set_piece(Square.at(0, 0), King(Player.WHITE))
+        board.set_piece(Square.at(1, 1), Knight(Player.WHITE))
+        board.set_piece(Square.at(5, 5), Bishop(Player.BLACK))
+
+        # Act
+        moves = board.legal_moves()
+
+        # Assert
+        assert destinations(moves, Square.at(1, 1)) == set()
+
+    @staticmethod
+    def test_only_king_moves_in_double_check():
+
+        # Arrange
+        board = Board.empty()
+        board.set_piece(Square.at(0, 4), King(Player.WHITE))
+        board.set_piece(Square.at(3, 0), Queen(Player.WHITE))
+        board.set_piece(Square.at(7, 4), Rook(Player.BLACK))
+        board.set_piece(Square.at(2, 3), Knight(Player.BLACK))
+
+        # Act
+        moves = board.legal_moves()
+
+        # Assert
+        assert {move_from_index(move) for move in moves} == {square_index(0, 4)}
+
+    @staticmethod
+    def test_single_check_can_be_blocked_or_captured():
+
+        # Arrange
+        board = Board.empty()
+        board.set_piece(Square.at(0, 4), King(Player.WHITE))
+        board.set_piece(Square.at(3, 0), Queen(Player.WHITE))
+        board.set_piece(Square.at(7, 4), Rook(Player.BLACK))
+
+        # Act
+        moves = board.legal_moves()
+
+        # Assert
+        assert destinations(moves, Square.at(3, 0)) == {(3, 4), (7, 4)}
+
+    @staticmethod
+    def test_en_passant_that_exposes_king_along_row_is_illegal():
+
+        # Arrange
+        board = Board.empty()
+        board.set_piece(Square.at(4, 0), King(Player.WHITE))
+        board.set_piece(Square.at(4, 3), Pawn(Player.WHITE))
+        board.set_piece(Square.at(6, 4), Pawn(Player.BLACK))
+        board.set_piece(Square.at(4, 7), Rook(Player.BLACK))
+        board.current_player = Player.BLACK
+        board.move_piece(Square.at(6, 4), Square.at(4, 4))
+
+        # Act
+        moves = board.legal_moves()
+
+        # Assert
+        assert destinations(moves, Square.at(4, 3)) == {(5, 3)}
+
+    @staticmethod
+    def test_en_passant_is_generated():
+
+        # Arrange
+        board = Board.empty()
+        board.set_piece(Square.at(0, 0), King(Player.WHITE))
+        board.set_piece(Square.at(4, 3), Pawn(Player.WHITE))
+        board.set_piece(Square.at(6, 4), Pawn(Player.BLACK))
+        board.current_player = Player.BLACK
+        board.move_piece(Square.at(6, 4), Square.at(4, 4))
+
+        # Act
+        moves = board.legal_moves()
+
+        # Assert
+        assert destinations(moves, Square.at(4, 3)) == {(5, 3), (5, 4)}
+
+    @staticmethod
+    def test_castling_through_attacked_square_is_not_generated():
+
+        # Arrange
+        board = Board.empty()
+        board.set_piece(Square.at(0, 4), King(Player.WHITE))
+        board.set_piece(Square.at(0, 0), Rook(Player.WHITE))
+        board.set_piece(Square.at(0, 7), Rook(Player.WHITE))
+        board.set_piece(Square.at(7, 3), Rook(Player.BLACK))
+
+        # Act
+        moves = board.legal_moves()
+
+        # Assert
+        assert (0, 6) in destinations(moves, Square.at(0, 4))
+        assert (0, 2) not in destinations(moves, Square.at(0, 4))
+
+    @staticmethod
+    def test_promotion_generates_every_piece_choice():
+
+        # Arrange
+        board = Board.empty()
+        board.set_piece(Square.at(0, 0), King(Player.WHITE))
+        board.set_piece(Square.at(6, 5), Pawn(Player.WHITE))
+
+        # Act
+        moves = [move for move in board.legal_moves() if move_from_index(move) == square_index(6, 5)]
+
+        # Assert
+        assert len(moves) == 4
+        assert all(move_promotion_type(move) for move in moves)
+
+    @staticmethod
+    def test_applied_move_can_be_unmade():
+
+        # Arrange
+        board = Board.empty()
+        board.set_piece(Square.at(0, 0), King(Player.WHITE))
+        pawn = Pawn(Player.WHITE)
+        board.set_piece(Square.at(6, 5), pawn)
+        knight_promotion = next(move for move in board.legal_moves() if move_promotion_type(move) == Knight.piece_type)
+
+        # Act
+        board.apply_move(knight_promotion)
+        promoted_piece = board.get_piece(Square.at(7, 5))
+        board.unmake_move()
+
+        # Assert
+        assert isinstance(promoted_piece, Knight)
+        assert board.get_piece(Square.at(6, 5)) is pawn
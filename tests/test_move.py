@@ -0,0 +1,75 @@
+import pytest
+
+from chessington.engine.bitboards import PAWN, KNIGHT, QUEEN, KING
+from chessington.engine.board import Board
+from chessington.engine.data import Player, Square, Move
+from chessington.engine.pieces import Pawn, Knight, King
+
+
+class TestMoves:
+
+    @staticmethod
+    def test_move_records_squares_and_piece_types():
+
+        # Arrange
+        board = Board.empty()
+        pawn = Pawn(Player.WHITE)
+        knight = Knight(Player.BLACK)
+        board.set_piece(Square.at(3, 3), pawn)
+        board.set_piece(Square.at(4, 4), knight)
+
+        # Act
+        move = Move(pawn, knight, Square.at(3, 3), Square.at(4, 4))
+
+        # Assert
+        assert move.square_from is Square.at(3, 3)
+        assert move.square_to is Square.at(4, 4)
+        assert move.moved_piece_type == PAWN
+        assert move.captured_piece_type == KNIGHT
+        assert not move.is_en_passant()
+        assert not move.is_pawn_promotion()
+
+    @staticmethod
+    def test_move_flags_en_passant_castling_and_promotion():
+
+        # Arrange
+        pawn = Pawn(Player.BLACK)
+        king = King(Player.WHITE)
+
+        # Act
+        en_passant = Move(pawn, None, Square.at(3, 3), Square.at(2, 4))
+        castle = Move(king, None, Square.at(0, 4), Square.at(0, 2))
+        promotion = Move(pawn, None, Square.at(1, 3), Square.at(0, 3), Knight)
+
+        # Assert
+        assert en_passant.is_en_passant() and en_passant.captured_piece_type == PAWN
+        assert castle.is_castle() and castle.moved_piece_type == KING
+        assert promotion.is_pawn_promotion() and promotion.promotion_type == KNIGHT
+        assert Move(pawn, None, Square.at(1, 3), Square.at(0, 3)).promotion_type == QUEEN
+
+    @staticmethod
+    def test_recorded_move_matches_legal_move_code():
+
+        # Arrange
+        board = Board.at_starting_position()
+        pawn = board.get_piece(Square.at(1, 4))
+
+        # Act
+        pawn.move_to(board, Square.at(3, 4))
+
+        # Assert
+        assert board.move_list[-1].code in Board.at_starting_position().legal_moves()
+        assert Move.from_code(board.move_list[-1].code) == board.move_list[-1]
+
+    @staticmethod
+    def test_moves_and_pieces_are_slotted():
+
+        # Arrange
+        pawn = Pawn(Player.WHITE)
+        move = Move(pawn, None, Square.at(1, 0), Square.at(2, 0))
+
+        # Act / Assert
+        with pytest.raises(AttributeError):
+            pawn.colour = 'white'
+        with pytest.raises(AttributeError):
+            move.attacking_piece = pawn
@@ -0,0 +1,102 @@
+from chessington.engine.bitboards import PAWN, KNIGHT, ROOK, QUEEN, square_index
+from chessington.engine.board import Board
+from chessington.engine.data import encode_move
+from chessington.engine.ordering import MoveOrderer
+from chessington.engine.search import search
+
+
+def quiet_move(from_index, to_index):
+    return encode_move(from_index, to_index, KNIGHT, None)
+
+
+class TestMoveOrdering:
+
+    @staticmethod
+    def test_table_move_comes_first():
+
+        # Arrange
+        orderer = MoveOrderer()
+        capture = encode_move(square_index(3, 3), square_index(4, 4), PAWN, QUEEN)
+        table_move = quiet_move(square_index(0, 1), square_index(2, 2))
+
+        # Act
+        moves = orderer.order([capture, table_move], 0, table_move)
+
+        # Assert
+        assert moves == [table_move, capture]
+
+    @staticmethod
+    def test_captures_are_ordered_most_valuable_victim_least_valuable_attacker():
+
+        # Arrange
+        orderer = MoveOrderer()
+        pawn_takes_rook = encode_move(square_index(3, 3), square_index(4, 4), PAWN, ROOK)
+        queen_takes_rook = encode_move(square_index(3, 7), square_index(4, 4), QUEEN, ROOK)
+        pawn_takes_queen = encode_move(square_index(3, 3), square_index(4, 2), PAWN, QUEEN)
+        quiet = quiet_move(square_index(0, 1), square_index(2, 2))
+
+        # Act
+        moves = orderer.order([quiet, queen_takes_rook, pawn_takes_rook, pawn_takes_queen], 0)
+
+        # Assert
+        assert moves == [pawn_takes_queen, pawn_takes_rook, queen_takes_rook, quiet]
+
+    @staticmethod
+    def test_killers_come_before_other_quiet_moves():
+
+        # Arrange
+        orderer = MoveOrderer()
+        first, second, third = (quiet_move(square_index(0, 1), square_index(2, col)) for col in (0, 2, 3))
+        orderer.record_cutoff(third, 3, 4)
+        orderer.record_cutoff(second, 3, 4)
+
+        # Act
+        moves = orderer.order([first, third, second], 3)
+
+        # Assert
+        assert moves == [second, third, first]
+        assert orderer.order([first, third], 2) == [third, first]
+
+    @staticmethod
+    def test_history_orders_quiet_moves():
+
+        # Arrange
+        orderer = MoveOrderer()
+        shallow = quiet_move(square_index(0, 1), square_index(2, 0))
+        deep = quiet_move(square_index(0, 6), square_index(2, 7))
+        orderer.record_cutoff(shallow, 10, 1)
+        orderer.record_cutoff(deep, 11, 5)
+
+        # Act
+        moves = orderer.order([shallow, deep], 0)
+
+        # Assert
+        assert moves == [deep, shallow]
+
+    @staticmethod
+    def test_captures_are_not_recorded_as_killers():
+
+        # Arrange
+        orderer = MoveOrderer()
+        capture = encode_move(square_index(3, 3), square_index(4, 4), PAWN, ROOK)
+
+        # Act
+        orderer.record_cutoff(capture, 0, 3)
+
+        # Assert
+        assert orderer.killers[0] == [0, 0]
+
+    @staticmethod
+    def test_search_reports_first_move_cutoff_rate():
+
+        # Arrange
+        board = Board.from_fen('r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1')
+
+        # Act
+        result = search(board, depth=3)
+
+        # Assert
+        statistics = result.statistics
+        assert statistics['beta_cutoffs'] > 0
+        assert statistics['first_move_cutoff_rate'] == statistics['first_move_cutoffs'] / statistics['beta_cutoffs']
+        assert statistics['first_move_cutoff_rate'] > 0.8
@@ -0,0 +1,118 @@
+import pickle
+
+from chessington.engine.board import Board
+from chessington.engine.parallel import ParallelSearcher, parallel_search
+from chessington.engine.perft import move_name
+from chessington.engine.search import MATE_SCORE
+from chessington.engine.transposition import SharedTranspositionTable, EXACT, LOWER_BOUND, BUCKET_SIZE
+
+
+class TestSharedTranspositionTable:
+
+    @staticmethod
+    def test_attached_table_shares_entries():
+
+        # Arrange
+        table = SharedTranspositionTable(size_mb=1)
+        attached = pickle.loads(pickle.dumps(table))
+
+        try:
+            # Act
+            table.store(0x1234, 3, 50, EXACT, 77)
+            attached.store(0x5678, 2, -10, LOWER_BOUND, 88)
+
+            # Assert
+            assert attached.probe(0x1234) == (3, 50, EXACT, 77)
+            assert table.probe(0x5678) == (2, -10, LOWER_BOUND, 88)
+        finally:
+            attached.close()
+            table.close()
+
+    @staticmethod
+    def test_clear_is_seen_by_attached_tables():
+
+        # Arrange
+        table = SharedTranspositionTable(size_mb=1)
+        attached = SharedTranspositionTable.attach(table.name, 1)
+        table.store(0x1234, 3, 50, EXACT, 77)
+
+        try:
+            # Act
+            table.clear()
+
+            # Assert
+            assert attached.probe(0x1234) is None
+        finally:
+            attached.close()
+            table.close()
+
+    @staticmethod
+    def test_entry_mixing_two_writes_is_not_matched():
+
+        # Arrange
+        table = SharedTranspositionTable(size_mb=1)
+        attached = SharedTranspositionTable.attach(table.name, 1)
+        table.store(0x1234, 3, 50, EXACT, 77)
+        index = (0x1234 % table.bucket_count) * BUCKET_SIZE
+
+        try:
+            # Act
+            # Another process has written the score of its own entry, but not yet the rest of it
+            attached.scores[index] = -400
+
+            # Assert
+            assert table.probe(0x1234) is None
+        finally:
+            attached.close()
+            table.close()
+
+
+class TestParallelSearch:
+
+    @staticmethod
+    def test_finds_mate_in_one():
+
+        # Arrange
+        board = Board.from_fen('6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1')
+
+        # Act
+        result = parallel_search(board, workers=2, depth=3, size_mb=1)
+
+        # Assert
+        assert move_name(result.best_move) == 'a1a8'
+        assert result.score == MATE_SCORE - 1
+        assert result.statistics['workers'] == 2
+        assert len(result.statistics['worker_depths']) == 2
+
+    @staticmethod
+    def test_searcher_can_be_reused():
+
+        # Arrange
+        board = Board.at_starting_position()
+        fen = board.to_fen()
+
+        # Act
+        with ParallelSearcher(workers=2, size_mb=1) as searcher:
+            first = searcher.search(board, depth=2)
+            second = searcher.search(board, nodes=200)
+
+        # Assert
+        assert first.best_move in board.legal_moves()
+        assert second.best_move in board.legal_moves()
+        assert first.depth == 2
+        assert board.to_fen() == fen
+
+    @staticmethod
+    def test_workers_see_the_game_history():
+
+        # Arrange
+        board = Board.from_fen('kn6/8/8/8/8/8/8/2KQ4 w - - 0 1')
+        for name in ['d1e1', 'b8c6', 'e1d1', 'c6b8', 'd1e1', 'b8c6', 'e1d1']:
+            board.apply_move(next(move for move in board.legal_moves() if move_name(move) == name))
+
+        # Act
+        result = parallel_search(board, workers=2, depth=1)
+
+        # Assert
+        assert move_name(result.best_move) == 'c6b8'
+        assert result.score == 0
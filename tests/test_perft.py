@@ -0,0 +1,75 @@
+import os
+
+import pytest
+
+from chessington.engine.board import Board
+from chessington.engine.perft import perft, divide
+
+# Raise with e.g. CHESSINGTON_PERFT_DEPTH=5 to check deeper counts
+MAX_DEPTH = int(os.environ.get('CHESSINGTON_PERFT_DEPTH', 3))
+
+# Published node counts for the standard perft test positions, indexed by depth - 1
+POSITIONS = {
+    'starting position': ('rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1',
+                          [20, 400, 8902, 197281, 4865609, 119060324]),
+    'kiwipete': ('r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1',
+                 [48, 2039, 97862, 4085603, 193690690]),
+    'position 3': ('8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1',
+                   [14, 191, 2812, 43238, 674624, 11030083]),
+    'position 4': ('r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1',
+                   [6, 264, 9467, 422333, 15833292]),
+    'position 4 mirrored': ('r2q1rk1/pP1p2pp/Q4n2/bbp1p3/Np6/1B3NBn/pPPP1PPP/R3K2R b KQ - 0 1',
+                            [6, 264, 9467, 422333, 15833292]),
+    'position 5': ('rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8',
+                   [44, 1486, 62379, 2103487, 89941194]),
+}
+
+CASES = [(name, depth, nodes)
+         for name, (fen, counts) in POSITIONS.items()
+         for depth, nodes in enumerate(counts, start=1)
+         if depth <= MAX_DEPTH]
+
+
+class TestPerft:
+
+    @staticmethod
+    @pytest.mark.parametrize('name, depth, expected_nodes', CASES)
+    def test_perft_matches_published_count(name, depth, expected_nodes):
+
+        # Arrange
+        board = Board.from_fen(POSITIONS[name][0])
+
+        # Act
+        nodes = perft(board, depth)
+
+        # Assert
+        assert nodes == expected_nodes
+
+    @staticmethod
+    def test_perft_leaves_board_unchanged():
+
+        # Arrange
+        board = Board.from_fen(POSITIONS['kiwipete'][0])
+        key = board.zobrist_key
+
+        # Act
+        perft(board, 2)
+
+        # Assert
+        assert board.zobrist_key == key
+        assert board.compute_zobrist_key() == key
+        assert board.move_list == []
+
+    @staticmethod
+    def test_divide_sums_to_perft():
+
+        # Arrange
+        board = Board.from_fen(POSITIONS['position 3'][0])
+
+        # Act
+        counts = divide(board, 2)
+
+        # Assert
+        assert len(counts) == 14
+        assert sum(counts.values()) == 191
+        assert counts['e2e4'] == 16
@@ -0,0 +1,163 @@
+import io
+
+import pytest
+
+from chessington.engine.board import Board
+from chessington.engine.data import Square
+from chessington.engine.perft import move_name
+from chessington.engine.pgn import read_games, parse_san, GameReplayer
+
+GAMES = """[Event "Fine"]
+[Result "1-0"]
+
+1. e4 e5 2. Qh5 Nc6 3. Bc4 Nf6 4. Qxf7# 1-0
+
+[Event "Illegal move"]
+[Result "0-1"]
+
+1. e4 e5 2. Ke3 Nf6 0-1
+
+[Event "Unclosed comment"]
+[Result "*"]
+
+1. d4 { this comment is never closed
+2. c4
+
+[Event "From a position"]
+[FEN "4k3/P7/8/8/8/8/8/4K3 w - - 0 1"]
+[Result "*"]
+
+1. a8=R+ Kd7 *
+2. e4 e5 1/2-1/2
+"""
+
+
+class TestPgn:
+
+    @staticmethod
+    def test_reads_headers_and_main_line():
+
+        # Arrange
+        text = """[Event "Test"]
+[White "A \\"quoted\\" name"]
+[Result "1-0"]
+
+1. e4 {best by test
+ they say} e5 (1... c5 2. Nf3) 2. Nf3 $1 Nc6 ; a comment
+3.Bb5 1-0
+"""
+
+        # Act
+        games = list(read_games(text.splitlines()))
+
+        # Assert
+        assert len(games) == 1
+        assert games[0].headers == {'Event': 'Test', 'White': 'A "quoted" name', 'Result': '1-0'}
+        assert games[0].moves == ['e4', 'e5', 'Nf3', 'Nc6', 'Bb5']
+
+    @staticmethod
+    def test_san_moves_are_resolved():
+
+        # Arrange
+        board = Board.from_fen('r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1')
+
+        # Act
+        names = [move_name(parse_san(board, san)) for san in ('O-O', 'O-O-O', 'Nxd7', 'dxe6', 'Qxf6', 'Bxa6', 'Kf1')]
+
+        # Assert
+        assert names == ['e1g1', 'e1c1', 'e5d7', 'd5e6', 'f3f6', 'e2a6', 'e1f1']
+
+    @staticmethod
+    def test_disambiguation_and_promotion():
+
+        # Arrange
+        board = Board.from_fen('7k/1P6/8/8/8/8/4K3/R6R w - - 0 1')
+
+        # Act
+        rook_move = parse_san(board, 'Rhf1')
+        promotion = parse_san(board, 'b8=N+')
+
+        # Assert
+        assert move_name(rook_move) == 'h1f1'
+        assert move_name(promotion) == 'b7b8n'
+        with pytest.raises(ValueError):
+            parse_san(board, 'Rf1')
+        with pytest.raises(ValueError):
+            parse_san(board, 'Nf3')
+
+    @staticmethod
+    def test_games_are_replayed_on_one_board():
+
+        # Arrange
+        replayer = GameReplayer()
+        start_fen = replayer.board.to_fen()
+
+        # Act
+        games = [(game.headers.get('Event'), game.moves[:2], game.error, game.board.to_fen())
+                 for game in replayer.replay(io.StringIO(GAMES))]
+
+        # Assert
+        assert games[0] == ('Fine', [(Square.at(1, 4), Square.at(3, 4)), (Square.at(6, 4), Square.at(4, 4))], None,
+                            'r1bqkb1r/pppp1Qpp/2n2n2/4p3/2B1P3/8/PPPP1PPP/RNB1K1NR b KQkq - 0 4')
+        assert replayer.board.to_fen() == start_fen
+
+    @staticmethod
+    def test_malformed_games_are_reported_and_skipped():
+
+        # Arrange
+        replayer = GameReplayer()
+
+        # Act
+        games = list(replayer.replay(io.StringIO(GAMES)))
+
+        # Assert
+        assert [game.headers.get('Event') for game in games] == ['Fine', 'Illegal move', 'Unclosed comment',
+                                                                 'From a position', None]
+        assert games[1].error == 'Move 3: Not a legal move: Ke3'
+        assert len(games[1].moves) == 2
+        assert [len(game.moves) for game in games] == [7, 2, 1, 2, 2]
+        assert replayer.games == 5
+        assert replayer.malformed_games == 1
+        assert replayer.moves == 14
+        assert replayer.games_per_second > 0
+
+    @staticmethod
+    def test_game_with_a_starting_position():
+
+        # Arrange
+        replayer = GameReplayer()
+
+        # Act
+        game = list(replayer.replay(io.StringIO(GAMES)))[3]
+
+        # Assert
+        assert game.error is None
+        assert game.board.to_fen() == 'R7/3k4/8/8/8/8/8/4K3 w - - 1 2'
+
+    @staticmethod
+    def test_games_are_read_from_a_path(tmp_path):
+
+        # Arrange
+        path = tmp_path / 'games.pgn'
+        path.write_text(GAMES)
+
+        # Act
+        games = list(read_games(str(path)))
+
+        # Assert
+        assert len(games) == 5
+        assert games[2].moves == ['d4']
+
+    @staticmethod
+    def test_moves_written_against_their_numbers():
+
+        # Arrange
+        pgn = '[Event "Castling"]\n\n1.e4 e5 2.Nf3 Nc6 3.Bc4 d6 4.0-0 4...Be6 5.d3 Qd7 6.Nc3 6...0-0-0 *\n'
+
+        # Act
+        games = list(GameReplayer().replay(io.StringIO(pgn)))
+
+        # Assert
+        assert games[0].error is None
+        assert games[0].moves[6] == (Square.at(0, 4), Square.at(0, 6))
+        assert games[0].moves[11] == (Square.at(7, 4), Square.at(7, 2))
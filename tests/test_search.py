@@ -0,0 +1,163 @@
+import time
+
+from chessington.engine.board import Board
+from chessington.engine.data import Player
+from chessington.engine.perft import move_name
+from chessington.engine.search import search, MATE_SCORE
+
+
+class TestSearch:
+
+    @staticmethod
+    def test_finds_mate_in_one():
+
+        # Arrange
+        board = Board.from_fen('6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1')
+
+        # Act
+        result = search(board, depth=3)
+
+        # Assert
+        assert move_name(result.best_move) == 'a1a8'
+        assert result.score == MATE_SCORE - 1
+
+    @staticmethod
+    def test_takes_a_free_piece():
+
+        # Arrange
+        board = Board.from_fen('4k3/8/8/3q4/8/8/3R4/4K3 w - - 0 1')
+
+        # Act
+        result = search(board, depth=2)
+
+        # Assert
+        assert move_name(result.best_move) == 'd2d5'
+        assert result.principal_variation[0] == result.best_move
+
+    @staticmethod
+    def test_search_leaves_board_unchanged():
+
+        # Arrange
+        board = Board.from_fen('r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1')
+        fen = board.to_fen()
+        key = board.zobrist_key
+
+        # Act
+        search(board, depth=2)
+
+        # Assert
+        assert board.to_fen() == fen
+        assert board.zobrist_key == key
+        assert board.current_player == Player.WHITE
+
+    @staticmethod
+    def test_respects_deadline():
+
+        # Arrange
+        board = Board.at_starting_position()
+
+        # Act
+        start = time.perf_counter()
+        result = search(board, time_limit=0.2)
+        elapsed = time.perf_counter() - start
+
+        # Assert
+        assert result.best_move in board.legal_moves()
+        assert elapsed < 0.25
+        assert result.nodes > 0 and result.nodes_per_second > 0
+
+    @staticmethod
+    def test_short_deadline_stops_the_first_iteration():
+
+        # Arrange
+        board = Board.from_fen('r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1')
+
+        # Act
+        start = time.perf_counter()
+        result = search(board, time_limit=0.01)
+        elapsed = time.perf_counter() - start
+
+        # Assert
+        assert result.best_move in board.legal_moves()
+        assert result.principal_variation[0] == result.best_move
+        assert elapsed < 0.02
+
+    @staticmethod
+    def test_respects_node_limit():
+
+        # Arrange
+        board = Board.at_starting_position()
+
+        # Act
+        result = search(board, nodes=500)
+
+        # Assert
+        assert result.best_move in board.legal_moves()
+        assert result.nodes < 500 + 100
+
+    @staticmethod
+    def test_reports_each_iteration():
+
+        # Arrange
+        board = Board.at_starting_position()
+        depths = []
+
+        # Act
+        result = search(board, depth=3, on_iteration=lambda iteration: depths.append(iteration.depth))
+
+        # Assert
+        assert depths == [1, 2, 3]
+        assert result.depth == 3
+        assert len(result.principal_variation) == 3
+
+    @staticmethod
+    def test_no_move_when_checkmated():
+
+        # Arrange
+        board = Board.from_fen('R5k1/5ppp/8/8/8/8/8/6K1 b - - 1 1')
+
+        # Act
+        result = search(board, depth=2)
+
+        # Assert
+        assert result.best_move is None
+        assert result.score == -MATE_SCORE
+
+    @staticmethod
+    def test_does_not_take_a_defended_pawn_with_the_queen():
+
+        # Arrange
+        board = Board.from_fen('4k3/8/2p5/3p4/8/8/3Q4/4K3 w - - 0 1')
+
+        # Act
+        result = search(board, depth=1)
+
+        # Assert
+        assert move_name(result.best_move) != 'd2d5'
+        assert result.score > 0
+
+    @staticmethod
+    def test_reports_main_and_quiescence_nodes_separately():
+
+        # Arrange
+        board = Board.from_fen('r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1')
+
+        # Act
+        result = search(board, depth=2)
+
+        # Assert
+        statistics = result.statistics
+        assert statistics['main_nodes'] > 0 and statistics['quiescence_nodes'] > 0
+        assert statistics['main_nodes'] + statistics['quiescence_nodes'] == result.nodes
+
+    @staticmethod
+    def test_scores_the_fifty_move_rule_as_a_draw():
+
+        # Arrange
+        board = Board.from_fen('4k3/8/8/8/8/8/8/3QK3 w - - 99 80')
+
+        # Act
+        result = search(board, depth=2)
+
+        # Assert
+        assert result.score == 0
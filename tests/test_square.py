@@ -0,0 +1,63 @@
+import pickle
+from copy import deepcopy
+
+import pytest
+
+from chessington.engine.data import Square, SQUARES
+
+
+class TestSquares:
+
+    @staticmethod
+    def test_squares_on_board_are_shared():
+
+        # Act
+        square = Square.at(3, 4)
+
+        # Assert
+        assert square is Square(3, 4)
+        assert square is SQUARES[28]
+        assert square.index == 28
+
+    @staticmethod
+    def test_off_board_squares_compare_by_value():
+
+        # Act
+        square = Square.at(8, 4)
+
+        # Assert
+        assert not square.is_on_board()
+        assert square.index is None
+        assert square == Square.at(8, 4)
+        assert hash(square) == hash(Square.at(8, 4))
+        assert square != Square.at(7, 4)
+
+    @staticmethod
+    def test_squares_work_as_dictionary_keys():
+
+        # Arrange
+        squares = {Square.at(1, 2): 'b2', Square.at(-1, 2): 'off'}
+
+        # Act / Assert
+        assert squares[Square.at(1, 2)] == 'b2'
+        assert squares[Square.at(-1, 2)] == 'off'
+
+    @staticmethod
+    def test_squares_are_immutable():
+
+        # Arrange
+        square = Square.at(1, 2)
+
+        # Act / Assert
+        with pytest.raises(AttributeError):
+            square.row = 5
+
+    @staticmethod
+    def test_copies_of_squares_are_the_shared_instance():
+
+        # Arrange
+        square = Square.at(6, 6)
+
+        # Act / Assert
+        assert deepcopy(square) is square
+        assert pickle.loads(pickle.dumps(square)) is square
@@ -0,0 +1,135 @@
+import random
+
+import pytest
+
+from chessington.engine.board import Board
+from chessington.engine.search import search, MATE_SCORE
+from chessington.engine.tablebase import Tablebases, TablebaseResult, generate_tablebases, dependencies, \
+    parse_signature, WIN, LOSS, DRAW
+
+
+@pytest.fixture(scope='module')
+def tablebases(tmp_path_factory):
+    directory = str(tmp_path_factory.mktemp('tablebases'))
+    generated = generate_tablebases(directory, ['KPvK'], workers=2)
+    with Tablebases(directory) as opened:
+        opened.generated = generated
+        yield opened
+
+
+def random_boards(count, pieces, seed):
+    """
+    Random legal positions with the given white pieces, as FEN letters, against a lone black king.
+    """
+    generator = random.Random(seed)
+    boards = []
+    while len(boards) < count:
+        squares = generator.sample(range(64), len(pieces) + 2)
+        grid = [['1'] * 8 for _ in range(8)]
+        for letter, square in zip(['K', 'k'] + pieces, squares):
+            grid[square // 8][square % 8] = letter
+        if any(letter == 'P' and not 8 <= square < 56 for letter, square in zip(['K', 'k'] + pieces, squares)):
+            continue
+        placement = '/'.join(''.join(grid[row]) for row in reversed(range(8)))
+        board = Board.from_fen(f'{placement} {generator.choice("wb")} - - 0 1')
+        if not board.is_in_check(board.current_player.opponent()):
+            boards.append(board)
+    return boards
+
+
+class TestTablebases:
+
+    @staticmethod
+    def test_dependencies_are_generated_first(tablebases):
+
+        # Assert
+        assert set(tablebases.generated) == {'KQvK', 'KRvK', 'KPvK'}
+        assert tablebases.generated[-1] == 'KPvK'
+        assert dependencies('KPvK') == {'KQvK', 'KRvK'}
+        assert dependencies('KBNvK') == set()
+
+    @staticmethod
+    def test_signatures_must_be_against_a_lone_king():
+
+        # Act / Assert
+        with pytest.raises(ValueError):
+            parse_signature('KQvKR')
+
+    @staticmethod
+    def test_mate_in_one(tablebases):
+
+        # Arrange
+        board = Board.from_fen('6k1/8/6K1/8/8/8/8/Q7 w - - 0 1')
+
+        # Act
+        result = tablebases.probe(board)
+
+        # Assert
+        assert result == TablebaseResult(WIN, 1)
+
+    @staticmethod
+    def test_side_with_the_pieces_can_be_black(tablebases):
+
+        # Arrange
+        board = Board.from_fen('6k1/8/6K1/8/8/8/8/Q7 w - - 0 1')
+        mirrored = Board.from_fen('q7/8/8/8/8/6k1/8/6K1 b - - 0 1')
+        defending = Board.from_fen('q7/8/8/8/8/6k1/8/6K1 w - - 0 1')
+
+        # Act
+        result = tablebases.probe(mirrored)
+        defending_result = tablebases.probe(defending)
+
+        # Assert
+        assert result == tablebases.probe(board)
+        assert defending_result.wdl == LOSS
+
+    @staticmethod
+    def test_king_in_front_of_a_rook_pawn_draws(tablebases):
+
+        # Arrange
+        white_to_move = Board.from_fen('k7/8/P7/8/8/8/8/7K w - - 0 1')
+        black_to_move = Board.from_fen('k7/8/P7/8/8/8/8/7K b - - 0 1')
+
+        # Act / Assert
+        assert tablebases.probe(white_to_move) == TablebaseResult(DRAW, 0)
+        assert tablebases.probe(black_to_move) == TablebaseResult(DRAW, 0)
+
+    @staticmethod
+    def test_results_agree_with_the_moves_from_each_position(tablebases):
+
+        # Arrange
+        boards = random_boards(60, ['Q'], 1) + random_boards(60, ['R'], 2) + random_boards(120, ['P'], 3)
+
+        # Act / Assert
+        for board in boards:
+            result = tablebases.probe(board)
+            children = []
+            for move in board.legal_moves():
+                board.apply_move(move)
+                children.append(tablebases.probe(board))
+                board.unmake_move()
+            losses = [child.plies for child in children if child.wdl == LOSS]
+            if not children:
+                expected = TablebaseResult(LOSS, 0) if board.is_in_check(board.current_player) \
+                    else TablebaseResult(DRAW, 0)
+            elif losses:
+                expected = TablebaseResult(WIN, min(losses) + 1)
+            elif all(child.wdl == WIN for child in children):
+                expected = TablebaseResult(LOSS, max(child.plies for child in children) + 1)
+            else:
+                expected = TablebaseResult(DRAW, 0)
+            assert result == expected, board.to_fen()
+
+    @staticmethod
+    def test_search_scores_table_positions_as_mates(tablebases):
+
+        # Arrange
+        board = Board.from_fen('8/8/8/4k3/8/8/8/R3K3 w - - 0 1')
+        plies = tablebases.probe(board).plies
+
+        # Act
+        result = search(board, depth=1, tablebases=tablebases)
+
+        # Assert
+        assert result.score == MATE_SCORE - plies
+        assert result.statistics['tablebase_hits'] > 0
@@ -0,0 +1,81 @@
+from chessington.engine.transposition import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+
+
+class TestTranspositionTable:
+
+    @staticmethod
+    def test_stored_entry_can_be_probed():
+
+        # Arrange
+        table = TranspositionTable(size_mb=1)
+
+        # Act
+        table.store(12345, 4, -30, EXACT, 77)
+        entry = table.probe(12345)
+
+        # Assert
+        assert entry == (4, -30, EXACT, 77)
+        assert table.hits == 1
+
+    @staticmethod
+    def test_missing_entry_is_none():
+
+        # Arrange
+        table = TranspositionTable(size_mb=1)
+
+        # Act
+        entry = table.probe(12345)
+
+        # Assert
+        assert entry is None
+        assert table.misses == 1
+
+    @staticmethod
+    def test_size_is_bounded_by_budget():
+
+        # Arrange
+        table = TranspositionTable(size_mb=2)
+
+        # Act
+        for key in range(200000):
+            table.store(key, 1, 0, EXACT)
+
+        # Assert
+        assert table.size_bytes <= 2 * 1024 * 1024
+        assert len(table.keys) == table.bucket_count * 2
+        assert table.overwrites > 0
+
+    @staticmethod
+    def test_deeper_entry_survives_shallower_entries_in_same_bucket():
+
+        # Arrange
+        table = TranspositionTable(size_mb=1)
+        deep_key = 5
+        shallow_keys = [deep_key + table.bucket_count * i for i in range(1, 4)]
+
+        # Act
+        table.store(deep_key, 8, 100, LOWER_BOUND, 1)
+        for key in shallow_keys:
+            table.store(key, 2, 0, UPPER_BOUND, 2)
+
+        # Assert
+        assert table.probe(deep_key) == (8, 100, LOWER_BOUND, 1)
+        assert table.probe(shallow_keys[-1]) == (2, 0, UPPER_BOUND, 2)
+        assert table.probe(shallow_keys[0]) is None
+        assert table.collisions == 1
+
+    @staticmethod
+    def test_deeper_entry_demotes_existing_entry():
+
+        # Arrange
+        table = TranspositionTable(size_mb=1)
+        first_key = 9
+        second_key = first_key + table.bucket_count
+
+        # Act
+        table.store(first_key, 3, 10, EXACT)
+        table.store(second_key, 6, 20, EXACT)
+
+        # Assert
+        assert table.probe(first_key) == (3, 10, EXACT, 0)
+        assert table.probe(second_key) == (6, 20, EXACT, 0)